@@ -1,64 +1,42 @@
 import os
 import sys
 import json
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
-import uuid
 import time
-from flask import Flask, request, jsonify
-from flask_cors import CORS 
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
+# First: loads .env, configures logging and starts the startup timer
+from config import env_float, startup_timer
+import uuid
+from flask import Flask, request, jsonify, Response, stream_with_context, g
+from flask_cors import CORS
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Tuple
+from dataclasses import dataclass
 import traceback
 import logging
 import random
+import asyncio
+import queue
+import contextvars
+import threading
+import re
+import copy
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, as_completed
+startup_timer.mark("imports")
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-try:
-    import google.generativeai as genai
-    GOOGLE_AI_AVAILABLE = True
-except ImportError:
-    GOOGLE_AI_AVAILABLE = False
-    logger.error("Google AI not available. Install: pip install google-generativeai")
+from tracing import tracer
+from metrics import metrics, current_route, stage_timer, llm_call_timer, count_fallback
+from clients import GOOGLE_AI_AVAILABLE, SUPABASE_CONFIGURED, supabase_client, GEMINI_MODEL_NAME, gemini_client
+from quota import DAILY_API_LIMIT, CONSERVATIVE_API_LIMIT, api_quota
+from scheduler import LLMOverloaded, llm_scheduler
+from breaker import CircuitOpen, llm_breaker
+from concurrency import SharedCallInterrupted, llm_single_flight, gemini_calls, ContextThreadPoolExecutor
+from cache import normalize_text, make_cache_key, question_cache, answer_cache
+from streaming import StreamingJSONScanner
+from sessions import (
+    EVALUATION_SCORE_KEYS, sessions_memory, session_backend, session_store, get_session_data, save_session_data
+)
 
-try:
-    from supabase import create_client, Client
-    SUPABASE_AVAILABLE = True
-except ImportError:
-    SUPABASE_AVAILABLE = False
-    logger.error("Supabase not available. Install: pip install supabase")
-
-# --- Supabase Client Setup ---
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-
-supabase = None
-if SUPABASE_AVAILABLE and SUPABASE_URL and SUPABASE_KEY:
-    try:
-        supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-        SUPABASE_AVAILABLE = True
-        logger.info("✅ Supabase connected successfully")
-    except Exception as e:
-        logger.error(f"❌ Supabase connection failed: {e}")
-        SUPABASE_AVAILABLE = False
-else:
-    logger.warning("⚠️ Supabase not configured. Using in-memory storage.")
-    SUPABASE_AVAILABLE = False
-
-# In-memory storage fallback
-sessions_memory = {}
-
-# Rate limiting and caching
-api_call_count = 0
-api_reset_time = datetime.now() + timedelta(days=1)
-question_cache = {}
-answer_cache = {}
+logger = logging.getLogger(__name__)
 
 # --- Core Data Models ---
 @dataclass
@@ -77,14 +55,370 @@ class Evaluation:
     correctness: int
     completeness: int
 
+# --- Warm Question Pool ---
+class QuestionPool:
+    """Per-(role, mode) pools of pre-generated questions, topped up by a background thread.
+
+    Pooled questions are shared across sessions: a draw skips questions the
+    session has already seen and moves the one it serves to the back of the
+    pool, so each question costs one Gemini call however often it is asked.
+    A top-up is only queued when a draw finds nothing new and the pool is
+    below `target_size`. Refills stop once the daily API count reaches
+    `max_daily_calls`, so the pool never eats into the quota reserved for
+    live requests, and as soon as Gemini repeats a pooled question.
+    `target_size` 0 disables the pool.
+    """
+
+    def __init__(self, target_size: int = 5, max_pools: int = 50, max_daily_calls: int = 36):
+        self.target_size = target_size
+        self.max_pools = max_pools
+        self.max_daily_calls = max_daily_calls
+        self.generate = None  # callable(role, mode, avoid) -> Optional[Dict], bound once the bot exists
+        self._pools = OrderedDict()  # (role_key, mode) -> (role, deque of questions)
+        self._lock = threading.Lock()
+        self._refill_queue = queue.Queue()
+        self._queued = set()
+        self._worker = None
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        self.duplicates = 0
+        self.refill_errors = 0
+
+    def draw(self, role: str, mode: str, history: List[Dict]) -> Optional[Dict]:
+        """Serve a pooled question the session has not been asked yet."""
+        key = self._key(role, mode)
+        asked = {normalize_text(text).casefold() for text in _asked_question_texts(history)}
+        result = None
+        with self._lock:
+            entry = self._pools.get(key)
+            if entry is not None:
+                self._pools.move_to_end(key)
+                pool = entry[1]
+                for candidate in pool:
+                    if normalize_text(candidate['question']).casefold() not in asked:
+                        # Rotate it so the next session starts on a different question
+                        pool.remove(candidate)
+                        pool.append(candidate)
+                        result = dict(candidate, id=str(uuid.uuid4()))
+                        break
+            if result is not None:
+                self.hits += 1
+                return result
+            self.misses += 1
+        self.request_refill(role, mode)
+        return None
+
+    def request_refill(self, role: str, mode: str):
+        """Queue a background top-up for this (role, mode) if it is below target."""
+        if self.generate is None or self.target_size <= 0:
+            return
+        key = self._key(role, mode)
+        with self._lock:
+            entry = self._pools.get(key)
+            if entry is not None and len(entry[1]) >= self.target_size:
+                return
+            if key in self._queued:
+                return
+            self._queued.add(key)
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._refill_loop, name="question-pool", daemon=True)
+                self._worker.start()
+        self._refill_queue.put((role, mode))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "pools": len(self._pools),
+                "pooled_questions": sum(len(pool) for _, pool in self._pools.values()),
+                "target_size": self.target_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "generated": self.generated,
+                "duplicates": self.duplicates,
+                "refill_errors": self.refill_errors,
+                "pending_refills": len(self._queued)
+            }
+
+    def _refill_loop(self):
+        while True:
+            role, mode = self._refill_queue.get()
+            key = self._key(role, mode)
+            try:
+                self._refill(role, mode, key)
+            finally:
+                with self._lock:
+                    self._queued.discard(key)
+
+    def _refill(self, role: str, mode: str, key: tuple):
+        while api_quota.calls_today() < self.max_daily_calls:
+            with self._lock:
+                entry = self._pools.get(key)
+                if entry is not None and len(entry[1]) >= self.target_size:
+                    return
+                avoid = [q['question'] for q in entry[1]] if entry else []
+            try:
+                question = self.generate(role, mode, avoid)
+            except Exception as e:
+                with self._lock:
+                    self.refill_errors += 1
+                logger.warning(f"Question pool refill failed for {role}/{mode}: {e}")
+                return
+            if not question:
+                return
+            text = normalize_text(question['question']).casefold()
+            with self._lock:
+                entry = self._pools.get(key)
+                if entry is None:
+                    entry = (role, deque())
+                    self._pools[key] = entry
+                    while len(self._pools) > self.max_pools:
+                        self._pools.popitem(last=False)
+                self.generated += 1
+                if text in {normalize_text(q['question']).casefold() for q in entry[1]}:
+                    # The model is repeating itself; retrying now would only spend the daily budget.
+                    # The next draw that finds nothing new queues another top-up
+                    self.duplicates += 1
+                    return
+                entry[1].append(question)
+
+    @staticmethod
+    def _key(role: str, mode: str) -> tuple:
+        return (normalize_text(role).casefold(), mode)
+
+def _asked_question_texts(history: List[Dict]) -> List[str]:
+    """Question texts already asked in a session history."""
+    asked_questions = []
+    for item in history or []:
+        if isinstance(item, dict) and 'question' in item:
+            q = item['question']
+            if isinstance(q, dict) and 'question' in q:
+                asked_questions.append(q['question'])
+            elif isinstance(q, str):
+                asked_questions.append(q)
+    return asked_questions
+
+# --- Evaluation Batching ---
+class EvaluationBatcher:
+    """Coalesces answer evaluations from concurrent requests into one Gemini call.
+
+    The first pending item opens a short collection window; the batch is sent
+    when the window closes or `max_batch_size` items are waiting. If the
+    batched response cannot be parsed, each item is evaluated on its own.
+    """
+
+    def __init__(self, window: float = 0.1, max_batch_size: int = 8, max_workers: int = 4):
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.bot = None  # bound once the bot exists
+        self._queue = queue.Queue()
+        self._executor = ContextThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="eval-batch")
+        self._lock = threading.Lock()
+        self._dispatcher = None
+        self.batches = 0
+        self.batched_items = 0
+        self.single_calls = 0
+        self.fallbacks = 0
+
+    def submit(self, question_text: str, user_answer: str, role: str) -> Future:
+        """Queue an evaluation; the future resolves to the evaluation dict or None on failure.
+
+        The caller's contextvars travel with the item, so the Gemini call is
+        labelled with the route of the request that asked for it.
+        """
+        future = Future()
+        with self._lock:
+            if self._dispatcher is None or not self._dispatcher.is_alive():
+                self._dispatcher = threading.Thread(target=self._dispatch_loop, name="eval-batcher", daemon=True)
+                self._dispatcher.start()
+        self._queue.put((question_text, user_answer, role, future, contextvars.copy_context()))
+        return future
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "window_ms": int(self.window * 1000),
+                "max_batch_size": self.max_batch_size,
+                "batches": self.batches,
+                "batched_items": self.batched_items,
+                "avg_batch_size": round(self.batched_items / self.batches, 2) if self.batches else 0.0,
+                "single_calls": self.single_calls,
+                "fallbacks": self.fallbacks
+            }
+
+    def _dispatch_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            # A batch is one call, so it runs in (a copy of) its first item's context
+            self._submit(batch[0], self._run_batch, batch)
+
+    def _run_batch(self, batch: List[tuple]):
+        if len(batch) == 1:
+            with self._lock:
+                self.single_calls += 1
+            self._run_single(batch[0])
+            return
+
+        try:
+            results = self.bot._evaluate_batch_uncached([item[:3] for item in batch])
+        except LLMOverloaded as e:
+            # Splitting the batch would only queue more calls behind the same backlog
+            logger.warning(f"{e} - using fallback for {len(batch)} answers")
+            for item in batch:
+                item[3].set_result(None)
+            return
+        except Exception as e:
+            logger.warning(f"Batched evaluation of {len(batch)} answers failed: {e} - evaluating individually")
+            with self._lock:
+                self.fallbacks += 1
+            for item in batch:
+                self._submit(item, self._run_single, item)
+            return
+
+        with self._lock:
+            self.batches += 1
+            self.batched_items += len(batch)
+        for item, result in zip(batch, results):
+            item[3].set_result(result)
+
+    def _submit(self, item: tuple, fn, arg):
+        # The executor copies the submitting context, so submit from inside the item's context
+        item[4].run(self._executor.submit, fn, arg)
+
+    def _run_single(self, item: tuple):
+        question_text, user_answer, role, future, _ = item
+        try:
+            future.set_result(self.bot._evaluate_uncached(question_text, user_answer, role))
+        except Exception as e:
+            future.set_exception(e)
+
+# --- Prompt Budgeting ---
+class TokenCounter:
+    """Local token estimates (~4 characters per token) plus per-kind usage totals.
+
+    The pinned google-generativeai SDK reports no token usage, so budgets and
+    totals are estimates; a count_tokens round-trip per call would cost more
+    latency than the precision is worth.
+    """
+
+    def __init__(self, chars_per_token: float = 4.0):
+        self.chars_per_token = chars_per_token
+        self._lock = threading.Lock()
+        self._usage = {}  # kind -> running totals
+
+    def estimate(self, text: str) -> int:
+        return int(len(text) / self.chars_per_token) + 1 if text else 0
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Return `text` if it fits in `max_tokens`, otherwise cut at a word boundary and mark it."""
+        text = (text or '').strip()
+        if self.estimate(text) <= max_tokens:
+            return text
+        cut = text[:max(0, int(max_tokens * self.chars_per_token) - 3)]
+        if ' ' in cut:
+            cut = cut.rsplit(' ', 1)[0]
+        return cut + "..."
+
+    def pack(self, parts: List[str], max_tokens: int) -> List[str]:
+        """Keep parts in order while their total estimate fits in `max_tokens`."""
+        packed, used = [], 0
+        for part in parts:
+            cost = self.estimate(part)
+            if used + cost > max_tokens:
+                break
+            packed.append(part)
+            used += cost
+        return packed
+
+    def record(self, kind: str, prompt: str, output_text: str = ''):
+        """Account one call's estimated input and output tokens."""
+        input_tokens = self.estimate(prompt)
+        output_tokens = self.estimate(output_text)
+        with self._lock:
+            totals = self._usage.setdefault(kind, {"calls": 0, "input_tokens": 0, "output_tokens": 0})
+            totals["calls"] += 1
+            totals["input_tokens"] += input_tokens
+            totals["output_tokens"] += output_tokens
+
+    def stats(self) -> Dict:
+        with self._lock:
+            by_kind = {}
+            for kind, totals in self._usage.items():
+                by_kind[kind] = dict(
+                    totals,
+                    avg_input_tokens=round(totals["input_tokens"] / totals["calls"], 1),
+                    avg_output_tokens=round(totals["output_tokens"] / totals["calls"], 1)
+                )
+            return {"chars_per_token": self.chars_per_token, "estimated": True, "by_kind": by_kind}
+
+token_counter = TokenCounter()
+
+def _response_text(response: Any) -> str:
+    # .text raises on blocked or empty candidates; accounting must never fail the call
+    try:
+        return response.text or ''
+    except Exception:
+        return ''
+
+# Per-call input budgets in tokens; long inputs are trimmed to fit, short ones are sent whole
+QUESTION_CONTEXT_TOKENS = int(env_float('QUESTION_CONTEXT_TOKENS', 150))
+EVALUATION_QUESTION_TOKENS = int(env_float('EVALUATION_QUESTION_TOKENS', 120))
+EVALUATION_ANSWER_TOKENS = int(env_float('EVALUATION_ANSWER_TOKENS', 500))
+SUMMARY_CONTEXT_TOKENS = int(env_float('SUMMARY_CONTEXT_TOKENS', 600))
+
 # --- Gemini LLM Integration ---
+class LLMUnavailable(LLMOverloaded):
+    """Raised when the Gemini client could not be built, so callers fall back without retrying."""
+
+class QuotaExhausted(LLMOverloaded):
+    """Raised when the shared API quota has no call left, so callers fall back without retrying."""
+
+# Bump when the evaluation prompt changes so stale cached evaluations are not reused
+EVALUATION_PROMPT_VERSION = "eval-v3"
+
 class GeminiInterviewBot:
     """Interacts with the Google Gemini API for interview logic."""
     
-    def __init__(self, enable_caching=True, max_retries=3):
+    QUESTION_CONFIG = {
+        'temperature': 0.7,
+        'max_output_tokens': 150,  # Increased for better question quality
+        'top_p': 0.95,  # Optimized for 2.0 Flash
+        'top_k': 40
+    }
+    EVALUATION_CONFIG = {
+        'temperature': 0.3,
+        'max_output_tokens': 250,  # Increased for better evaluation detail
+        'top_p': 0.9,  # More focused for evaluation
+        'top_k': 20
+    }
+    SUMMARY_CONFIG = {
+        'temperature': 0.5,
+        'max_output_tokens': 300,  # Increased for comprehensive summaries
+        'top_p': 0.9,
+        'top_k': 30
+    }
+    EVALUATION_SCORE_KEYS = EVALUATION_SCORE_KEYS
+    SUMMARY_LIST_FIELDS = ('strengths', 'areas_for_improvement', 'suggested_resources')
+    
+    def __init__(self, enable_caching=True, max_retries=3, question_pool: Optional[QuestionPool] = None,
+                 evaluation_batcher: Optional[EvaluationBatcher] = None):
         self.enable_caching = enable_caching
         self.max_retries = max_retries
+        self.question_pool = question_pool
+        self.evaluation_batcher = evaluation_batcher
         self.development_mode = False
+        self._model = None
         
         if not GOOGLE_AI_AVAILABLE:
             logger.warning("Google AI library not available - using development mode")
@@ -96,186 +430,376 @@ class GeminiInterviewBot:
             logger.warning("⚠️ No valid GOOGLE_API_KEY found - using development mode with fallback responses")
             self.development_mode = True
             return
-        
-        try:
-            genai.configure(api_key=api_key)
-            # Use gemini-2.0-flash for better performance and quota limits
-            self.model = genai.GenerativeModel('gemini-2.0-flash')
-            logger.info("✅ Gemini API connected successfully (using 2.0 Flash model)")
-        except Exception as e:
-            logger.error(f"❌ Failed to initialize Gemini API: {e} - falling back to development mode")
-            self.development_mode = True
 
-    def generate_question(self, role: str, mode: str, history: List[Dict]) -> Dict:
+    @property
+    def model(self):
+        """The Gemini model, built by the first call that needs it."""
+        if self._model is None:
+            self._model = gemini_client.get()
+            if self._model is None:
+                # Same outcome as a failed eager init: serve fallbacks from now on
+                self.development_mode = True
+                raise LLMUnavailable(f"Gemini unavailable: {gemini_client.error}")
+        return self._model
+
+    @model.setter
+    def model(self, model):
+        self._model = model
+
+    def generate_question(self, role: str, mode: str, history: List[Dict], kind: Optional[str] = None) -> Dict:
         """Generates a new interview question based on the role and mode."""
-        global api_call_count, api_reset_time
+        # Cached and pre-generated questions cost nothing at request time; the cache is checked
+        # first so a hit does not rotate the pool or queue a top-up
+        cache_key = f"question_{role}_{mode}_{len(history)}"
+        if self.enable_caching:
+            cached = question_cache.get(cache_key)
+            if cached is not None:
+                logger.info("Using cached question")
+                return cached
+        
+        pooled = self._draw_pooled_question(role, mode, history)
+        if pooled:
+            return pooled
         
         # Use fallback questions in development mode or if we've hit API limits
         if self.development_mode or self._check_api_limits():
             return self._get_fallback_question(role, mode, history)
         
-        # Create cache key
-        cache_key = f"question_{role}_{mode}_{len(history)}"
-        if self.enable_caching and cache_key in question_cache:
-            logger.info("Using cached question")
-            return question_cache[cache_key]
-        
-        # Avoid repeating similar questions
-        asked_questions = []
-        if history:
-            for item in history:
-                if isinstance(item, dict) and 'question' in item:
-                    q = item['question']
-                    if isinstance(q, dict) and 'question' in q:
-                        asked_questions.append(q['question'])
-                    elif isinstance(q, str):
-                        asked_questions.append(q)
+        # Concurrent misses for the same key share one Gemini call
+        result = self._shared_call(
+            cache_key, lambda: self._generate_question_uncached(role, mode, history, cache_key, kind)
+        )
         
-        context = ""
-        if asked_questions:
-            context = f" Avoid similar to: {'; '.join(asked_questions[-1:])}"  # Reduced context to save tokens
-        
-        if mode == "technical":
-            prompt_text = f"Technical interview question for {role}.{context} Just the question:"
-        elif mode == "behavioral":
-            prompt_text = f"STAR behavioral question for {role}.{context} Just the question:"
-        else:
-            prompt_text = f"Interview question for {role}.{context} Just the question:"
+        # Fallback to predefined questions
+        return result or self._get_fallback_question(role, mode, history)
+    
+    def prefetch_question(self, role: str, mode: str, history: List[Dict]) -> Dict:
+        """generate_question for a turn the user has not reached yet, scheduled behind live calls."""
+        return self.generate_question(role, mode, history, kind='background')
+    
+    def _generate_question_uncached(self, role: str, mode: str, history: List[Dict], cache_key: str,
+                                    kind: Optional[str] = None) -> Optional[Dict]:
+        """Generate one question with retries; None if every attempt failed."""
+        prompt_text = self._build_question_prompt(role, mode, history)
+        kind = kind or ('question' if history else 'first_question')
         
         # Try API call with retry logic
         for attempt in range(self.max_retries):
             try:
-                response = self._make_api_call_with_retry(prompt_text, {
-                    'temperature': 0.7,
-                    'max_output_tokens': 150,  # Increased for better question quality
-                    'top_p': 0.95,  # Optimized for 2.0 Flash
-                    'top_k': 40
-                })
-                
-                if not response or not response.text or not response.text.strip():
-                    raise Exception("Empty response from Gemini")
-                
-                question_text = response.text.strip()
-                
-                # Remove quotes if present
-                if question_text.startswith('"') and question_text.endswith('"'):
-                    question_text = question_text[1:-1]
-                
-                result = {
-                    "question": question_text,
-                    "category": mode,
-                    "id": str(uuid.uuid4())
-                }
+                response = self._make_api_call_with_retry(prompt_text, self.QUESTION_CONFIG, kind, attempt + 1)
+                result = self._parse_question_response(response, mode)
                 
                 # Cache the result
                 if self.enable_caching:
-                    question_cache[cache_key] = result
+                    question_cache.set(cache_key, result)
                 
-                api_call_count += 1
                 return result
                 
+            except LLMOverloaded as e:
+                logger.warning(f"{e} - using fallback")
+                break
             except Exception as e:
                 logger.warning(f"API attempt {attempt + 1} failed: {e}")
                 if attempt == self.max_retries - 1:
                     logger.error(f"All API attempts failed for question generation")
                     break
-                time.sleep(2 ** attempt + random.uniform(0, 1))  # Exponential backoff
+                self._backoff(attempt)  # Exponential backoff
         
-        # Fallback to predefined questions
-        return self._get_fallback_question(role, mode, history)
+        return None
 
     def evaluate_answer(self, question_text: str, user_answer: str, role: str) -> Dict:
         """Evaluates a user's answer and provides detailed feedback and a score."""
-        global api_call_count
-        
+        return self._evaluate_answer(question_text, user_answer, role)[0]
+    
+    def _evaluate_answer(self, question_text: str, user_answer: str, role: str,
+                         kind: str = 'evaluation') -> Tuple[Dict, bool]:
+        """Return (evaluation, fallback); `fallback` is True when the scores are a local heuristic."""
         if not question_text or not user_answer:
-            return self._get_fallback_evaluation("Invalid input")
+            return self._get_fallback_evaluation("Invalid input"), True
         
         # Use smart fallback in development mode or if we've hit API limits
         if self.development_mode or self._check_api_limits():
-            return self._get_smart_fallback_evaluation(user_answer)
+            return self._get_smart_fallback_evaluation(user_answer), True
         
         # Create cache key
-        answer_hash = hash(f"{question_text[:100]}_{user_answer[:100]}")
-        cache_key = f"eval_{answer_hash}"
-        if self.enable_caching and cache_key in answer_cache:
-            logger.info("Using cached evaluation")
-            return answer_cache[cache_key]
+        cache_key = self._evaluation_cache_key(question_text, user_answer, role)
+        if self.enable_caching:
+            cached = answer_cache.get(cache_key)
+            if cached is not None:
+                logger.info("Using cached evaluation")
+                return cached, False
+        
+        def evaluate():
+            # Share a Gemini call with other pending live evaluations when batching is on
+            if self.evaluation_batcher and kind == 'evaluation':
+                return self.evaluation_batcher.submit(question_text, user_answer, role).result()
+            return self._evaluate_uncached(question_text, user_answer, role, kind)
         
-        # Shortened prompt to save tokens
-        prompt_text = f"""Evaluate this {role} interview answer:
-Q: {question_text[:200]}...
-A: {user_answer[:300]}...
+        # Identical answers submitted concurrently are evaluated once
+        eval_data = self._shared_call(cache_key, evaluate)
+        
+        if eval_data is None:
+            # Fallback evaluation
+            return self._get_smart_fallback_evaluation(user_answer), True
+        
+        # Cache the result
+        if self.enable_caching:
+            answer_cache.set(cache_key, eval_data)
+        return eval_data, False
+    
+    def evaluate_many(self, items: List[Dict], max_concurrency: int = 4):
+        """Evaluate many {role, question, answer} items, yielding (index, evaluation, cached, fallback) as each finishes.
 
-JSON format only:
-{{
-    "feedback": "brief feedback (1-2 sentences)",
-    "score": score_1_to_10,
-    "clarity": clarity_1_to_10,
-    "correctness": correctness_1_to_10,
-    "completeness": completeness_1_to_10
-}}"""
+        Cached evaluations are yielded first; identical items are evaluated once.
+        Items are scheduled as background calls, so they wait behind live
+        interview traffic instead of being shed; `fallback` marks any item that
+        still got a heuristic score (quota spent, circuit open, Gemini failing).
+        """
+        pending = {}  # cache key -> indexes waiting on that evaluation
+        for index, item in enumerate(items):
+            role = item.get('role') or 'Software Engineer'
+            question_text, user_answer = item.get('question', ''), item.get('answer', '')
+            key = self._evaluation_cache_key(question_text, user_answer, role)
+            if self.enable_caching and not self.development_mode:
+                cached = answer_cache.get(key)
+                if cached is not None:
+                    yield index, cached, True, False
+                    continue
+            pending.setdefault(key, []).append(index)
+        
+        if not pending:
+            return
+        
+        executor = ContextThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="evaluate-many")
+        try:
+            futures = {}
+            for indexes in pending.values():
+                item = items[indexes[0]]
+                future = executor.submit(
+                    self._evaluate_answer, item.get('question', ''), item.get('answer', ''),
+                    item.get('role') or 'Software Engineer', 'background'
+                )
+                futures[future] = indexes
+            for future in as_completed(futures):
+                try:
+                    evaluation, fallback = future.result()
+                except Exception as e:
+                    logger.error(f"Batch evaluation item failed: {e}")
+                    evaluation, fallback = dict(TECHNICAL_ISSUE_EVALUATION), True
+                for index in futures[future]:
+                    yield index, evaluation, False, fallback
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _evaluate_uncached(self, question_text: str, user_answer: str, role: str,
+                           kind: str = 'evaluation') -> Optional[Dict]:
+        """Evaluate one answer with retries; None if every attempt failed."""
+        prompt_text = self._build_evaluation_prompt(question_text, user_answer, role)
         
         # Try API call with retry logic
         for attempt in range(self.max_retries):
             try:
-                response = self._make_api_call_with_retry(prompt_text, {
-                    'temperature': 0.3,
-                    'max_output_tokens': 250,  # Increased for better evaluation detail
-                    'top_p': 0.9,  # More focused for evaluation
-                    'top_k': 20
-                })
-                
-                if not response or not response.text:
-                    raise Exception("Empty API response")
-                
-                response_text = response.text.strip()
-                
-                # Try to parse JSON
-                try:
-                    eval_data = json.loads(response_text)
-                except json.JSONDecodeError:
-                    # Try to extract JSON from response
-                    import re
-                    json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', response_text, re.DOTALL)
-                    if json_match:
-                        eval_data = json.loads(json_match.group())
-                    else:
-                        logger.error(f"Failed to parse JSON from: {response_text}")
-                        raise ValueError("JSON parsing failed")
-                
-                # Validate and sanitize data
-                for key in ['score', 'clarity', 'correctness', 'completeness']:
-                    if key in eval_data:
-                        try:
-                            eval_data[key] = max(1, min(10, int(float(eval_data[key]))))
-                        except (ValueError, TypeError):
-                            eval_data[key] = 5
-                    else:
-                        eval_data[key] = 5
-                
-                if 'feedback' not in eval_data or not isinstance(eval_data['feedback'], str):
-                    eval_data['feedback'] = "Good effort on answering the question."
-                
-                # Cache the result
-                if self.enable_caching:
-                    answer_cache[cache_key] = eval_data
-                
-                api_call_count += 1
+                response = self._make_api_call_with_retry(prompt_text, self.EVALUATION_CONFIG, kind, attempt + 1)
+                eval_data = self._parse_evaluation_response(response)
                 return eval_data
                 
+            except LLMOverloaded as e:
+                logger.warning(f"{e} - using fallback")
+                break
             except Exception as e:
                 logger.warning(f"API attempt {attempt + 1} failed: {e}")
                 if attempt == self.max_retries - 1:
                     logger.error(f"All API attempts failed for answer evaluation")
                     break
-                time.sleep(2 ** attempt + random.uniform(0, 1))  # Exponential backoff
+                self._backoff(attempt)  # Exponential backoff
+        
+        return None
+    
+    def _evaluate_batch_uncached(self, items: List[tuple]) -> List[Dict]:
+        """Evaluate several (question, answer, role) items in one call; raises if the reply is unusable."""
+        config = dict(self.EVALUATION_CONFIG, max_output_tokens=self.EVALUATION_CONFIG['max_output_tokens'] * len(items))
+        response = self._make_api_call_with_retry(self._build_batch_evaluation_prompt(items), config, 'evaluation')
+        
+        if not response or not response.text:
+            raise Exception("Empty API response")
+        results = self._parse_json_array(response.text.strip())
+        if len(results) != len(items) or not all(isinstance(r, dict) for r in results):
+            raise ValueError(f"Expected {len(items)} evaluations, got {len(results)}")
+        return [self._sanitize_evaluation(r) for r in results]
+    
+    def _build_question_prompt(self, role: str, mode: str, history: List[Dict]) -> str:
+        """Build the question prompt, avoiding repeats of earlier questions."""
+        # Most recent questions first, as many as the context budget allows
+        asked_questions = [token_counter.truncate(q, 40) for q in reversed(_asked_question_texts(history))]
+        asked_questions = token_counter.pack(asked_questions, QUESTION_CONTEXT_TOKENS)
+        
+        context = ""
+        if asked_questions:
+            context = f" Avoid similar to: {'; '.join(asked_questions)}"
+        
+        if mode == "technical":
+            return f"Technical interview question for {role}.{context} Just the question:"
+        elif mode == "behavioral":
+            return f"STAR behavioral question for {role}.{context} Just the question:"
+        return f"Interview question for {role}.{context} Just the question:"
+    
+    def _draw_pooled_question(self, role: str, mode: str, history: List[Dict]) -> Optional[Dict]:
+        if self.development_mode or not self.question_pool:
+            return None
+        pooled = self.question_pool.draw(role, mode, history)
+        if pooled:
+            logger.info("Using pooled question")
+        return pooled
+    
+    def generate_pool_question(self, role: str, mode: str, avoid: List[str]) -> Optional[Dict]:
+        """Generate one fresh, uncached question for the warm pool."""
+        if self.development_mode or self._check_api_limits():
+            return None
         
-        # Fallback evaluation
-        return self._get_smart_fallback_evaluation(user_answer)
+        prompt_text = self._build_question_prompt(role, mode, [{"question": text} for text in avoid])
+        response = self._make_api_call_with_retry(prompt_text, self.QUESTION_CONFIG, 'background')
+        result = self._parse_question_response(response, mode)
+        return result
+    
+    def _parse_question_response(self, response: Any, mode: str) -> Dict:
+        """Turn a Gemini response into a question dict."""
+        if not response or not response.text or not response.text.strip():
+            raise Exception("Empty response from Gemini")
+        
+        question_text = response.text.strip()
+        
+        # Remove quotes if present
+        if question_text.startswith('"') and question_text.endswith('"'):
+            question_text = question_text[1:-1]
+        
+        return {
+            "question": question_text,
+            "category": mode,
+            "id": str(uuid.uuid4())
+        }
+    
+    def _evaluation_cache_key(self, question_text: str, user_answer: str, role: str) -> str:
+        return make_cache_key(
+            "eval", GEMINI_MODEL_NAME, EVALUATION_PROMPT_VERSION,
+            role.casefold(), question_text, user_answer
+        )
+    
+    def _build_evaluation_prompt(self, question_text: str, user_answer: str, role: str) -> str:
+        return f"""Evaluate this {role} interview answer:
+Q: {token_counter.truncate(question_text, EVALUATION_QUESTION_TOKENS)}
+A: {token_counter.truncate(user_answer, EVALUATION_ANSWER_TOKENS)}
+
+JSON format only:
+{{
+    "score": score_1_to_10,
+    "clarity": clarity_1_to_10,
+    "correctness": correctness_1_to_10,
+    "completeness": completeness_1_to_10,
+    "feedback": "brief feedback (1-2 sentences)"
+}}"""
+    
+    def _build_batch_evaluation_prompt(self, items: List[tuple]) -> str:
+        answers_text = "\n\n".join(
+            f"{i}. Role: {role}\n"
+            f"Q: {token_counter.truncate(question_text, EVALUATION_QUESTION_TOKENS)}\n"
+            f"A: {token_counter.truncate(user_answer, EVALUATION_ANSWER_TOKENS)}"
+            for i, (question_text, user_answer, role) in enumerate(items, 1)
+        )
+        return f"""Evaluate these {len(items)} interview answers independently:
+
+{answers_text}
+
+JSON array only, one object per answer in the same order:
+[
+    {{
+        "score": score_1_to_10,
+        "clarity": clarity_1_to_10,
+        "correctness": correctness_1_to_10,
+        "completeness": completeness_1_to_10,
+        "feedback": "brief feedback (1-2 sentences)"
+    }}
+]"""
+    
+    def _parse_evaluation_response(self, response: Any) -> Dict:
+        """Parse and sanitize an evaluation JSON response."""
+        if not response or not response.text:
+            raise Exception("Empty API response")
+        
+        return self._sanitize_evaluation(self._parse_json_object(response.text.strip()))
+    
+    def _sanitize_evaluation(self, eval_data: Dict) -> Dict:
+        # Validate and sanitize data
+        for key in self.EVALUATION_SCORE_KEYS:
+            if key in eval_data:
+                try:
+                    eval_data[key] = max(1, min(10, int(float(eval_data[key]))))
+                except (ValueError, TypeError):
+                    eval_data[key] = 5
+            else:
+                eval_data[key] = 5
+        
+        if 'feedback' not in eval_data or not isinstance(eval_data['feedback'], str):
+            eval_data['feedback'] = "Good effort on answering the question."
+        
+        return eval_data
+    
+    def _parse_json_array(self, response_text: str) -> List:
+        """Parse a JSON array, extracting it from surrounding text if needed."""
+        with stage_timer('json_parse'):
+            try:
+                parsed = json.loads(response_text)
+            except json.JSONDecodeError:
+                json_match = re.search(r'\[.*\]', response_text, re.DOTALL)
+                if not json_match:
+                    raise ValueError("JSON array parsing failed")
+                parsed = json.loads(json_match.group())
+        if not isinstance(parsed, list):
+            raise ValueError("Expected a JSON array")
+        return parsed
+    
+    def _parse_json_object(self, response_text: str) -> Dict:
+        """Parse a JSON object, extracting it from surrounding text if needed."""
+        with stage_timer('json_parse'):
+            try:
+                return json.loads(response_text)
+            except json.JSONDecodeError:
+                # Try to extract JSON from response
+                json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', response_text, re.DOTALL)
+                if json_match:
+                    return json.loads(json_match.group())
+                logger.error(f"Failed to parse JSON from: {response_text}")
+                raise ValueError("JSON parsing failed")
+    
+    @staticmethod
+    def _backoff_delay(attempt: int) -> float:
+        # Only asked for right before a retry
+        metrics.inc('querybox_llm_retries_total', route=current_route.get())
+        return 2 ** attempt + random.uniform(0, 1)
+    
+    def _backoff(self, attempt: int):
+        """Sleep before retrying after failed attempt number `attempt` (0-based), as its own span."""
+        delay = self._backoff_delay(attempt)
+        with tracer.span("gemini backoff", attributes={"querybox.llm.attempt": attempt + 1, "querybox.llm.sleep_seconds": delay}):
+            time.sleep(delay)
+    
+    async def _backoff_async(self, attempt: int):
+        delay = self._backoff_delay(attempt)
+        with tracer.span("gemini backoff", attributes={"querybox.llm.attempt": attempt + 1, "querybox.llm.sleep_seconds": delay}):
+            await asyncio.sleep(delay)
+    
+    def _attempt_span(self, kind: str, attempt: int, stream: bool):
+        """Span around one Gemini request, named and tagged along the OpenTelemetry GenAI conventions."""
+        return tracer.span(f"gemini {kind}", 'client', {
+            "gen_ai.system": "gemini",
+            "gen_ai.request.model": GEMINI_MODEL_NAME,
+            "querybox.llm.kind": kind,
+            "querybox.llm.attempt": attempt,
+            "querybox.llm.stream": stream
+        })
     
     def _get_fallback_evaluation(self, reason: str) -> Dict:
         """Return fallback evaluation"""
+        count_fallback('evaluation')
         return {
             "feedback": f"Thank you for your answer. {reason} occurred - your participation is valued.",
             "score": 6,
@@ -286,6 +810,7 @@ JSON format only:
     
     def _get_smart_fallback_evaluation(self, user_answer: str) -> Dict:
         """Provide a more intelligent fallback evaluation based on answer length and content"""
+        count_fallback('evaluation')
         answer_length = len(user_answer.split())
         
         # Basic scoring based on answer characteristics
@@ -317,6 +842,7 @@ JSON format only:
     
     def _get_fallback_question(self, role: str, mode: str, history: List[Dict]) -> Dict:
         """Get fallback question when API is unavailable"""
+        count_fallback('question')
         # Extensive fallback questions
         fallback_questions = {
             "technical": [
@@ -354,67 +880,152 @@ JSON format only:
     
     def _check_api_limits(self) -> bool:
         """Check if we've hit API limits"""
-        global api_call_count, api_reset_time
-        
-        # Reset counter if a day has passed
-        if datetime.now() >= api_reset_time:
-            api_call_count = 0
-            api_reset_time = datetime.now() + timedelta(days=1)
-            logger.info("API limit counter reset")
+        # Gemini is failing; skip straight to fallbacks until the breaker probes again
+        if llm_breaker.rejecting():
+            metrics.inc('querybox_quota_rejections_total', reason='circuit_open')
+            return True
         
         # Conservative limit for Gemini 2.0 Flash: stop at 180 to leave buffer (Free tier: 200 RPD)
-        daily_limit = 200  # Gemini 2.0 Flash free tier limit
-        conservative_limit = int(daily_limit * 0.9)  # Use 90% as buffer
-        
-        if api_call_count >= conservative_limit:
-            logger.warning(f"Approaching API limit ({api_call_count}/{daily_limit}). Using fallbacks.")
+        calls_today = api_quota.calls_today()
+        if calls_today >= api_quota.rpd:
+            logger.warning(f"Approaching API limit ({calls_today}/{DAILY_API_LIMIT}). Using fallbacks.")
+            metrics.inc('querybox_quota_rejections_total', reason='daily_limit')
             return True
         
         return False
     
-    def _make_api_call_with_retry(self, prompt: str, config: Dict) -> Any:
-        """Make API call with rate limit handling"""
+    def _shared_call(self, key: str, fn) -> Any:
+        """Run `fn` once for concurrent callers with this key; None (use the fallback) if its leader was interrupted."""
         try:
-            response = self.model.generate_content(prompt, generation_config=config)
-            return response
-        except Exception as e:
-            error_str = str(e).lower()
-            if '429' in error_str or 'quota' in error_str or 'rate' in error_str:
-                logger.error(f"Rate limit exceeded: {e}")
-                raise Exception("Rate limit exceeded")
-            else:
-                raise e
+            return llm_single_flight.do(key, fn)
+        except SharedCallInterrupted as e:
+            logger.warning(f"{e} - using fallback")
+            return None
+    
+    def _admit_call(self, kind: str, prompt: str, config: Dict):
+        """Check the breaker, wait for a scheduler slot, then count the call against the shared quota."""
+        if gemini_calls.draining:
+            raise LLMUnavailable("Server is shutting down")
+        self.model  # builds the client on first use, before any slot or quota is taken
+        if not llm_breaker.allow():
+            metrics.inc('querybox_quota_rejections_total', reason='circuit_open')
+            raise CircuitOpen(f"Gemini circuit is {llm_breaker.state}")
+        try:
+            cost = token_counter.estimate(prompt) + config.get('max_output_tokens', 0)
+            if not llm_scheduler.acquire(kind, cost):
+                metrics.inc('querybox_quota_rejections_total', reason='shed')
+                raise LLMOverloaded(f"{kind} call shed - projected wait exceeds its deadline")
+            if not api_quota.try_acquire():
+                metrics.inc('querybox_quota_rejections_total', reason='local_quota')
+                raise QuotaExhausted("Rate limit exceeded (local quota)")
+        except BaseException:
+            # This call never reaches Gemini, so a half-open probe it was granted goes to the next one
+            llm_breaker.release()
+            raise
+    
+    def _make_api_call_with_retry(self, prompt: str, config: Dict, kind: str = 'evaluation', attempt: int = 1) -> Any:
+        """Make API call with rate limit handling"""
+        self._admit_call(kind, prompt, config)
+        with gemini_calls, llm_call_timer(kind), self._attempt_span(kind, attempt, stream=False):
+            started = time.monotonic()
+            try:
+                response = self.model.generate_content(prompt, generation_config=config)
+                llm_breaker.record(True, time.monotonic() - started)
+                token_counter.record(kind, prompt, _response_text(response))
+                return response
+            except Exception as e:
+                llm_breaker.record(False)
+                error_str = str(e).lower()
+                if '429' in error_str or 'quota' in error_str or 'rate' in error_str:
+                    logger.error(f"Rate limit exceeded: {e}")
+                    metrics.inc('querybox_quota_rejections_total', reason='upstream_429')
+                    llm_scheduler.penalize()
+                    raise Exception("Rate limit exceeded")
+                else:
+                    raise e
 
-    def generate_summary(self, session_history: List[Dict]) -> Dict:
-        """Generates a final summary report with strengths, improvements, and resources."""
-        global api_call_count
-        
+    def generate_summary(self, session_history: List[Dict], scores: Optional[Dict] = None) -> Dict:
+        """Generates a final summary report with strengths, improvements, and resources.
+
+        `scores` are the session's running totals; without them the final score is summed from the turns.
+        """
         # Filter to answered questions only
         answered_questions = [h for h in session_history if h.get('answer') and h.get('evaluation')]
         
         if not answered_questions:
-            return {
-                "strengths": ["Participated in the interview"],
-                "areas_for_improvement": ["Practice answering interview questions"],
-                "suggested_resources": ["Technical interview preparation guides"],
-                "final_score": "N/A"
-            }
+            return self._get_empty_summary()
         
         # Calculate final score
-        total_score = sum(h['evaluation']['score'] for h in answered_questions)
-        final_score = f"{total_score / len(answered_questions):.1f}/10"
+        final_score = self._final_score(answered_questions, scores)
         
         # Use intelligent fallback in development mode or if we've hit API limits
         if self.development_mode or self._check_api_limits():
-            return self._get_intelligent_summary_fallback(answered_questions, final_score)
+            return self._get_intelligent_summary_fallback(answered_questions, final_score, scores)
+        
+        prompt_text = self._build_summary_prompt(answered_questions)
+        
+        # Identical prompts in flight at the same time share one Gemini call
+        summary_data = self._shared_call(
+            make_cache_key("summary", prompt_text, final_score),
+            lambda: self._generate_summary_uncached(prompt_text, final_score)
+        )
+        
+        # Fallback summary
+        return summary_data or self._get_intelligent_summary_fallback(answered_questions, final_score, scores)
+    
+    def _generate_summary_uncached(self, prompt_text: str, final_score: str) -> Optional[Dict]:
+        """Generate one summary with retries; None if every attempt failed."""
+        # Try API call with retry logic
+        for attempt in range(self.max_retries):
+            try:
+                response = self._make_api_call_with_retry(prompt_text, self.SUMMARY_CONFIG, 'summary', attempt + 1)
+                summary_data = self._parse_summary_response(response, final_score)
+
+                return summary_data
+                
+            except LLMOverloaded as e:
+                logger.warning(f"{e} - using fallback")
+                break
+            except Exception as e:
+                logger.warning(f"Summary API attempt {attempt + 1} failed: {e}")
+                if attempt == self.max_retries - 1:
+                    logger.error(f"All API attempts failed for summary generation")
+                    break
+                self._backoff(attempt)
         
-        # Shortened history to save tokens
-        history_text = "\n".join([
-            f"Q: {self._extract_question_text(h['question'])[:100]}... Score: {h['evaluation']['score']}/10" 
-            for h in answered_questions[:3]  # Only first 3 questions
-        ])
+        return None
+    
+    def _get_empty_summary(self) -> Dict:
+        return {
+            "strengths": ["Participated in the interview"],
+            "areas_for_improvement": ["Practice answering interview questions"],
+            "suggested_resources": ["Technical interview preparation guides"],
+            "final_score": "N/A"
+        }
+    
+    def _average_score(self, answered_questions: List[Dict], scores: Optional[Dict] = None) -> float:
+        # Legacy sessions stored before running totals existed are summed from their turns
+        if not scores or not scores.get('answered'):
+            scores = score_totals(answered_questions)
+        return scores['score'] / scores['answered']
+    
+    def _final_score(self, answered_questions: List[Dict], scores: Optional[Dict] = None) -> str:
+        return f"{self._average_score(answered_questions, scores):.1f}/10"
+    
+    def _build_summary_prompt(self, answered_questions: List[Dict]) -> str:
+        lines = []
+        for h in answered_questions:
+            line = f"Q: {token_counter.truncate(self._extract_question_text(h['question']), 40)} Score: {h['evaluation']['score']}/10"
+            feedback = h['evaluation'].get('feedback')
+            if feedback:
+                line += f" Feedback: {token_counter.truncate(feedback, 40)}"
+            lines.append(line)
+        packed = token_counter.pack(lines, SUMMARY_CONTEXT_TOKENS)
+        if len(packed) < len(lines):
+            packed.append(f"(+{len(lines) - len(packed)} more answered questions)")
+        history_text = "\n".join(packed)
 
-        prompt_text = f"""Career coach summary for interview:
+        return f"""Career coach summary for interview:
 {history_text}
 
 JSON only:
@@ -423,55 +1034,164 @@ JSON only:
     "areas_for_improvement": ["area1", "area2"], 
     "suggested_resources": ["resource1", "resource2"]
 }}"""
+    
+    def _parse_summary_response(self, response: Any, final_score: str) -> Dict:
+        """Parse a summary JSON response and fill in required fields."""
+        if not response or not response.text:
+            raise Exception("Empty response")
+        
+        return self._summary_from_text(response.text.strip(), final_score)
+    
+    def _summary_from_text(self, response_text: str, final_score: str) -> Dict:
+        summary_data = self._parse_json_object(response_text)
+        summary_data['final_score'] = final_score
+        
+        # Ensure required fields
+        for field in self.SUMMARY_LIST_FIELDS:
+            if field not in summary_data or not isinstance(summary_data[field], list):
+                summary_data[field] = ["Assessment not available"]
+        
+        return summary_data
+    
+    def stream_evaluation(self, question_text: str, user_answer: str, role: str):
+        """Yield (event, data) pairs as an evaluation streams in.
 
-        # Try API call with retry logic
+        Each score is sent once it can be parsed, then feedback text deltas, then
+        the final validated evaluation as a "result" event. If the stream fails
+        part-way the result falls back and may differ from the partial events.
+        """
+        if not question_text or not user_answer:
+            yield from self._replay_evaluation(self._get_fallback_evaluation("Invalid input"))
+            return
+        
+        if self.development_mode or self._check_api_limits():
+            yield from self._replay_evaluation(self._get_smart_fallback_evaluation(user_answer))
+            return
+        
+        cache_key = self._evaluation_cache_key(question_text, user_answer, role)
+        if self.enable_caching:
+            cached = answer_cache.get(cache_key)
+            if cached is not None:
+                logger.info("Using cached evaluation")
+                yield from self._replay_evaluation(cached)
+                return
+        
+        prompt_text = self._build_evaluation_prompt(question_text, user_answer, role)
+        scanner = StreamingJSONScanner(number_fields=self.EVALUATION_SCORE_KEYS, text_fields=('feedback',))
+        eval_data = None
+        
         for attempt in range(self.max_retries):
             try:
-                response = self._make_api_call_with_retry(prompt_text, {
-                    'temperature': 0.5,
-                    'max_output_tokens': 300,  # Increased for comprehensive summaries
-                    'top_p': 0.9,
-                    'top_k': 30
-                })
-                
-                if not response or not response.text:
-                    raise Exception("Empty response")
-                
-                response_text = response.text.strip()
-                
-                try:
-                    summary_data = json.loads(response_text)
-                except json.JSONDecodeError:
-                    import re
-                    json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', response_text, re.DOTALL)
-                    if json_match:
-                        summary_data = json.loads(json_match.group())
-                    else:
-                        raise ValueError("No valid JSON found")
-
-                summary_data['final_score'] = final_score
-                
-                # Ensure required fields
-                for field in ['strengths', 'areas_for_improvement', 'suggested_resources']:
-                    if field not in summary_data or not isinstance(summary_data[field], list):
-                        summary_data[field] = ["Assessment not available"]
+                for chunk in self._stream_api_call(prompt_text, self.EVALUATION_CONFIG, 'evaluation', attempt + 1):
+                    for kind, field, value in scanner.feed(chunk):
+                        if kind == "number":
+                            yield "score", {"field": field, "value": max(1, min(10, int(value)))}
+                        else:
+                            yield "feedback", {"delta": value}
+                eval_data = self._sanitize_evaluation(self._parse_json_object(scanner.text.strip()))
+                break
+            except LLMOverloaded as e:
+                logger.warning(f"{e} - using fallback")
+                break
+            except Exception as e:
+                logger.warning(f"Streaming API attempt {attempt + 1} failed: {e}")
+                # Only retry while nothing has been sent to the client
+                if scanner.text or attempt == self.max_retries - 1:
+                    break
+                self._backoff(attempt)
+        
+        if eval_data is None:
+            eval_data = self._get_smart_fallback_evaluation(user_answer)
+        elif self.enable_caching:
+            answer_cache.set(cache_key, eval_data)
+        yield "result", eval_data
+    
+    def stream_summary(self, session_history: List[Dict], scores: Optional[Dict] = None):
+        """Yield (event, data) pairs as a summary streams in.
 
-                api_call_count += 1
-                return summary_data
-                
+        The locally computed final score comes first, then each strength,
+        improvement and resource as it completes, then the final "result".
+        """
+        answered_questions = [h for h in session_history if h.get('answer') and h.get('evaluation')]
+        if not answered_questions:
+            yield from self._replay_summary(self._get_empty_summary())
+            return
+        
+        final_score = self._final_score(answered_questions, scores)
+        yield "final_score", {"final_score": final_score}
+        
+        if self.development_mode or self._check_api_limits():
+            yield from self._replay_summary(self._get_intelligent_summary_fallback(answered_questions, final_score, scores))
+            return
+        
+        prompt_text = self._build_summary_prompt(answered_questions)
+        scanner = StreamingJSONScanner(list_fields=self.SUMMARY_LIST_FIELDS)
+        summary_data = None
+        
+        for attempt in range(self.max_retries):
+            try:
+                for chunk in self._stream_api_call(prompt_text, self.SUMMARY_CONFIG, 'summary', attempt + 1):
+                    for _, field, value in scanner.feed(chunk):
+                        yield "item", {"field": field, "text": value}
+                summary_data = self._summary_from_text(scanner.text.strip(), final_score)
+                break
+            except LLMOverloaded as e:
+                logger.warning(f"{e} - using fallback")
+                break
             except Exception as e:
-                logger.warning(f"Summary API attempt {attempt + 1} failed: {e}")
-                if attempt == self.max_retries - 1:
-                    logger.error(f"All API attempts failed for summary generation")
+                logger.warning(f"Streaming summary attempt {attempt + 1} failed: {e}")
+                if scanner.text or attempt == self.max_retries - 1:
                     break
-                time.sleep(2 ** attempt + random.uniform(0, 1))
+                self._backoff(attempt)
         
-        # Fallback summary
-        return self._get_intelligent_summary_fallback(answered_questions, final_score)
+        if summary_data is None:
+            summary_data = self._get_intelligent_summary_fallback(answered_questions, final_score, scores)
+        yield "result", summary_data
+    
+    def _replay_evaluation(self, eval_data: Dict):
+        """Emit an already complete evaluation in streaming form."""
+        for field in self.EVALUATION_SCORE_KEYS:
+            yield "score", {"field": field, "value": eval_data.get(field)}
+        yield "feedback", {"delta": eval_data.get('feedback', '')}
+        yield "result", eval_data
+    
+    def _replay_summary(self, summary_data: Dict):
+        """Emit an already complete summary in streaming form."""
+        for field in self.SUMMARY_LIST_FIELDS:
+            for text in summary_data.get(field, []):
+                yield "item", {"field": field, "text": text}
+        yield "result", summary_data
+    
+    def _stream_api_call(self, prompt: str, config: Dict, kind: str = 'evaluation', attempt: int = 1):
+        """Yield response text chunks from a streaming API call, with rate limit handling."""
+        self._admit_call(kind, prompt, config)
+        with gemini_calls, llm_call_timer(kind), self._attempt_span(kind, attempt, stream=True):
+            started = time.monotonic()
+            streamed = []
+            try:
+                response = self.model.generate_content(prompt, generation_config=config, stream=True)
+                for chunk in response:
+                    text = chunk.text
+                    if text:
+                        streamed.append(text)
+                        yield text
+                llm_breaker.record(True, time.monotonic() - started)
+                token_counter.record(kind, prompt, ''.join(streamed))
+            except Exception as e:
+                llm_breaker.record(False)
+                error_str = str(e).lower()
+                if '429' in error_str or 'quota' in error_str or 'rate' in error_str:
+                    logger.error(f"Rate limit exceeded: {e}")
+                    metrics.inc('querybox_quota_rejections_total', reason='upstream_429')
+                    llm_scheduler.penalize()
+                    raise Exception("Rate limit exceeded")
+                raise
     
-    def _get_intelligent_summary_fallback(self, answered_questions: List[Dict], final_score: str) -> Dict:
+    def _get_intelligent_summary_fallback(self, answered_questions: List[Dict], final_score: str,
+                                          scores: Optional[Dict] = None) -> Dict:
         """Generate intelligent summary based on scores when API is unavailable"""
-        avg_score = sum(h['evaluation']['score'] for h in answered_questions) / len(answered_questions)
+        count_fallback('summary')
+        avg_score = self._average_score(answered_questions, scores)
         
         if avg_score >= 8:
             strengths = ["Excellent technical knowledge", "Clear and comprehensive answers", "Strong problem-solving approach"]
@@ -504,51 +1224,491 @@ JSON only:
                 return question_data['text']
         return "Question text not available"
 
-# --- Helper Functions ---
-def get_session_data(session_id: str) -> Optional[Dict]:
-    """Get session data from Supabase or memory"""
-    if not session_id:
+class AsyncGeminiInterviewBot(GeminiInterviewBot):
+    """asyncio variant of GeminiInterviewBot for ASGI servers.
+
+    Backoff uses asyncio.sleep and every Gemini call is bounded by
+    `call_timeout`, so a slow upstream never pins a worker thread.
+    """
+
+    def __init__(self, enable_caching=True, max_retries=3, call_timeout: float = 20.0,
+                 question_pool: Optional[QuestionPool] = None,
+                 evaluation_batcher: Optional[EvaluationBatcher] = None):
+        super().__init__(enable_caching=enable_caching, max_retries=max_retries,
+                         question_pool=question_pool, evaluation_batcher=evaluation_batcher)
+        self.call_timeout = call_timeout
+
+    async def generate_question(self, role: str, mode: str, history: List[Dict]) -> Dict:
+        """Generates a new interview question based on the role and mode."""
+        cache_key = f"question_{role}_{mode}_{len(history)}"
+        if self.enable_caching:
+            cached = question_cache.get(cache_key)
+            if cached is not None:
+                logger.info("Using cached question")
+                return cached
+
+        pooled = self._draw_pooled_question(role, mode, history)
+        if pooled:
+            return pooled
+
+        if self.development_mode or await self._check_api_limits_async():
+            return self._get_fallback_question(role, mode, history)
+
+        result = await self._shared_call_async(
+            cache_key, lambda: self._generate_question_uncached_async(role, mode, history, cache_key)
+        )
+        return result or self._get_fallback_question(role, mode, history)
+
+    async def _generate_question_uncached_async(self, role: str, mode: str, history: List[Dict],
+                                                cache_key: str) -> Optional[Dict]:
+        prompt_text = self._build_question_prompt(role, mode, history)
+
+        for attempt in range(self.max_retries):
+            try:
+                response = await self._make_api_call_async(
+                    prompt_text, self.QUESTION_CONFIG, 'question' if history else 'first_question', attempt + 1
+                )
+                result = self._parse_question_response(response, mode)
+                if self.enable_caching:
+                    question_cache.set(cache_key, result)
+                return result
+            except LLMOverloaded as e:
+                logger.warning(f"{e} - using fallback")
+                break
+            except Exception as e:
+                logger.warning(f"API attempt {attempt + 1} failed: {e}")
+                if attempt == self.max_retries - 1:
+                    logger.error(f"All API attempts failed for question generation")
+                    break
+                await self._backoff_async(attempt)
+
         return None
-        
-    if SUPABASE_AVAILABLE and supabase:
+
+    async def evaluate_answer(self, question_text: str, user_answer: str, role: str) -> Dict:
+        """Evaluates a user's answer and provides detailed feedback and a score."""
+        if not question_text or not user_answer:
+            return self._get_fallback_evaluation("Invalid input")
+
+        if self.development_mode or await self._check_api_limits_async():
+            return self._get_smart_fallback_evaluation(user_answer)
+
+        cache_key = self._evaluation_cache_key(question_text, user_answer, role)
+        if self.enable_caching:
+            cached = answer_cache.get(cache_key)
+            if cached is not None:
+                logger.info("Using cached evaluation")
+                return cached
+
+        async def evaluate():
+            if self.evaluation_batcher:
+                return await asyncio.wrap_future(self.evaluation_batcher.submit(question_text, user_answer, role))
+            return await self._evaluate_uncached_async(question_text, user_answer, role)
+
+        eval_data = await self._shared_call_async(cache_key, evaluate)
+        if eval_data is None:
+            return self._get_smart_fallback_evaluation(user_answer)
+        if self.enable_caching:
+            answer_cache.set(cache_key, eval_data)
+        return eval_data
+
+    async def _evaluate_uncached_async(self, question_text: str, user_answer: str, role: str) -> Optional[Dict]:
+        prompt_text = self._build_evaluation_prompt(question_text, user_answer, role)
+
+        for attempt in range(self.max_retries):
+            try:
+                response = await self._make_api_call_async(prompt_text, self.EVALUATION_CONFIG, 'evaluation', attempt + 1)
+                return self._parse_evaluation_response(response)
+            except LLMOverloaded as e:
+                logger.warning(f"{e} - using fallback")
+                break
+            except Exception as e:
+                logger.warning(f"API attempt {attempt + 1} failed: {e}")
+                if attempt == self.max_retries - 1:
+                    logger.error(f"All API attempts failed for answer evaluation")
+                    break
+                await self._backoff_async(attempt)
+
+        return None
+
+    async def generate_summary(self, session_history: List[Dict], scores: Optional[Dict] = None) -> Dict:
+        """Generates a final summary report with strengths, improvements, and resources."""
+        answered_questions = [h for h in session_history if h.get('answer') and h.get('evaluation')]
+        if not answered_questions:
+            return self._get_empty_summary()
+
+        final_score = self._final_score(answered_questions, scores)
+        if self.development_mode or await self._check_api_limits_async():
+            return self._get_intelligent_summary_fallback(answered_questions, final_score, scores)
+
+        prompt_text = self._build_summary_prompt(answered_questions)
+        summary_data = await self._shared_call_async(
+            make_cache_key("summary", prompt_text, final_score),
+            lambda: self._generate_summary_uncached_async(prompt_text, final_score)
+        )
+        return summary_data or self._get_intelligent_summary_fallback(answered_questions, final_score, scores)
+
+    async def _generate_summary_uncached_async(self, prompt_text: str, final_score: str) -> Optional[Dict]:
+        for attempt in range(self.max_retries):
+            try:
+                response = await self._make_api_call_async(prompt_text, self.SUMMARY_CONFIG, 'summary', attempt + 1)
+                return self._parse_summary_response(response, final_score)
+            except LLMOverloaded as e:
+                logger.warning(f"{e} - using fallback")
+                break
+            except Exception as e:
+                logger.warning(f"Summary API attempt {attempt + 1} failed: {e}")
+                if attempt == self.max_retries - 1:
+                    logger.error(f"All API attempts failed for summary generation")
+                    break
+                await self._backoff_async(attempt)
+
+        return None
+
+    async def _shared_call_async(self, key: str, coroutine_fn) -> Any:
         try:
-            response = supabase.table('sessions').select('*').eq('sessionId', session_id).execute()
-            if response.data:
-                session_data = response.data[0]
-                try:
-                    session_data['history'] = json.loads(session_data.get('history', '[]'))
-                except (json.JSONDecodeError, TypeError):
-                    session_data['history'] = []
-                return session_data
-        except Exception as e:
-            logger.error(f"Supabase fetch error: {e}")
+            return await llm_single_flight.do_async(key, coroutine_fn)
+        except SharedCallInterrupted as e:
+            logger.warning(f"{e} - using fallback")
+            return None
+
+    async def _check_api_limits_async(self) -> bool:
+        # The quota read can wait on SQLite's write lock held by another worker, so keep it off the event loop
+        return await asyncio.to_thread(self._check_api_limits)
+
+    async def _make_api_call_async(self, prompt: str, config: Dict, kind: str = 'evaluation', attempt: int = 1) -> Any:
+        """Make a non-blocking API call bounded by the per-call timeout."""
+        # Admission may queue behind the scheduler or SQLite's write lock, so keep it off the event loop
+        await asyncio.to_thread(self._admit_call, kind, prompt, config)
+        with gemini_calls, llm_call_timer(kind), self._attempt_span(kind, attempt, stream=False):
+            started = time.monotonic()
+            try:
+                response = await asyncio.wait_for(
+                    self.model.generate_content_async(prompt, generation_config=config),
+                    timeout=self.call_timeout
+                )
+                llm_breaker.record(True, time.monotonic() - started)
+                token_counter.record(kind, prompt, _response_text(response))
+                return response
+            except asyncio.TimeoutError:
+                llm_breaker.record(False)
+                raise Exception(f"Gemini call timed out after {self.call_timeout}s")
+            except Exception as e:
+                llm_breaker.record(False)
+                error_str = str(e).lower()
+                if '429' in error_str or 'quota' in error_str or 'rate' in error_str:
+                    logger.error(f"Rate limit exceeded: {e}")
+                    metrics.inc('querybox_quota_rejections_total', reason='upstream_429')
+                    llm_scheduler.penalize()
+                    raise Exception("Rate limit exceeded")
+                raise
+
+# --- Interview Flow Helpers ---
+# Shared by the Flask routes below and the async routes in asgi.py
+TECHNICAL_ISSUE_EVALUATION = {
+    "feedback": "Thank you for your answer. Due to a technical issue, detailed feedback is not available.",
+    "score": 6,
+    "clarity": 6,
+    "correctness": 6,
+    "completeness": 6
+}
+
+# Evaluation and next-question generation for the request being served run side by side on this pool
+LLM_POOL_SIZE = int(env_float('LLM_POOL_SIZE', 8))
+llm_executor = ContextThreadPoolExecutor(max_workers=LLM_POOL_SIZE, thread_name_prefix="llm")
+# Question prefetches and summary precomputes can wait in the scheduler or back off between
+# retries; their own pool keeps them from holding slots the request path is waiting on
+BACKGROUND_POOL_SIZE = int(env_float('BACKGROUND_POOL_SIZE', 2))
+background_executor = ContextThreadPoolExecutor(max_workers=BACKGROUND_POOL_SIZE, thread_name_prefix="background")
+
+# Combined deadline (seconds) for the LLM work done by one /submit_answer call
+SUBMIT_ANSWER_DEADLINE = env_float('SUBMIT_ANSWER_DEADLINE', 25.0)
+
+def result_before_deadline(future, deadline: float, fallback, label: str):
+    """Wait for `future` until the monotonic `deadline`, then fall back."""
+    try:
+        return future.result(timeout=max(0.0, deadline - time.monotonic()))
+    except FuturesTimeoutError:
+        logger.warning(f"{label} missed the submit deadline - using fallback")
+        return fallback()
+
+class QuestionPrefetcher:
+    """Generates question N+1 in the background while the user answers question N.
+
+    Prefetches live in this process only; a submit served by another worker
+    simply misses and generates the question itself.
+    """
+
+    def __init__(self, generate, executor: ThreadPoolExecutor, ttl: float = 1800, max_sessions: int = 1000):
+        self.generate = generate
+        self.executor = executor
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._pending = OrderedDict()  # session_id -> (history_len, future, created_at)
+        self._lock = threading.Lock()
+        self.scheduled = 0
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def schedule(self, session_id: str, role: str, mode: str, history: List[Dict]):
+        """Start generating the question that will follow `history`."""
+        snapshot = list(history)
+        future = self.executor.submit(self.generate, role, mode, snapshot)
+        with self._lock:
+            self._expire_locked()
+            previous = self._pending.pop(session_id, None)
+            if previous:
+                previous[1].cancel()
+            self._pending[session_id] = (len(snapshot), future, time.monotonic())
+            self.scheduled += 1
+            while len(self._pending) > self.max_sessions:
+                _, (_, oldest, _) = self._pending.popitem(last=False)
+                oldest.cancel()
+                self.expired += 1
+
+    def take(self, session_id: str, history_len: int):
+        """Return the prefetched future for this turn, or None on a miss."""
+        with self._lock:
+            entry = self._pending.pop(session_id, None)
+            if entry is None or entry[0] != history_len or time.monotonic() - entry[2] > self.ttl:
+                self.misses += 1
+                if entry:
+                    entry[1].cancel()
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def discard(self, session_id: str):
+        with self._lock:
+            entry = self._pending.pop(session_id, None)
+        if entry:
+            entry[1].cancel()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._expire_locked()
+            lookups = self.hits + self.misses
+            return {
+                "pending": len(self._pending),
+                "scheduled": self.scheduled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "expired": self.expired
+            }
+
+    def _expire_locked(self):
+        now = time.monotonic()
+        while self._pending:
+            session_id, (_, future, created_at) = next(iter(self._pending.items()))
+            if now - created_at <= self.ttl:
+                break
+            self._pending.pop(session_id)
+            future.cancel()
+            self.expired += 1
+
+# Limits for POST /batch/evaluate
+BATCH_EVALUATE_MAX_ITEMS = int(env_float('BATCH_EVALUATE_MAX_ITEMS', 500))
+BATCH_EVALUATE_CONCURRENCY = int(env_float('BATCH_EVALUATE_CONCURRENCY', 4))
+
+def sse_response(events) -> Response:
+    """Stream (event, data) pairs to the client as server-sent events."""
+    def generate():
+        for event, data in events:
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
     
-    return sessions_memory.get(session_id)
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def parse_interview_settings(data: Dict) -> tuple:
+    """Validate start_interview input and return (role, mode, num_questions)."""
+    role = data.get('role', 'Software Engineer')
+    mode = data.get('mode', 'technical')
+    num_questions = int(data.get('num_questions', 3))
+    
+    # Validate inputs
+    if mode not in ['technical', 'behavioral']:
+        mode = 'technical'
+    num_questions = min(max(num_questions, 1), 10)  # Limit 1-10
+    return role, mode, num_questions
+
+def new_session_data(session_id: str, user_id: str, role: str, mode: str,
+                     num_questions: int, first_q: Dict) -> Dict:
+    """Build the stored record for a freshly started interview."""
+    return {
+        "sessionId": session_id,
+        "userId": user_id,
+        "role": role,
+        "mode": mode,
+        "numQuestions": num_questions,
+        "history": [{
+            "question": first_q,
+            "answer": None,
+            "evaluation": None
+        }],
+        "currentQuestionIndex": 0,
+        "startTime": datetime.now().isoformat(),
+        "endTime": None,
+        "scores": score_totals([]),
+        "summary": None,
+        "version": 0
+    }
+
+def start_interview_response(session_id: str, first_q: Dict, num_questions: int) -> Dict:
+    return {
+        "sessionId": session_id,
+        "question": first_q['question'],
+        "numQuestions": num_questions,
+        "questionNumber": 1,
+        "totalQuestions": num_questions,
+        "message": "Interview started successfully"
+    }
+
+def current_question_text(session_data: Dict) -> Optional[str]:
+    """Return the text of the unanswered question, or None if there is none."""
+    history = session_data.get('history', [])
+    current_index = session_data.get('currentQuestionIndex', 0)
+    if current_index >= len(history):
+        return None
+    current_question_data = history[current_index]['question']
+    return current_question_data.get('question', '') if isinstance(current_question_data, dict) else str(current_question_data)
+
+def record_answer(session_data: Dict, user_answer: str, evaluation: Dict) -> Dict:
+    """Store the answer and evaluation on the current turn and return the response payload."""
+    current_index = session_data.get('currentQuestionIndex', 0)
+    history = session_data.get('history', [])
+    history[current_index]['answer'] = user_answer
+    history[current_index]['evaluation'] = evaluation
+    
+    # Keep the score sums current so summaries never rescan the history
+    if session_data.get('scores') is None:
+        session_data['scores'] = score_totals(history)
+    else:
+        _add_scores(session_data['scores'], evaluation)
+    
+    return {
+        "message": "Answer submitted successfully",
+        "feedback": evaluation.get('feedback', 'No feedback available'),
+        "score": evaluation.get('score', 6),
+        "clarity": evaluation.get('clarity', 6),
+        "correctness": evaluation.get('correctness', 6),
+        "completeness": evaluation.get('completeness', 6)
+    }
+
+def is_last_question(session_data: Dict) -> bool:
+    return session_data.get('currentQuestionIndex', 0) + 1 >= session_data.get('numQuestions', 3)
+
+def advance_interview(session_data: Dict, response_data: Dict, next_q: Dict):
+    """Append the next question to the session and describe it in the response."""
+    next_index = session_data.get('currentQuestionIndex', 0) + 1
+    session_data.setdefault('history', []).append({
+        "question": next_q,
+        "answer": None,
+        "evaluation": None
+    })
+    session_data['currentQuestionIndex'] = next_index
+    
+    response_data['nextQuestion'] = next_q.get('question', 'Question not available')
+    response_data['questionNumber'] = next_index + 1
+    response_data['totalQuestions'] = session_data.get('numQuestions', 3)
+    response_data['completed'] = False
+
+def complete_interview(session_data: Dict, response_data: Dict, technical_issue: bool = False):
+    """Mark the session finished and describe completion in the response."""
+    if technical_issue:
+        session_data['currentQuestionIndex'] = session_data.get('numQuestions', 3)
+        response_data['message'] = "Interview completed due to technical issue."
+    else:
+        session_data['currentQuestionIndex'] = session_data.get('currentQuestionIndex', 0) + 1
+        response_data['message'] = "Interview completed! Get your summary."
+    session_data['endTime'] = datetime.now().isoformat()
+    response_data['completed'] = True
+
+def fallback_summary(history: List[Dict], scores: Optional[Dict] = None) -> Dict:
+    """Summary used when summary generation raises."""
+    count_fallback('summary')
+    if not scores or not scores.get('answered'):
+        scores = score_totals(history)
+    avg_score = f"{scores['score'] / scores['answered']:.1f}/10" if scores['answered'] else "N/A"
+    
+    return {
+        "strengths": ["Completed interview session"],
+        "areas_for_improvement": ["Continue practicing"],
+        "suggested_resources": ["Technical interview guides"],
+        "final_score": avg_score
+    }
+
+def add_summary_metadata(summary: Dict, session_id: str, session_data: Dict) -> Dict:
+    scores = session_data.get('scores')
+    summary['sessionId'] = session_id
+    summary['role'] = session_data.get('role')
+    if scores is not None:
+        summary['totalQuestions'] = scores['answered']
+    else:
+        summary['totalQuestions'] = len([h for h in session_data.get('history', []) if h.get('answer')])
+    summary['completedAt'] = session_data.get('endTime')
+    return summary
+
+def score_totals(history: List[Dict]) -> Dict:
+    """Score sums over the answered turns; sessions keep these current in record_answer."""
+    totals = {"answered": 0, **{key: 0 for key in GeminiInterviewBot.EVALUATION_SCORE_KEYS}}
+    for turn in history:
+        if turn.get('answer') and isinstance(turn.get('evaluation'), dict):
+            _add_scores(totals, turn['evaluation'])
+    return totals
 
-def save_session_data(session_id: str, session_data: Dict) -> bool:
-    """Save session data to Supabase or memory"""
-    if not session_id or not session_data:
+def _add_scores(totals: Dict, evaluation: Dict):
+    totals['answered'] += 1
+    for key in GeminiInterviewBot.EVALUATION_SCORE_KEYS:
+        value = evaluation.get(key)
+        if isinstance(value, (int, float)):
+            totals[key] += value
+
+def stored_summary(session_data: Dict) -> Optional[Dict]:
+    """The memoized summary of a finished session, ready for add_summary_metadata."""
+    summary = session_data.get('summary')
+    return copy.deepcopy(summary) if session_data.get('endTime') and summary else None
+
+def store_summary(session_id: str, session_data: Dict, summary: Dict) -> bool:
+    """Memoize the summary on a finished session so later reads cost no API calls."""
+    if not session_data.get('endTime') or session_data.get('_partial') or session_data.get('summary'):
         return False
-        
-    if SUPABASE_AVAILABLE and supabase:
-        try:
-            db_data = session_data.copy()
-            db_data['history'] = json.dumps(session_data.get('history', []))
-            
-            # Check if session exists
-            existing = supabase.table('sessions').select('sessionId').eq('sessionId', session_id).execute()
-            
-            if existing.data:
-                supabase.table('sessions').update(db_data).eq('sessionId', session_id).execute()
-            else:
-                supabase.table('sessions').insert(db_data).execute()
+    session_data['summary'] = copy.deepcopy(summary)
+    if session_data.get('scores') is None:
+        session_data['scores'] = score_totals(session_data.get('history', []))
+    try:
+        if save_session_data(session_id, session_data):
             return True
-        except Exception as e:
-            logger.error(f"Supabase save error: {e}")
-    
-    # Fallback to memory
-    sessions_memory[session_id] = session_data
-    return True
+        # Another request stored it (or changed the session) first; the next read picks that up
+        logger.info(f"Summary for session {session_id} not stored - session changed")
+    except Exception as e:
+        # The caller still serves the summary; a later read tries storing it again
+        logger.error(f"Failed to store summary for session {session_id}: {e}")
+    session_data['summary'] = None
+    return False
+
+def load_for_summary(session_id: str) -> Tuple[Optional[Dict], Optional[Dict]]:
+    """Return (session, stored summary); the turns are only read when no summary is stored yet."""
+    session_data = get_session_data(session_id, include_history=False)
+    if session_data is None:
+        return None, None
+    summary = stored_summary(session_data)
+    if summary is None:
+        session_data = get_session_data(session_id)
+        summary = stored_summary(session_data) if session_data else None
+    return session_data, summary
+
+def precompute_summary(session_id: str, session_data: Dict):
+    """Generate and store the summary of a just-completed interview, off the request path."""
+    try:
+        summary = llm.generate_summary(session_data.get('history', []), session_data.get('scores'))
+    except Exception as e:
+        logger.error(f"Failed to precompute summary for session {session_id}: {e}")
+        return
+    store_summary(session_id, session_data, summary)
 
 # --- Flask App Setup ---
 app = Flask(__name__)
@@ -562,9 +1722,25 @@ else:
     # Development CORS - allow all
     CORS(app)
 
+# Warm question pool, refilled in the background within QUESTION_POOL_MAX_DAILY_CALLS
+question_pool = QuestionPool(
+    target_size=int(env_float('QUESTION_POOL_SIZE', 5)),
+    max_pools=int(env_float('QUESTION_POOL_MAX_POOLS', 50)),
+    max_daily_calls=int(env_float('QUESTION_POOL_MAX_DAILY_CALLS', CONSERVATIVE_API_LIMIT // 5))
+)
+
+# Evaluation batching: EVAL_BATCH_WINDOW_MS=0 sends every evaluation on its own
+EVAL_BATCH_WINDOW_MS = env_float('EVAL_BATCH_WINDOW_MS', 100)
+evaluation_batcher = None
+if EVAL_BATCH_WINDOW_MS:
+    evaluation_batcher = EvaluationBatcher(
+        window=EVAL_BATCH_WINDOW_MS / 1000,
+        max_batch_size=int(env_float('EVAL_BATCH_MAX_SIZE', 8))
+    )
+
 # Initialize Gemini bot
 try:
-    llm = GeminiInterviewBot()
+    llm = GeminiInterviewBot(question_pool=question_pool, evaluation_batcher=evaluation_batcher)
     if llm.development_mode:
         print(f"⚠️ Running in DEVELOPMENT MODE - using fallback responses")
         print(f"🔑 To use real AI responses, set a valid GOOGLE_API_KEY in .env file")
@@ -574,59 +1750,144 @@ except Exception as e:
     print("Please ensure you have set the GOOGLE_API_KEY environment variable")
     sys.exit(1)
 
+question_pool.generate = llm.generate_pool_question
+if evaluation_batcher:
+    evaluation_batcher.bot = llm
+for warm_role in filter(None, (r.strip() for r in os.getenv('QUESTION_POOL_WARM_ROLES', '').split(','))):
+    for warm_mode in ('technical', 'behavioral'):
+        question_pool.request_refill(warm_role, warm_mode)
+startup_timer.mark("llm")
+
+question_prefetcher = QuestionPrefetcher(
+    llm.prefetch_question, background_executor,
+    ttl=env_float('QUESTION_PREFETCH_TTL', 1800),
+    max_sessions=int(env_float('QUESTION_PREFETCH_MAX_SESSIONS', 1000))
+)
+
 def get_user_id():
     return str(uuid.uuid4())
 
+@app.before_request
+def start_request_metrics():
+    route = request.endpoint or 'unmatched'
+    g.request_started = time.perf_counter()
+    current_route.set(route)
+    g.request_span = tracer.start_span(
+        route, 'server', {"http.route": route, "http.request.method": request.method},
+        request.headers.get('traceparent')
+    )
+
+@app.teardown_request
+def record_request_metrics(exc):
+    # Runs after streamed responses finish, so SSE and NDJSON routes report their full duration
+    started = g.pop('request_started', None)
+    if started is not None:
+        metrics.observe('querybox_request_duration_seconds', time.perf_counter() - started,
+                        route=request.endpoint or 'unmatched')
+    span_and_token = g.pop('request_span', None)
+    if span_and_token is not None:
+        tracer.end_span(*span_and_token, error=exc)
+
+@app.after_request
+def tag_request_span(response):
+    span_and_token = g.get('request_span')
+    if span_and_token is not None:
+        span_and_token[0].set_attribute("http.response.status_code", response.status_code)
+    return response
+
+metrics.gauge('querybox_api_calls_today', 'Gemini calls counted against the daily quota.', api_quota.calls_today)
+metrics.gauge('querybox_gemini_calls_in_flight', 'Gemini calls on the wire in this worker.', lambda: gemini_calls.active)
+metrics.gauge('querybox_circuit_open', '1 while the Gemini circuit breaker rejects calls.', lambda: llm_breaker.rejecting())
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus scrape endpoint for this worker's metrics."""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/health')
 def health_check():
     """Endpoint for health check."""
-    global api_call_count, api_reset_time
+    quota = api_quota.usage()
     
     return jsonify({
         "status": "healthy",
         "ai_provider": "Google Gemini 2.0 Flash",
-        "supabase_connected": SUPABASE_AVAILABLE and supabase is not None,
+        "supabase_configured": SUPABASE_CONFIGURED,
+        # The client is built on the first session read or write, so this stays False until then
+        "supabase_connected": supabase_client.connected,
         "api_usage": {
-            "calls_today": api_call_count,
-            "limit": 200,  # Gemini 2.0 Flash free tier
-            "remaining": max(0, 200 - api_call_count),
-            "reset_time": api_reset_time.isoformat(),
+            "calls_today": quota["calls_today"],
+            "calls_last_minute": quota["calls_last_minute"],
+            "limit": DAILY_API_LIMIT,  # Gemini 2.0 Flash free tier
+            "remaining": max(0, DAILY_API_LIMIT - quota["calls_today"]),
+            "reset_time": quota["reset_time"],
             "cache_sizes": {
                 "questions": len(question_cache),
                 "evaluations": len(answer_cache)
             }
         },
+        "cache_stats": {
+            "questions": question_cache.stats(),
+            "evaluations": answer_cache.stats()
+        },
+        "question_prefetch": question_prefetcher.stats(),
+        "question_pool": question_pool.stats(),
+        "session_store": session_store.stats(),
+        "session_backend": session_backend.stats(),
+        "memory_sessions": sessions_memory.stats(),
+        "startup": startup_timer.report(),
+        "lazy_clients": {
+            "gemini": gemini_client.stats(),
+            "supabase": supabase_client.stats()
+        },
         "timestamp": datetime.now().isoformat()
     })
 
 @app.route('/admin/api-status')
 def api_status():
     """Detailed API usage status for monitoring."""
-    global api_call_count, api_reset_time
-    
-    hours_until_reset = (api_reset_time - datetime.now()).total_seconds() / 3600
-    
+    quota = api_quota.usage()
+    calls_today = quota["calls_today"]
+    circuit_open = llm_breaker.rejecting()
+    using_fallbacks = calls_today >= api_quota.rpd or circuit_open
+    hours_until_reset = quota["seconds_until_reset"] / 3600
+    question_stats = question_cache.stats()
+    answer_stats = answer_cache.stats()
+
     return jsonify({
         "api_usage": {
-            "calls_today": api_call_count,
-            "daily_limit": 200,  # Gemini 2.0 Flash free tier
-            "remaining_calls": max(0, 200 - api_call_count),
-            "usage_percentage": min(100, (api_call_count / 200) * 100),
-            "reset_time": api_reset_time.isoformat(),
+            "calls_today": calls_today,
+            "daily_limit": DAILY_API_LIMIT,  # Gemini 2.0 Flash free tier
+            "remaining_calls": max(0, DAILY_API_LIMIT - calls_today),
+            "usage_percentage": min(100, (calls_today / DAILY_API_LIMIT) * 100),
+            "reset_time": quota["reset_time"],
             "hours_until_reset": max(0, hours_until_reset)
         },
+        "quota": quota,
+        "scheduler": llm_scheduler.stats(),
+        "circuit_breaker": llm_breaker.stats(),
+        "single_flight": llm_single_flight.stats(),
+        "in_flight_calls": gemini_calls.stats(),
+        "token_usage": token_counter.stats(),
+        "tracing": tracer.stats(),
         "cache_status": {
-            "question_cache_size": len(question_cache),
-            "answer_cache_size": len(answer_cache),
-            "cache_hit_potential": "High" if len(question_cache) > 10 else "Medium" if len(question_cache) > 5 else "Low"
+            "question_cache_size": question_stats["entries"],
+            "answer_cache_size": answer_stats["entries"],
+            "question_cache": question_stats,
+            "answer_cache": answer_stats
         },
+        "question_prefetch": question_prefetcher.stats(),
+        "question_pool": question_pool.stats(),
+        "session_store": session_store.stats(),
+        "evaluation_batching": evaluation_batcher.stats() if evaluation_batcher else {"enabled": False},
         "fallback_status": {
-            "using_fallbacks": api_call_count >= 180,  # 90% of 200
-            "fallback_reason": "Approaching API limit" if api_call_count >= 180 else "Normal operation"
+            "using_fallbacks": using_fallbacks,
+            "fallback_reason": "Gemini circuit open" if circuit_open
+            else "Approaching API limit" if using_fallbacks else "Normal operation"
         },
         "recommendations": [
-            "Consider upgrading to paid tier" if api_call_count >= 180 else "API usage within normal range",
-            "Cache is helping reduce API calls" if len(question_cache) > 5 else "Consider enabling caching",
+            "Consider upgrading to paid tier" if using_fallbacks else "API usage within normal range",
+            "Cache is helping reduce API calls" if question_stats["hit_rate"] >= 0.2 else "Cache hit rate is low",
             f"Reset in {hours_until_reset:.1f} hours" if hours_until_reset > 0 else "Reset time passed"
         ]
     })
@@ -634,14 +1895,9 @@ def api_status():
 @app.route('/admin/clear-cache', methods=['POST'])
 def clear_cache():
     """Clear API response caches."""
-    global question_cache, answer_cache
-    
-    old_q_size = len(question_cache)
-    old_a_size = len(answer_cache)
-    
-    question_cache.clear()
-    answer_cache.clear()
-    
+    old_q_size = question_cache.clear()
+    old_a_size = answer_cache.clear()
+
     return jsonify({
         "message": "Cache cleared successfully",
         "cleared": {
@@ -650,19 +1906,23 @@ def clear_cache():
         }
     })
 
+@app.route('/admin/compact-cache', methods=['POST'])
+def compact_cache():
+    """Compact the persistent cache store."""
+    return jsonify({
+        "message": "Cache compacted successfully",
+        "removed": {
+            "questions": question_cache.compact(),
+            "evaluations": answer_cache.compact()
+        }
+    })
+
 @app.route('/start_interview', methods=['POST'])
 def start_interview():
     """API endpoint to start a new interview session."""
     try:
         data = request.get_json() or {}
-        role = data.get('role', 'Software Engineer')
-        mode = data.get('mode', 'technical')
-        num_questions = int(data.get('num_questions', 3))
-        
-        # Validate inputs
-        if mode not in ['technical', 'behavioral']:
-            mode = 'technical'
-        num_questions = min(max(num_questions, 1), 10)  # Limit 1-10
+        role, mode, num_questions = parse_interview_settings(data)
         
         user_id = get_user_id()
         session_id = str(uuid.uuid4())
@@ -675,34 +1935,17 @@ def start_interview():
             return jsonify({"error": "Failed to generate interview question. Please try again."}), 500
         
         # Create session data
-        session_data = {
-            "sessionId": session_id,
-            "userId": user_id,
-            "role": role,
-            "mode": mode,
-            "numQuestions": num_questions,
-            "history": [{
-                "question": first_q,
-                "answer": None,
-                "evaluation": None
-            }],
-            "currentQuestionIndex": 0,
-            "startTime": datetime.now().isoformat(),
-            "endTime": None
-        }
+        session_data = new_session_data(session_id, user_id, role, mode, num_questions, first_q)
         
         # Save session
         if not save_session_data(session_id, session_data):
             return jsonify({"error": "Failed to create session"}), 500
         
-        return jsonify({
-            "sessionId": session_id,
-            "question": first_q['question'],
-            "numQuestions": num_questions,
-            "questionNumber": 1,
-            "totalQuestions": num_questions,
-            "message": "Interview started successfully"
-        })
+        # Prepare question 2 while the user answers question 1
+        if not is_last_question(session_data):
+            question_prefetcher.schedule(session_id, role, mode, session_data['history'])
+        
+        return jsonify(start_interview_response(session_id, first_q, num_questions))
         
     except Exception as e:
         logger.error(f"Start interview error: {e}")
@@ -728,77 +1971,65 @@ def submit_answer():
         if not session_data:
             return jsonify({"error": "Session not found"}), 404
             
-        history = session_data.get('history', [])
-        current_index = session_data.get('currentQuestionIndex', 0)
-        num_questions = session_data.get('numQuestions', 3)
         role = session_data.get('role', 'Software Engineer')
         mode = session_data.get('mode', 'technical')
 
-        if current_index >= len(history):
-            return jsonify({"error": "No current question to answer"}), 400
-            
         # Get current question
-        current_question_data = history[current_index]['question']
-        question_text = current_question_data.get('question', '') if isinstance(current_question_data, dict) else str(current_question_data)
+        question_text = current_question_text(session_data)
+        if question_text is None:
+            return jsonify({"error": "No current question to answer"}), 400
+        
+        history = session_data.get('history', [])
+        last_question = is_last_question(session_data)
+        deadline = time.monotonic() + SUBMIT_ANSWER_DEADLINE
+        
+        # The next question only depends on earlier question text, so generate it
+        # while the answer is being evaluated
+        eval_future = llm_executor.submit(llm.evaluate_answer, question_text, user_answer, role)
+        question_future = None
+        if not last_question:
+            question_future = question_prefetcher.take(session_id, len(history))
+            if question_future is None:
+                question_future = llm_executor.submit(llm.generate_question, role, mode, list(history))
         
         # Evaluate answer
         try:
-            evaluation = llm.evaluate_answer(question_text, user_answer, role)
+            evaluation = result_before_deadline(
+                eval_future, deadline,
+                lambda: llm._get_smart_fallback_evaluation(user_answer), "Answer evaluation"
+            )
         except Exception as e:
             logger.error(f"Failed to evaluate answer: {e}")
-            evaluation = {
-                "feedback": "Thank you for your answer. Due to a technical issue, detailed feedback is not available.",
-                "score": 6,
-                "clarity": 6,
-                "correctness": 6,
-                "completeness": 6
-            }
+            evaluation = dict(TECHNICAL_ISSUE_EVALUATION)
 
         # Update history
-        history[current_index]['answer'] = user_answer
-        history[current_index]['evaluation'] = evaluation
-
-        next_index = current_index + 1
-        response_data = {
-            "message": "Answer submitted successfully",
-            "feedback": evaluation.get('feedback', 'No feedback available'),
-            "score": evaluation.get('score', 6),
-            "clarity": evaluation.get('clarity', 6),
-            "correctness": evaluation.get('correctness', 6),
-            "completeness": evaluation.get('completeness', 6)
-        }
+        response_data = record_answer(session_data, user_answer, evaluation)
         
         # Check if interview is complete
-        if next_index >= num_questions:
-            session_data['currentQuestionIndex'] = next_index
-            session_data['endTime'] = datetime.now().isoformat()
-            response_data['message'] = "Interview completed! Get your summary."
-            response_data['completed'] = True
+        if last_question:
+            complete_interview(session_data, response_data)
         else:
-            # Generate next question
+            # Collect next question
             try:
-                next_q = llm.generate_question(role=role, mode=mode, history=history)
-                history.append({
-                    "question": next_q,
-                    "answer": None,
-                    "evaluation": None
-                })
-                session_data['currentQuestionIndex'] = next_index
-                
-                response_data['nextQuestion'] = next_q.get('question', 'Question not available')
-                response_data['questionNumber'] = next_index + 1
-                response_data['totalQuestions'] = num_questions
-                response_data['completed'] = False
-                
+                next_q = result_before_deadline(
+                    question_future, deadline,
+                    lambda: llm._get_fallback_question(role, mode, history), "Next question"
+                )
+                advance_interview(session_data, response_data, next_q)
+                if not is_last_question(session_data):
+                    question_prefetcher.schedule(session_id, role, mode, session_data['history'])
             except Exception as e:
                 logger.error(f"Error generating next question: {e}")
-                session_data['currentQuestionIndex'] = num_questions
-                session_data['endTime'] = datetime.now().isoformat()
-                response_data['message'] = "Interview completed due to technical issue."
-                response_data['completed'] = True
+                complete_interview(session_data, response_data, technical_issue=True)
+        
+        if response_data.get('completed'):
+            question_prefetcher.discard(session_id)
         
         # Save updated session
-        save_session_data(session_id, session_data)
+        if not save_session_data(session_id, session_data):
+            return jsonify({"error": "This answer was already submitted from another request. Please refresh."}), 409
+        if response_data.get('completed'):
+            background_executor.submit(precompute_summary, session_id, copy.deepcopy(session_data))
         return jsonify(response_data)
         
     except Exception as e:
@@ -806,6 +2037,80 @@ def submit_answer():
         logger.error(traceback.format_exc())
         return jsonify({"error": "Failed to process answer"}), 500
 
+@app.route('/batch/evaluate', methods=['POST'])
+def batch_evaluate():
+    """Evaluate a list of {role, question, answer} items, streaming NDJSON results as they complete."""
+    data = request.get_json() or {}
+    items = data.get('items')
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "items must be a non-empty list"}), 400
+    if len(items) > BATCH_EVALUATE_MAX_ITEMS:
+        return jsonify({"error": f"At most {BATCH_EVALUATE_MAX_ITEMS} items per request"}), 400
+    
+    try:
+        concurrency = min(max(int(data.get('concurrency', BATCH_EVALUATE_CONCURRENCY)), 1), BATCH_EVALUATE_CONCURRENCY)
+    except (TypeError, ValueError):
+        concurrency = BATCH_EVALUATE_CONCURRENCY
+    
+    valid_items, invalid = [], []
+    for index, item in enumerate(items):
+        if isinstance(item, dict) and str(item.get('question', '')).strip() and str(item.get('answer', '')).strip():
+            valid_items.append((index, {
+                "role": str(item.get('role') or 'Software Engineer'),
+                "question": str(item['question']).strip(),
+                "answer": str(item['answer']).strip()
+            }))
+        else:
+            invalid.append(index)
+    
+    def generate():
+        for index in invalid:
+            yield json.dumps({"index": index, "error": "question and answer are required"}) + "\n"
+        evaluated = fallbacks = 0
+        for position, evaluation, cached, fallback in llm.evaluate_many([item for _, item in valid_items], concurrency):
+            evaluated += 1
+            fallbacks += fallback
+            yield json.dumps({
+                "index": valid_items[position][0], "cached": cached, "fallback": fallback, "evaluation": evaluation
+            }) + "\n"
+        yield json.dumps({"done": True, "evaluated": evaluated, "fallbacks": fallbacks, "errors": len(invalid)}) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/stream/evaluate', methods=['POST'])
+def stream_evaluate():
+    """Stream an answer evaluation as server-sent events: scores, feedback text, then the result."""
+    data = request.get_json() or {}
+    question_text = str(data.get('question', '')).strip()
+    user_answer = str(data.get('answer', '')).strip()
+    role = str(data.get('role') or 'Software Engineer')
+    
+    if not question_text or not user_answer:
+        return jsonify({"error": "question and answer are required"}), 400
+    
+    return sse_response(llm.stream_evaluation(question_text, user_answer, role))
+
+@app.route('/stream/summary/<session_id>', methods=['GET'])
+def stream_summary(session_id):
+    """Stream the final summary report as server-sent events."""
+    session_data, summary = load_for_summary(session_id)
+    if not session_data:
+        return jsonify({"error": "Session not found"}), 404
+    
+    def events():
+        if summary is not None:
+            stream = llm._replay_summary(summary)
+        else:
+            stream = llm.stream_summary(session_data.get('history', []), session_data.get('scores'))
+        for event, data in stream:
+            if event == "result":
+                if summary is None:
+                    store_summary(session_id, session_data, data)
+                data = add_summary_metadata(data, session_id, session_data)
+            yield event, data
+    
+    return sse_response(events())
+
 @app.route('/get_summary/<session_id>', methods=['GET'])
 def get_summary(session_id):
     """API endpoint to get the final summary report."""
@@ -813,44 +2118,62 @@ def get_summary(session_id):
         if not session_id:
             return jsonify({"error": "Session ID is required"}), 400
             
-        session_data = get_session_data(session_id)
+        # Finished sessions serve the summary stored at completion without touching the turns
+        session_data, summary = load_for_summary(session_id)
         if not session_data:
             return jsonify({"error": "Session not found"}), 404
         
-        history = session_data.get('history', [])
-        
-        try:
-            summary = llm.generate_summary(history)
-        except Exception as e:
-            logger.error(f"Failed to generate summary: {e}")
-            # Fallback summary
-            answered_questions = [h for h in history if h.get('answer')]
-            if answered_questions:
-                scores = [h['evaluation']['score'] for h in answered_questions if h.get('evaluation', {}).get('score')]
-                avg_score = f"{sum(scores)/len(scores):.1f}/10" if scores else "N/A"
-            else:
-                avg_score = "N/A"
-            
-            summary = {
-                "strengths": ["Completed interview session"],
-                "areas_for_improvement": ["Continue practicing"],
-                "suggested_resources": ["Technical interview guides"],
-                "final_score": avg_score
-            }
+        if summary is None:
+            history = session_data.get('history', [])
+            try:
+                summary = llm.generate_summary(history, session_data.get('scores'))
+            except Exception as e:
+                logger.error(f"Failed to generate summary: {e}")
+                summary = fallback_summary(history, session_data.get('scores'))
+            store_summary(session_id, session_data, summary)
 
         # Add metadata
-        summary['sessionId'] = session_id
-        summary['role'] = session_data.get('role')
-        summary['totalQuestions'] = len([h for h in history if h.get('answer')])
-        summary['completedAt'] = session_data.get('endTime')
-
-        return jsonify(summary)
+        return jsonify(add_summary_metadata(summary, session_id, session_data))
         
     except Exception as e:
         logger.error(f"Get summary error: {e}")
         logger.error(traceback.format_exc())
         return jsonify({"error": "Failed to generate summary"}), 500
 
+# --- Graceful Shutdown ---
+# Seconds a stopping worker waits for Gemini calls already on the wire
+SHUTDOWN_DRAIN_TIMEOUT = env_float('SHUTDOWN_DRAIN_TIMEOUT', 20.0)
+
+def drain(timeout: float = SHUTDOWN_DRAIN_TIMEOUT) -> bool:
+    """Finish running background tasks and Gemini calls, then flush sessions; True if all finished in time.
+
+    The server calls this once it has stopped taking requests (gunicorn's
+    worker_exit hook, the ASGI lifespan shutdown). Background work that has
+    not started yet is dropped and new Gemini calls fall back immediately, so
+    the wait is bounded by the work already running. Running tasks such as
+    precompute_summary may still save a session, so the store is closed last.
+    """
+    gemini_calls.draining = True
+    deadline = time.monotonic() + timeout
+    executors = (llm_executor, background_executor)
+    for executor in executors:
+        executor.shutdown(wait=False, cancel_futures=True)
+    drained = all([executor.wait_idle(max(0.0, deadline - time.monotonic())) for executor in executors])
+    drained = gemini_calls.wait_idle(max(0.0, deadline - time.monotonic())) and drained
+    if drained:
+        logger.info("✅ Background tasks and in-flight Gemini calls drained")
+    else:
+        logger.warning(f"⚠️ Background tasks or {gemini_calls.active} Gemini calls still running after {timeout}s "
+                       "- stopping anyway")
+    session_store.close()
+    tracer.flush()
+    return drained
+
+startup_timer.mark("routes")
+_startup = startup_timer.report()
+logger.info(f"⏱️ Module loaded in {_startup['total_ms']} ms " +
+            "(" + ", ".join(f"{phase} {ms} ms" for phase, ms in _startup['phases_ms'].items()) + ")")
+
 if __name__ == '__main__':
     print("\n" + "="*50)
     print("🚀 Interview Bot Backend API Starting...")
@@ -869,15 +2192,17 @@ if __name__ == '__main__':
         print(f"   {icon} {var}: {'Set' if status else 'Not Set'}")
     
     print(f"\n🧠 AI Provider: Google Gemini 2.0 Flash")
-    print(f"💾 Database: {'Supabase' if SUPABASE_AVAILABLE else 'In-Memory Storage'}")
+    print(f"💾 Database: {session_backend.name}")
     
     # Get port from environment or default to 5001
     port = int(os.getenv('PORT', 5001))
     host = '0.0.0.0' if os.getenv('FLASK_ENV') == 'production' else '127.0.0.1'
-    debug = os.getenv('FLASK_ENV') != 'production'
+    # The reloader runs the app in a second process whose background threads and shutdown drain
+    # are cut off on every restart, so debug is opt-in; serve production through start_server.py
+    debug = os.getenv('FLASK_DEBUG', '').lower() in ('1', 'true', 'yes')
     
     print(f"🌐 Server: http://{host}:{port}")
     print(f"🏥 Health: http://{host}:{port}/health")
     print("="*50 + "\n")
     
-    app.run(debug=debug, port=port, host=host)
+    app.run(debug=debug, use_reloader=debug, threaded=True, port=port, host=host)
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""ASGI entry point serving the interview endpoints with the async Gemini client.
+
+The LLM-bound routes (/start_interview, /submit_answer, /get_summary) run on
+AsyncGeminiInterviewBot so retries and backoff never block a worker thread.
+Every other path (/health, /admin/*) is handed to the existing Flask app.
+
+Run with:  uvicorn asgi:application --app-dir backend --workers 2
+or under gunicorn (see gunicorn.conf.py), or `python asgi.py` for the tuned uvicorn settings.
+"""
+import os
+import copy
+import uuid
+import asyncio
+import traceback
+import contextlib
+import functools
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app import (
+    app as flask_app,
+    logger,
+    AsyncGeminiInterviewBot,
+    TECHNICAL_ISSUE_EVALUATION,
+    SUBMIT_ANSWER_DEADLINE,
+    question_prefetcher,
+    question_pool,
+    evaluation_batcher,
+    get_user_id,
+    parse_interview_settings,
+    new_session_data,
+    start_interview_response,
+    current_question_text,
+    record_answer,
+    is_last_question,
+    advance_interview,
+    complete_interview,
+    fallback_summary,
+    add_summary_metadata,
+    load_for_summary,
+    store_summary,
+    precompute_summary,
+    background_executor,
+    drain,
+)
+from metrics import request_timer
+from sessions import get_session_data, save_session_data
+
+async_llm = AsyncGeminiInterviewBot(
+    call_timeout=float(os.getenv('GEMINI_CALL_TIMEOUT', 20)),
+    question_pool=question_pool,
+    evaluation_batcher=evaluation_batcher
+)
+
+# Paths served natively by the async routes; everything else goes to Flask
+ASYNC_PATH_PREFIXES = ('/start_interview', '/submit_answer', '/get_summary/')
+
+def _task_result(task: asyncio.Future, fallback, label: str):
+    """Return a finished task's result (re-raising its error) or the fallback if it missed the deadline."""
+    if not task.done():
+        task.cancel()
+        logger.warning(f"{label} missed the submit deadline - using fallback")
+        return fallback()
+    return task.result()
+
+def _timed(handler):
+    """Record the route's latency and trace it, labelling the stage metrics and spans taken while it runs."""
+    @functools.wraps(handler)
+    async def wrapper(request: Request):
+        with request_timer(handler.__name__, request.headers.get('traceparent')):
+            return await handler(request)
+    return wrapper
+
+async def _json_body(request: Request) -> dict:
+    try:
+        data = await request.json()
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+async def start_interview(request: Request) -> JSONResponse:
+    """API endpoint to start a new interview session."""
+    try:
+        role, mode, num_questions = parse_interview_settings(await _json_body(request))
+
+        user_id = get_user_id()
+        session_id = str(uuid.uuid4())
+
+        try:
+            first_q = await async_llm.generate_question(role=role, mode=mode, history=[])
+        except Exception as e:
+            logger.error(f"Failed to generate first question: {e}")
+            return JSONResponse({"error": "Failed to generate interview question. Please try again."}, status_code=500)
+
+        session_data = new_session_data(session_id, user_id, role, mode, num_questions, first_q)
+        if not await run_in_threadpool(save_session_data, session_id, session_data):
+            return JSONResponse({"error": "Failed to create session"}, status_code=500)
+
+        if not is_last_question(session_data):
+            question_prefetcher.schedule(session_id, role, mode, session_data['history'])
+
+        return JSONResponse(start_interview_response(session_id, first_q, num_questions))
+
+    except Exception as e:
+        logger.error(f"Start interview error: {e}")
+        logger.error(traceback.format_exc())
+        return JSONResponse({"error": "Failed to start interview. Please try again."}, status_code=500)
+
+async def submit_answer(request: Request) -> JSONResponse:
+    """API endpoint to submit an answer and get the next question."""
+    try:
+        data = await _json_body(request)
+        session_id = data.get('sessionId', '').strip()
+        user_answer = data.get('answer', '').strip()
+
+        if not session_id:
+            return JSONResponse({"error": "Session ID is required"}, status_code=400)
+        if not user_answer:
+            return JSONResponse({"error": "Answer cannot be empty"}, status_code=400)
+
+        session_data = await run_in_threadpool(get_session_data, session_id)
+        if not session_data:
+            return JSONResponse({"error": "Session not found"}, status_code=404)
+
+        role = session_data.get('role', 'Software Engineer')
+        mode = session_data.get('mode', 'technical')
+
+        question_text = current_question_text(session_data)
+        if question_text is None:
+            return JSONResponse({"error": "No current question to answer"}, status_code=400)
+
+        history = session_data.get('history', [])
+        last_question = is_last_question(session_data)
+
+        # Evaluate the answer and generate the next question concurrently under one deadline
+        eval_task = asyncio.ensure_future(async_llm.evaluate_answer(question_text, user_answer, role))
+        tasks = [eval_task]
+        if not last_question:
+            prefetched = question_prefetcher.take(session_id, len(history))
+            if prefetched is not None:
+                question_task = asyncio.wrap_future(prefetched)
+            else:
+                question_task = asyncio.ensure_future(async_llm.generate_question(role, mode, list(history)))
+            tasks.append(question_task)
+        await asyncio.wait(tasks, timeout=SUBMIT_ANSWER_DEADLINE)
+
+        try:
+            evaluation = _task_result(
+                eval_task, lambda: async_llm._get_smart_fallback_evaluation(user_answer), "Answer evaluation"
+            )
+        except Exception as e:
+            logger.error(f"Failed to evaluate answer: {e}")
+            evaluation = dict(TECHNICAL_ISSUE_EVALUATION)
+
+        response_data = record_answer(session_data, user_answer, evaluation)
+
+        if last_question:
+            complete_interview(session_data, response_data)
+        else:
+            try:
+                next_q = _task_result(
+                    question_task, lambda: async_llm._get_fallback_question(role, mode, history), "Next question"
+                )
+                advance_interview(session_data, response_data, next_q)
+                if not is_last_question(session_data):
+                    question_prefetcher.schedule(session_id, role, mode, session_data['history'])
+            except Exception as e:
+                logger.error(f"Error generating next question: {e}")
+                complete_interview(session_data, response_data, technical_issue=True)
+
+        if response_data.get('completed'):
+            question_prefetcher.discard(session_id)
+
+        if not await run_in_threadpool(save_session_data, session_id, session_data):
+            return JSONResponse(
+                {"error": "This answer was already submitted from another request. Please refresh."}, status_code=409
+            )
+        if response_data.get('completed'):
+            background_executor.submit(precompute_summary, session_id, copy.deepcopy(session_data))
+        return JSONResponse(response_data)
+
+    except Exception as e:
+        logger.error(f"Submit answer error: {e}")
+        logger.error(traceback.format_exc())
+        return JSONResponse({"error": "Failed to process answer"}, status_code=500)
+
+async def get_summary(request: Request) -> JSONResponse:
+    """API endpoint to get the final summary report."""
+    session_id = request.path_params['session_id']
+    try:
+        session_data, summary = await run_in_threadpool(load_for_summary, session_id)
+        if not session_data:
+            return JSONResponse({"error": "Session not found"}, status_code=404)
+
+        if summary is None:
+            history = session_data.get('history', [])
+            try:
+                summary = await async_llm.generate_summary(history, session_data.get('scores'))
+            except Exception as e:
+                logger.error(f"Failed to generate summary: {e}")
+                summary = fallback_summary(history, session_data.get('scores'))
+            await run_in_threadpool(store_summary, session_id, session_data, summary)
+
+        return JSONResponse(add_summary_metadata(summary, session_id, session_data))
+
+    except Exception as e:
+        logger.error(f"Get summary error: {e}")
+        logger.error(traceback.format_exc())
+        return JSONResponse({"error": "Failed to generate summary"}, status_code=500)
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    yield
+    # Requests have finished by now; wait for background Gemini calls off the event loop
+    await run_in_threadpool(drain)
+
+# Mirror the Flask CORS policy for the async routes
+if os.getenv('FLASK_ENV') == 'production':
+    allowed_origins = os.getenv('ALLOWED_ORIGINS', '').split(',')
+    cors_origins = allowed_origins if allowed_origins != [''] else ['*']
+else:
+    cors_origins = ['*']
+
+async_api = Starlette(
+    routes=[
+        Route('/start_interview', _timed(start_interview), methods=['POST']),
+        Route('/submit_answer', _timed(submit_answer), methods=['POST']),
+        Route('/get_summary/{session_id}', _timed(get_summary), methods=['GET']),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=cors_origins, allow_methods=['*'], allow_headers=['*'])],
+    lifespan=lifespan
+)
+wsgi_fallback = WSGIMiddleware(flask_app)
+
+async def application(scope, receive, send):
+    """Dispatch LLM-bound paths to the async routes and the rest to Flask."""
+    if scope['type'] != 'http' or scope['path'].startswith(ASYNC_PATH_PREFIXES):
+        await async_api(scope, receive, send)
+    else:
+        await wsgi_fallback(scope, receive, send)
+
+if __name__ == '__main__':
+    import uvicorn
+
+    port = int(os.getenv('PORT', 5001))
+    host = '0.0.0.0' if os.getenv('FLASK_ENV') == 'production' else '127.0.0.1'
+    workers = int(os.getenv('WEB_CONCURRENCY', 1))
+    print(f"🚀 Starting QueryBox AI async backend on http://{host}:{port} ({workers} workers)")
+    uvicorn.run(
+        'asgi:application' if workers > 1 else application,
+        host=host,
+        port=port,
+        workers=workers,
+        # Outlive the usual 60s load balancer idle timeout so it never reuses a closed connection
+        timeout_keep_alive=int(os.getenv('SERVER_KEEPALIVE', 75)),
+        # Open requests get this long after SIGTERM; the lifespan drain runs afterwards
+        timeout_graceful_shutdown=int(os.getenv('SERVER_GRACEFUL_TIMEOUT', 30)),
+        limit_concurrency=int(os.getenv('SERVER_WORKER_CONNECTIONS', 1000)),
+        app_dir=os.path.dirname(os.path.abspath(__file__))
+    )
@@ -0,0 +1,119 @@
+"""Circuit breaker that stops calling Gemini while most recent calls fail or time out."""
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Dict
+from collections import deque
+
+from config import env_float
+from scheduler import LLMOverloaded
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpen(LLMOverloaded):
+    """Raised instead of calling Gemini while the circuit breaker is open."""
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker over recent Gemini call outcomes.
+
+    The breaker opens when at least `min_calls` of the last `window` calls
+    were recorded and the share that failed or took longer than `slow_call`
+    seconds reaches `failure_rate`. While open every call is refused; after
+    `cooldown` seconds one probe is let through (half-open) and its outcome
+    closes or re-opens the circuit.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, window: int = 20, min_calls: int = 5, failure_rate: float = 0.5,
+                 slow_call: float = 10.0, cooldown: float = 30.0):
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call = slow_call
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self._outcomes = deque(maxlen=window)  # True for a bad (failed or slow) call
+        self._opened_at = 0.0
+        self._probe_started = None
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.transitions = deque(maxlen=20)
+
+    def rejecting(self) -> bool:
+        """True while open and still cooling down; does not take the half-open probe."""
+        with self._lock:
+            return self.state == self.OPEN and time.monotonic() - self._opened_at < self.cooldown
+
+    def allow(self) -> bool:
+        """Whether a call may go to Gemini now; takes the probe slot when half-open."""
+        now = time.monotonic()
+        with self._lock:
+            if self.state == self.OPEN and now - self._opened_at >= self.cooldown:
+                self._transition(self.HALF_OPEN, "cooldown elapsed")
+            if self.state == self.CLOSED:
+                return True
+            # A probe that never reported back (e.g. an abandoned stream) frees its slot after a cooldown
+            if self.state == self.HALF_OPEN and (self._probe_started is None or now - self._probe_started >= self.cooldown):
+                self._probe_started = now
+                return True
+            self.rejected += 1
+            return False
+
+    def release(self):
+        """Free a half-open probe slot taken by allow() for a call that never reached Gemini."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probe_started = None
+
+    def record(self, success: bool, latency: float = 0.0):
+        bad = not success or latency >= self.slow_call
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probe_started = None
+                if bad:
+                    self._open("probe failed" if not success else f"probe took {latency:.1f}s")
+                else:
+                    self._outcomes.clear()
+                    self._transition(self.CLOSED, "probe succeeded")
+                return
+            self._outcomes.append(bad)
+            if self.state == self.CLOSED and len(self._outcomes) >= self.min_calls:
+                bad_rate = sum(self._outcomes) / len(self._outcomes)
+                if bad_rate >= self.failure_rate:
+                    self._open(f"{bad_rate:.0%} of the last {len(self._outcomes)} calls failed or were slow")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            bad_rate = sum(self._outcomes) / len(self._outcomes) if self._outcomes else 0.0
+            return {
+                "state": self.state,
+                "recent_calls": len(self._outcomes),
+                "bad_call_rate": round(bad_rate, 3),
+                "failure_rate_threshold": self.failure_rate,
+                "slow_call_seconds": self.slow_call,
+                "cooldown_seconds": self.cooldown,
+                "seconds_until_probe": max(0.0, round(self.cooldown - (time.monotonic() - self._opened_at), 1))
+                if self.state == self.OPEN else 0.0,
+                "rejected": self.rejected,
+                "transitions": list(self.transitions)
+            }
+
+    def _open(self, reason: str):
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self._transition(self.OPEN, reason)
+
+    def _transition(self, state: str, reason: str):
+        logger.warning(f"⚡ Gemini circuit {self.state} -> {state}: {reason}")
+        self.transitions.append({"from": self.state, "to": state, "reason": reason, "at": datetime.now().isoformat()})
+        self.state = state
+
+llm_breaker = CircuitBreaker(
+    window=int(env_float('CIRCUIT_WINDOW', 20)),
+    min_calls=int(env_float('CIRCUIT_MIN_CALLS', 5)),
+    failure_rate=env_float('CIRCUIT_FAILURE_RATE', 0.5),
+    slow_call=env_float('CIRCUIT_SLOW_CALL_SECONDS', 10.0),
+    cooldown=env_float('CIRCUIT_COOLDOWN', 30.0)
+)
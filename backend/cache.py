@@ -0,0 +1,333 @@
+"""Response caches for generated questions and evaluations, with an optional SQLite tier."""
+import os
+import sys
+import json
+import time
+import logging
+import threading
+import hashlib
+import sqlite3
+import unicodedata
+from typing import Dict, List, Optional, Any
+from collections import OrderedDict
+
+from config import env_float, startup_timer
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class SQLiteCacheStore:
+    """File-backed cache tier in SQLite (WAL mode) shared by every worker on the host."""
+
+    def __init__(self, path: str, namespace: str):
+        self.path = path
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS cache_entries (
+            namespace TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            expires_at REAL,
+            accessed_at REAL NOT NULL,
+            PRIMARY KEY (namespace, key)
+        )""")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cache_entries_accessed ON cache_entries (namespace, accessed_at)"
+        )
+
+    def get(self, key: str) -> Optional[tuple]:
+        """Return (value, expires_at) for a live entry, or None."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] is not None and row[1] <= now:
+                self._conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key)
+                )
+                return None
+            self._conn.execute(
+                "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key)
+            )
+        return json.loads(row[0]), row[1]
+
+    def put(self, key: str, value: Any, expires_at: Optional[float]):
+        payload = json.dumps(value, default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, payload, expires_at, time.time())
+            )
+
+    def load(self, limit: int) -> List[tuple]:
+        """Return up to `limit` live entries, least recently used first, for warm start."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value, expires_at FROM cache_entries "
+                "WHERE namespace = ? AND (expires_at IS NULL OR expires_at > ?) "
+                "ORDER BY accessed_at DESC LIMIT ?",
+                (self.namespace, time.time(), limit)
+            ).fetchall()
+        entries = []
+        for key, payload, expires_at in reversed(rows):
+            try:
+                entries.append((key, json.loads(payload), expires_at))
+            except json.JSONDecodeError:
+                continue
+        return entries
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+
+    def compact(self, keep: int) -> int:
+        """Drop expired rows and everything beyond the `keep` most recently used; return rows removed."""
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND expires_at IS NOT NULL AND expires_at <= ?",
+                (self.namespace, time.time())
+            ).rowcount
+            removed += self._conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key NOT IN ("
+                "SELECT key FROM cache_entries WHERE namespace = ? ORDER BY accessed_at DESC LIMIT ?)",
+                (self.namespace, self.namespace, keep)
+            ).rowcount
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return removed
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (self.namespace,)
+            ).fetchone()[0]
+
+class ResponseCache:
+    """Thread-safe LRU cache with per-entry TTLs and entry/byte budgets.
+
+    An optional persistent store acts as a second tier: writes go through to it,
+    misses fall back to it, and it is used to warm the cache on startup.
+    """
+
+    def __init__(self, name: str, max_entries: int = 500, max_bytes: int = 2 * 1024 * 1024,
+                 default_ttl: Optional[float] = None, store: Optional[SQLiteCacheStore] = None,
+                 store_max_entries: Optional[int] = None, compact_every: int = 500):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.store = store
+        self.store_max_entries = store_max_entries or max_entries * 4
+        self.compact_every = compact_every
+        self._entries = OrderedDict()  # key -> (value, size, expires_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._writes_since_compact = 0
+        self.hits = 0
+        self.misses = 0
+        self.store_hits = 0
+        self.store_errors = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        if self.store:
+            self.warm_start()
+
+    def get(self, key: str, default=None):
+        """Return a cached value and mark it as recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, size, expires_at = entry
+                if expires_at is None or time.time() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    metrics.inc('querybox_cache_requests_total', cache=self.name, result='hit')
+                    return value
+                self._remove(key)
+                self.expirations += 1
+
+        if self.store:
+            try:
+                stored = self.store.get(key)
+            except Exception as e:
+                self.store_errors += 1
+                logger.warning(f"Cache store read failed for {self.name}: {e}")
+                stored = None
+            if stored is not None:
+                value, expires_at = stored
+                self._insert(key, value, expires_at)
+                with self._lock:
+                    self.hits += 1
+                    self.store_hits += 1
+                metrics.inc('querybox_cache_requests_total', cache=self.name, result='store_hit')
+                return value
+
+        with self._lock:
+            self.misses += 1
+        metrics.inc('querybox_cache_requests_total', cache=self.name, result='miss')
+        return default
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Store a value, evicting least recently used entries to stay within budget."""
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl else None
+        if not self._insert(key, value, expires_at):
+            return False
+
+        if self.store:
+            try:
+                self.store.put(key, value, expires_at)
+                self._writes_since_compact += 1
+                if self._writes_since_compact >= self.compact_every:
+                    self.compact()
+            except Exception as e:
+                self.store_errors += 1
+                logger.warning(f"Cache store write failed for {self.name}: {e}")
+        return True
+
+    def warm_start(self) -> int:
+        """Load the most recently used persisted entries into memory."""
+        try:
+            self.compact()
+            entries = self.store.load(self.max_entries)
+        except Exception as e:
+            self.store_errors += 1
+            logger.warning(f"Cache warm start failed for {self.name}: {e}")
+            return 0
+        for key, value, expires_at in entries:
+            self._insert(key, value, expires_at)
+        logger.info(f"♻️ Warm-started {self.name} cache with {len(entries)} entries from {self.store.path}")
+        return len(entries)
+
+    def compact(self) -> int:
+        """Trim the persistent store to its entry budget and drop expired rows."""
+        self._writes_since_compact = 0
+        if not self.store:
+            return 0
+        return self.store.compact(self.store_max_entries)
+
+    def clear(self) -> int:
+        """Drop every entry and return how many were removed."""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+        if self.store:
+            try:
+                self.store.clear()
+            except Exception as e:
+                self.store_errors += 1
+                logger.warning(f"Cache store clear failed for {self.name}: {e}")
+        return count
+
+    def stats(self) -> Dict:
+        """Return size and hit/miss/eviction counters for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+        if self.store:
+            stats["store"] = {
+                "backend": "sqlite",
+                "path": self.store.path,
+                "hits": self.store_hits,
+                "errors": self.store_errors
+            }
+        return stats
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _insert(self, key: str, value: Any, expires_at: Optional[float]) -> bool:
+        size = self._estimate_size(value)
+        if size > self.max_bytes:
+            logger.warning(f"Not caching {self.name} entry of {size} bytes (budget {self.max_bytes})")
+            return False
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expires_at)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+        return True
+
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    @staticmethod
+    def _estimate_size(value: Any) -> int:
+        try:
+            return len(json.dumps(value, default=str).encode('utf-8'))
+        except (TypeError, ValueError):
+            return sys.getsizeof(value)
+
+def normalize_text(text: str) -> str:
+    """Canonical form for cache keys: NFC, trimmed, single-spaced."""
+    return " ".join(unicodedata.normalize('NFC', text or "").split())
+
+def make_cache_key(kind: str, *parts: str) -> str:
+    """Build a process-independent cache key from a BLAKE2 digest of the parts."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        encoded = normalize_text(str(part)).encode('utf-8')
+        # Length-prefix each part so ("ab", "c") and ("a", "bc") never collide
+        digest.update(len(encoded).to_bytes(8, 'big'))
+        digest.update(encoded)
+    return f"{kind}_{digest.hexdigest()}"
+
+# Persistent cache tier: RESPONSE_CACHE_BACKEND=sqlite keeps cached Gemini output across restarts
+RESPONSE_CACHE_BACKEND = os.getenv('RESPONSE_CACHE_BACKEND', 'memory').lower()
+RESPONSE_CACHE_PATH = os.getenv(
+    'RESPONSE_CACHE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'querybox_cache.sqlite3')
+)
+
+def _make_cache_store(namespace: str) -> Optional[SQLiteCacheStore]:
+    """Create the configured persistent cache store, or None for memory-only caching."""
+    if RESPONSE_CACHE_BACKEND != 'sqlite':
+        return None
+    try:
+        return SQLiteCacheStore(RESPONSE_CACHE_PATH, namespace)
+    except Exception as e:
+        logger.error(f"❌ Failed to open cache store at {RESPONSE_CACHE_PATH}: {e} - using memory only")
+        return None
+
+question_cache = ResponseCache(
+    "questions",
+    max_entries=int(env_float('QUESTION_CACHE_MAX_ENTRIES', 500)),
+    max_bytes=int(env_float('QUESTION_CACHE_MAX_BYTES', 1024 * 1024)),
+    default_ttl=env_float('QUESTION_CACHE_TTL', 6 * 3600),
+    store=_make_cache_store("questions")
+)
+answer_cache = ResponseCache(
+    "evaluations",
+    max_entries=int(env_float('ANSWER_CACHE_MAX_ENTRIES', 2000)),
+    max_bytes=int(env_float('ANSWER_CACHE_MAX_BYTES', 4 * 1024 * 1024)),
+    default_ttl=env_float('ANSWER_CACHE_TTL', 24 * 3600),
+    store=_make_cache_store("evaluations")
+)
+startup_timer.mark("caches")
@@ -0,0 +1,100 @@
+"""Gemini and Supabase clients, imported and connected on first use."""
+import os
+import time
+import importlib.util
+import logging
+import threading
+from typing import Dict
+
+import config  # noqa: F401 - loads .env before the settings below are read
+
+logger = logging.getLogger(__name__)
+
+# --- Lazy Clients ---
+# google.generativeai and supabase are only probed here; they are imported and
+# their clients built on first use so cold starts can serve /health right away
+def _module_available(name: str) -> bool:
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ImportError:
+        return False
+
+GOOGLE_AI_AVAILABLE = _module_available('google.generativeai')
+if not GOOGLE_AI_AVAILABLE:
+    logger.error("Google AI not available. Install: pip install google-generativeai")
+
+SUPABASE_AVAILABLE = _module_available('supabase')
+if not SUPABASE_AVAILABLE:
+    logger.error("Supabase not available. Install: pip install supabase")
+
+class LazyClient:
+    """Build an expensive client once, on first `get()`, from any thread.
+
+    A failed build is remembered so callers fall back immediately instead of
+    retrying the import or handshake on every request.
+    """
+
+    def __init__(self, name: str, factory):
+        self.name = name
+        self.factory = factory
+        self._lock = threading.Lock()
+        self._client = None
+        self._built = False
+        self.error = None
+        self.init_ms = None
+
+    def get(self):
+        if self._built:
+            return self._client
+        with self._lock:
+            if not self._built:
+                started = time.perf_counter()
+                try:
+                    self._client = self.factory()
+                except Exception as e:
+                    self.error = str(e)
+                    logger.error(f"❌ {self.name} initialization failed: {e}")
+                self.init_ms = round((time.perf_counter() - started) * 1000, 1)
+                self._built = True
+        return self._client
+
+    @property
+    def connected(self) -> bool:
+        return self._built and self._client is not None
+
+    def stats(self) -> Dict:
+        return {
+            "initialized": self._built,
+            "connected": self.connected,
+            "init_ms": self.init_ms,
+            "error": self.error
+        }
+
+# --- Supabase Client Setup ---
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+SUPABASE_CONFIGURED = bool(SUPABASE_AVAILABLE and SUPABASE_URL and SUPABASE_KEY)
+if not SUPABASE_CONFIGURED:
+    logger.warning("⚠️ Supabase not configured. Using in-memory storage.")
+
+def _connect_supabase():
+    if not SUPABASE_CONFIGURED:
+        return None
+    from supabase import create_client
+    client = create_client(SUPABASE_URL, SUPABASE_KEY)
+    logger.info("✅ Supabase connected successfully")
+    return client
+
+supabase_client = LazyClient('supabase', _connect_supabase)
+
+GEMINI_MODEL_NAME = 'gemini-2.0-flash'
+
+def _connect_gemini():
+    import google.generativeai as genai
+    genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
+    # Use gemini-2.0-flash for better performance and quota limits
+    model = genai.GenerativeModel(GEMINI_MODEL_NAME)
+    logger.info("✅ Gemini API connected successfully (using 2.0 Flash model)")
+    return model
+
+gemini_client = LazyClient('gemini', _connect_gemini)
@@ -0,0 +1,138 @@
+"""Thread pool and call-coalescing helpers shared by the request path and background work."""
+import asyncio
+import contextvars
+import threading
+import copy
+from typing import Dict, Optional, Any
+from concurrent.futures import Future, ThreadPoolExecutor
+
+class SharedCallInterrupted(Exception):
+    """Raised to the followers of a shared call whose leader was cancelled or interrupted."""
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key onto one in-flight execution.
+
+    The first caller for a key runs the work; callers arriving while it is in
+    flight wait for its result (a private copy) or its exception. Sync and
+    async callers share the same registry, so a Flask thread and an ASGI task
+    asking for the same prompt still make one Gemini call.
+    """
+
+    def __init__(self):
+        self._calls = {}  # key -> Future of the leader's result
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn):
+        future, leader = self._join(key)
+        if not leader:
+            return copy.deepcopy(future.result())
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    async def do_async(self, key: str, coroutine_fn):
+        future, leader = self._join(key)
+        if not leader:
+            return copy.deepcopy(await asyncio.wrap_future(future))
+        try:
+            result = await coroutine_fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"in_flight": len(self._calls), "executed": self.executed, "coalesced": self.coalesced}
+
+    def _join(self, key: str) -> tuple:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self.executed += 1
+            return future, True
+
+    def _finish(self, key: str, future: Future, result: Any = None, error: Optional[BaseException] = None):
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is None:
+            future.set_result(result)
+        elif isinstance(error, Exception):
+            future.set_exception(error)
+        else:
+            # A cancelled leader must not cancel its followers; they fall back like any failed call
+            future.set_exception(SharedCallInterrupted(f"Shared call was interrupted: {type(error).__name__}"))
+
+llm_single_flight = SingleFlight()
+
+class InFlightCalls:
+    """Counts Gemini calls on the wire so shutdown can wait for them; refuses new ones while draining."""
+
+    def __init__(self):
+        self.active = 0
+        self.draining = False
+        self._idle = threading.Condition()
+
+    def __enter__(self):
+        with self._idle:
+            self.active += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        with self._idle:
+            self.active -= 1
+            if not self.active:
+                self._idle.notify_all()
+
+    def wait_idle(self, timeout: float) -> bool:
+        with self._idle:
+            return self._idle.wait_for(lambda: not self.active, timeout)
+
+    def stats(self) -> Dict:
+        return {"active": self.active, "draining": self.draining}
+
+gemini_calls = InFlightCalls()
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """Runs each task in a copy of the submitter's contextvars, so its metrics keep the request's route.
+
+    Also counts unfinished tasks so shutdown can wait for running ones with a timeout.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._unfinished = 0
+        self._idle = threading.Condition()
+
+    def submit(self, fn, *args, **kwargs):
+        with self._idle:
+            self._unfinished += 1
+        try:
+            future = super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+        except BaseException:
+            self._task_done(None)
+            raise
+        # Fires on completion and on cancellation alike
+        future.add_done_callback(self._task_done)
+        return future
+
+    def wait_idle(self, timeout: float) -> bool:
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._unfinished, timeout)
+
+    def _task_done(self, future):
+        with self._idle:
+            self._unfinished -= 1
+            if not self._unfinished:
+                self._idle.notify_all()
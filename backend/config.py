@@ -0,0 +1,54 @@
+"""Process-wide setup shared by the backend modules: .env loading, logging and startup timing.
+
+Every module imports this first, so the startup timer also covers the imports that follow it.
+"""
+import os
+import time
+_IMPORT_STARTED = time.perf_counter()
+import logging
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# --- Startup Timing ---
+class StartupTimer:
+    """Wall-clock cost of each import-time phase, logged once the module is loaded and shown on /health."""
+
+    def __init__(self, started: float):
+        self.started = started
+        self._last = started
+        self.phases = {}  # phase -> milliseconds, in load order
+
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        self.phases[phase] = round((now - self._last) * 1000, 1)
+        self._last = now
+
+    def report(self) -> Dict:
+        return {
+            "total_ms": round((self._last - self.started) * 1000, 1),
+            "phases_ms": dict(self.phases)
+        }
+
+startup_timer = StartupTimer(_IMPORT_STARTED)
+
+def env_float(name: str, default: Optional[float]) -> Optional[float]:
+    """Read an optional float from the environment, ignoring malformed values."""
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        logger.warning(f"Ignoring invalid value for {name}: {value}")
+        return default
+
+# Each worker schedules its share of the quota; ApiQuota still enforces the shared total
+WEB_CONCURRENCY = max(1, int(env_float('WEB_CONCURRENCY', 1)))
@@ -0,0 +1,40 @@
+"""Gunicorn settings for QueryBox, sized for an I/O-bound Gemini workload.
+
+Requests spend nearly all their time waiting on Gemini or the session store,
+so each worker process runs many threads (or an event loop) rather than
+adding processes. Run from the backend directory with either:
+
+    gunicorn -c gunicorn.conf.py app:app
+    SERVER_WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn -c gunicorn.conf.py asgi:application
+"""
+import os
+
+bind = f"{os.getenv('SERVER_HOST', '0.0.0.0')}:{os.getenv('PORT', 5001)}"
+
+# Processes; the app splits its per-worker Gemini scheduler by the same number
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+os.environ['WEB_CONCURRENCY'] = str(workers)
+
+# gthread serves the Flask app from a thread pool; UvicornWorker runs asgi:application
+worker_class = os.getenv('SERVER_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('SERVER_THREADS', 16))
+worker_connections = int(os.getenv('SERVER_WORKER_CONNECTIONS', 1000))
+
+# A request can wait SUBMIT_ANSWER_DEADLINE on Gemini plus a session save
+timeout = int(os.getenv('SERVER_TIMEOUT', 60))
+# Outlive the usual 60s load balancer idle timeout so it never reuses a closed connection
+keepalive = int(os.getenv('SERVER_KEEPALIVE', 75))
+# Time to finish open requests after SIGTERM; the drain below runs after that
+graceful_timeout = int(os.getenv('SERVER_GRACEFUL_TIMEOUT', 30))
+
+# Background threads (flusher, question pool, batcher) do not survive fork, so every worker imports the app itself
+preload_app = False
+
+accesslog = os.getenv('SERVER_ACCESS_LOG', '-')
+errorlog = '-'
+
+
+def worker_exit(server, worker):
+    """Let Gemini calls still running in background threads finish before the worker exits."""
+    from app import drain
+    drain()
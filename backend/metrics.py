@@ -0,0 +1,142 @@
+"""Prometheus metrics for the backend, plus the timers that label them with the route being served."""
+import time
+import logging
+import asyncio
+import bisect
+import contextlib
+import contextvars
+import threading
+from typing import Optional
+
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + "}"
+
+class Metrics:
+    """Process-local counters, gauges and latency histograms in the Prometheus text format.
+
+    Each worker process keeps its own series, so scrape every worker (or run
+    one per host) to see totals.
+    """
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._meta = {}  # name -> (type, help)
+        self._gauges = {}  # name -> callable returning the current value
+        self._counters = {}  # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> [count per bucket..., +Inf count, sum]
+
+    def counter(self, name: str, help_text: str):
+        self._meta[name] = ('counter', help_text)
+
+    def histogram(self, name: str, help_text: str):
+        self._meta[name] = ('histogram', help_text)
+
+    def gauge(self, name: str, help_text: str, read):
+        self._meta[name] = ('gauge', help_text)
+        self._gauges[name] = read
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            series = self._histograms.get(key)
+            if series is None:
+                series = self._histograms[key] = [0] * (len(self.BUCKETS) + 2)
+            series[bisect.bisect_left(self.BUCKETS, seconds)] += 1
+            series[-1] += seconds
+
+    @contextlib.contextmanager
+    def timer(self, name: str, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def render(self) -> str:
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((key, list(series)) for key, series in self._histograms.items())
+        lines = []
+        for name, (kind, help_text) in sorted(self._meta.items()):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == 'gauge':
+                try:
+                    lines.append(f"{name} {float(self._gauges[name]())}")
+                except Exception as e:
+                    logger.warning(f"Metric {name} unavailable: {e}")
+            elif kind == 'counter':
+                lines.extend(f"{name}{_format_labels(labels)} {value}" for (series, labels), value in counters if series == name)
+            else:
+                for (series, labels), counts in histograms:
+                    if series != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(self.BUCKETS + (None,), counts):
+                        cumulative += count
+                        le = '+Inf' if bound is None else f"{bound:g}"
+                        lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {counts[-1]:.6f}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+metrics.histogram('querybox_request_duration_seconds', 'End-to-end request latency by route.')
+metrics.histogram('querybox_stage_duration_seconds', 'Session load, session save and JSON parse latency by route.')
+metrics.histogram('querybox_llm_call_duration_seconds', 'Latency of each Gemini call attempt by route, kind and outcome.')
+metrics.counter('querybox_llm_retries_total', 'Gemini attempts retried after a backoff, by route.')
+metrics.counter('querybox_fallbacks_total', 'Fallback responses served instead of Gemini output, by route and kind.')
+metrics.counter('querybox_cache_requests_total', 'Response cache lookups by cache and result.')
+metrics.counter('querybox_quota_rejections_total', 'Gemini calls refused before or by the API, by reason.')
+
+# Route of the request being served; work started on its behalf inherits it
+current_route = contextvars.ContextVar('current_route', default='background')
+
+@contextlib.contextmanager
+def request_timer(route: str, traceparent: Optional[str] = None):
+    """Time and trace a request, labelling the stage metrics and spans recorded while it runs with its route."""
+    token = current_route.set(route)
+    try:
+        with metrics.timer('querybox_request_duration_seconds', route=route), \
+                tracer.span(route, 'server', {"http.route": route}, traceparent):
+            yield
+    finally:
+        current_route.reset(token)
+
+@contextlib.contextmanager
+def stage_timer(stage: str):
+    with metrics.timer('querybox_stage_duration_seconds', route=current_route.get(), stage=stage), tracer.span(stage):
+        yield
+
+@contextlib.contextmanager
+def llm_call_timer(kind: str):
+    started = time.perf_counter()
+    outcome = 'ok'
+    try:
+        yield
+    except (GeneratorExit, asyncio.CancelledError):
+        outcome = 'cancelled'
+        raise
+    except BaseException:
+        outcome = 'error'
+        raise
+    finally:
+        metrics.observe('querybox_llm_call_duration_seconds', time.perf_counter() - started,
+                        route=current_route.get(), kind=kind, outcome=outcome)
+
+def count_fallback(kind: str):
+    metrics.inc('querybox_fallbacks_total', route=current_route.get(), kind=kind)
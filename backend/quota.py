@@ -0,0 +1,127 @@
+"""Gemini API quota: sliding minute and day windows shared by every worker on the host."""
+import os
+import time
+import logging
+import threading
+import sqlite3
+from datetime import datetime
+from typing import Dict, Optional
+from collections import deque
+
+from config import env_float
+
+logger = logging.getLogger(__name__)
+
+# Rate limiting and caching
+DAILY_API_LIMIT = 200  # Gemini 2.0 Flash free tier limit
+CONSERVATIVE_API_LIMIT = int(DAILY_API_LIMIT * 0.9)  # Use 90% as buffer
+MINUTE_API_LIMIT = 15  # Gemini 2.0 Flash free tier requests per minute
+
+class ApiQuota:
+    """Sliding-window Gemini quota shared by every thread and, with a path, every worker.
+
+    Each reserved call is a timestamp. A call is allowed while fewer than `rpm`
+    calls fall in the last minute and fewer than `rpd` in the last day. With
+    `path` the log lives in SQLite and reservations are serialised by its
+    write lock, so all workers on the host draw from one budget.
+    """
+
+    MINUTE = 60
+    DAY = 24 * 3600
+
+    def __init__(self, rpm: int, rpd: int, path: Optional[str] = None):
+        self.rpm = rpm
+        self.rpd = rpd
+        self.path = path
+        self._lock = threading.Lock()
+        self._calls = deque()  # reservation timestamps when not backed by SQLite
+        self._conn = None
+        self.rejected = 0
+        if path:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS api_calls (ts REAL NOT NULL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_api_calls_ts ON api_calls (ts)")
+
+    def try_acquire(self) -> bool:
+        """Atomically reserve one call if both windows have room."""
+        now = time.time()
+        with self._lock:
+            if self._conn is None:
+                minute, day = self._counts_locked(now)
+                allowed = minute < self.rpm and day < self.rpd
+                if allowed:
+                    self._calls.append(now)
+            else:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    minute, day = self._counts_locked(now)
+                    allowed = minute < self.rpm and day < self.rpd
+                    if allowed:
+                        self._conn.execute("INSERT INTO api_calls (ts) VALUES (?)", (now,))
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            if not allowed:
+                self.rejected += 1
+            return allowed
+
+    def calls_today(self) -> int:
+        return self.usage()['calls_today']
+
+    def usage(self) -> Dict:
+        now = time.time()
+        with self._lock:
+            minute, day = self._counts_locked(now)
+            if self._conn is None:
+                oldest = self._calls[0] if self._calls else None
+            else:
+                oldest = self._conn.execute("SELECT MIN(ts) FROM api_calls WHERE ts > ?", (now - self.DAY,)).fetchone()[0]
+        # The window slides, so the next slot frees up when the oldest call ages out
+        reset_at = (oldest or now) + self.DAY
+        return {
+            "calls_last_minute": minute,
+            "calls_today": day,
+            "rpm_limit": self.rpm,
+            "rpd_limit": self.rpd,
+            "reset_time": datetime.fromtimestamp(reset_at).isoformat(),
+            "seconds_until_reset": max(0.0, reset_at - now),
+            "rejected": self.rejected,
+            "backend": "sqlite" if self._conn is not None else "memory"
+        }
+
+    def _counts_locked(self, now: float) -> tuple:
+        if self._conn is None:
+            while self._calls and self._calls[0] <= now - self.DAY:
+                self._calls.popleft()
+            minute = 0
+            for ts in reversed(self._calls):
+                if ts <= now - self.MINUTE:
+                    break
+                minute += 1
+            return minute, len(self._calls)
+        # Prune only inside try_acquire's write transaction; usage() stays a plain read
+        if self._conn.in_transaction:
+            self._conn.execute("DELETE FROM api_calls WHERE ts <= ?", (now - self.DAY,))
+        minute = self._conn.execute("SELECT COUNT(*) FROM api_calls WHERE ts > ?", (now - self.MINUTE,)).fetchone()[0]
+        day = self._conn.execute("SELECT COUNT(*) FROM api_calls WHERE ts > ?", (now - self.DAY,)).fetchone()[0]
+        return minute, day
+
+def _make_api_quota() -> ApiQuota:
+    """Create the shared quota, falling back to a per-process one if its file cannot be opened."""
+    rpm = int(env_float('API_QUOTA_RPM', MINUTE_API_LIMIT))
+    rpd = int(env_float('API_QUOTA_RPD', CONSERVATIVE_API_LIMIT))
+    if os.getenv('API_QUOTA_BACKEND', 'sqlite').lower() == 'sqlite':
+        path = os.getenv(
+            'API_QUOTA_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'querybox_quota.sqlite3')
+        )
+        try:
+            return ApiQuota(rpm, rpd, path)
+        except Exception as e:
+            logger.error(f"❌ Failed to open API quota store at {path}: {e} - quota is per process")
+    return ApiQuota(rpm, rpd)
+
+api_quota = _make_api_quota()
@@ -0,0 +1,126 @@
+"""Per-worker Gemini request scheduler: a priority queue in front of a token bucket."""
+import time
+import heapq
+import threading
+from typing import Dict, Optional
+
+from config import env_float, WEB_CONCURRENCY
+from quota import api_quota
+
+class LLMOverloaded(Exception):
+    """Raised when a Gemini call is shed because it could not start before its deadline."""
+
+class LLMScheduler:
+    """Token-bucket admission for Gemini calls, granted in priority order.
+
+    Each call takes one request token (refilled at `rpm` per minute, holding at
+    most `burst`) and, when `tpm` is set, its estimated size in TPM tokens.
+    A call whose projected wait already exceeds its kind's deadline is shed at
+    once so the caller can use its fallback; a queued call that runs out of
+    time is shed the same way.
+    """
+
+    PRIORITIES = {'first_question': 0, 'evaluation': 1, 'question': 1, 'summary': 2, 'background': 3}
+    DEADLINES = {'first_question': 10.0, 'evaluation': 15.0, 'question': 15.0, 'summary': 20.0, 'background': 60.0}
+
+    def __init__(self, rpm: float, burst: int = 3, tpm: Optional[float] = None):
+        self.rpm = rpm
+        self.burst = max(1, burst)
+        self.tpm = tpm
+        self._rate = rpm / 60.0
+        self._tpm_rate = tpm / 60.0 if tpm else None
+        self._tokens = float(self.burst)
+        self._tpm_tokens = float(tpm or 0)
+        self._updated = time.monotonic()
+        self._waiters = []  # heap of (priority, sequence)
+        self._sequence = 0
+        self._cond = threading.Condition()
+        self.granted = {}
+        self.shed = {}
+        self.penalties = 0
+        self.total_wait = 0.0
+
+    def acquire(self, kind: str, cost: int = 0) -> bool:
+        """Block until the call may start; False if it was shed instead."""
+        priority = self.PRIORITIES.get(kind, self.PRIORITIES['background'])
+        deadline = self.DEADLINES.get(kind, self.DEADLINES['background'])
+        cost = min(cost, self.tpm) if self.tpm else 0
+        with self._cond:
+            start = time.monotonic()
+            self._refill(start)
+            ahead = sum(1 for waiting, _ in self._waiters if waiting <= priority)
+            if self._projected_wait(ahead, cost) > deadline:
+                return self._shed(kind)
+            
+            self._sequence += 1
+            entry = (priority, self._sequence)
+            heapq.heappush(self._waiters, entry)
+            expires = start + deadline
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                at_head = self._waiters[0] == entry
+                wait = self._projected_wait(0, cost) if at_head else expires - now
+                if at_head and wait <= 0:
+                    heapq.heappop(self._waiters)
+                    self._tokens -= 1
+                    if self._tpm_rate:
+                        self._tpm_tokens -= cost
+                    self.granted[kind] = self.granted.get(kind, 0) + 1
+                    self.total_wait += now - start
+                    self._cond.notify_all()
+                    return True
+                remaining = expires - now
+                if remaining <= 0 or (at_head and wait > remaining):
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                    self._cond.notify_all()
+                    return self._shed(kind)
+                # Non-head waiters are woken whenever the head is granted or gives up
+                self._cond.wait(min(wait, remaining))
+
+    def penalize(self):
+        """Empty the bucket after a 429 so queued calls are spaced out instead of retrying together."""
+        with self._cond:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, 0.0)
+            self.penalties += 1
+
+    def stats(self) -> Dict:
+        with self._cond:
+            self._refill(time.monotonic())
+            granted = sum(self.granted.values())
+            return {
+                "rpm": self.rpm,
+                "burst": self.burst,
+                "tpm": self.tpm,
+                "tokens": round(self._tokens, 2),
+                "queued": len(self._waiters),
+                "granted": dict(self.granted),
+                "shed": dict(self.shed),
+                "penalties": self.penalties,
+                "avg_wait_seconds": round(self.total_wait / granted, 3) if granted else 0.0
+            }
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self._rate)
+        if self._tpm_rate:
+            self._tpm_tokens = min(float(self.tpm), self._tpm_tokens + elapsed * self._tpm_rate)
+
+    def _projected_wait(self, ahead: int, cost: int) -> float:
+        wait = max(0.0, ahead + 1 - self._tokens) / self._rate
+        if self._tpm_rate:
+            wait = max(wait, (cost - self._tpm_tokens) / self._tpm_rate)
+        return wait
+
+    def _shed(self, kind: str) -> bool:
+        self.shed[kind] = self.shed.get(kind, 0) + 1
+        return False
+
+llm_scheduler = LLMScheduler(
+    rpm=env_float('LLM_SCHEDULER_RPM', api_quota.rpm / WEB_CONCURRENCY),
+    burst=int(env_float('LLM_SCHEDULER_BURST', 3)),
+    tpm=env_float('LLM_SCHEDULER_TPM', 1000000 / WEB_CONCURRENCY) or None
+)
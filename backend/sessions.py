@@ -0,0 +1,714 @@
+"""Interview session storage: in-memory, Supabase and SQLite backends behind a caching SessionStore."""
+import os
+import json
+import time
+import logging
+import threading
+import hashlib
+import sqlite3
+import copy
+import atexit
+from typing import Dict, List, Optional
+from collections import OrderedDict
+
+from config import env_float, startup_timer, WEB_CONCURRENCY
+from tracing import tracer
+from metrics import stage_timer
+from clients import SUPABASE_CONFIGURED, supabase_client
+
+logger = logging.getLogger(__name__)
+
+# Scores an evaluation carries; compacted turns keep only these
+EVALUATION_SCORE_KEYS = ('score', 'clarity', 'correctness', 'completeness')
+
+# --- Helper Functions ---
+def _turn_digest(turn: Dict) -> str:
+    return hashlib.blake2b(json.dumps(turn, sort_keys=True, default=str).encode('utf-8'), digest_size=8).hexdigest()
+
+def _changed_turns(session_data: Dict) -> List[tuple]:
+    """Return (index, turn) for each history entry that differs from what was last persisted."""
+    persisted = session_data.get('_turn_digests') or []
+    changed = []
+    for index, turn in enumerate(session_data.get('history', [])):
+        if index >= len(persisted) or persisted[index] != _turn_digest(turn):
+            changed.append((index, turn))
+    return changed
+
+def _mark_turns_persisted(session_data: Dict):
+    session_data['_turn_digests'] = [_turn_digest(turn) for turn in session_data.get('history', [])]
+
+def _session_row(session_data: Dict, version: int) -> Dict:
+    """Session metadata as stored in the sessions table; history lives in session_turns."""
+    row = {key: value for key, value in session_data.items() if key != 'history' and not key.startswith('_')}
+    row['version'] = version
+    return row
+
+def _turn_rows(session_id: str, turns: List[tuple]) -> List[Dict]:
+    return [{
+        "sessionId": session_id,
+        "turn": index,
+        "question": turn.get('question'),
+        "answer": turn.get('answer'),
+        "evaluation": turn.get('evaluation')
+    } for index, turn in turns]
+
+def _without_history(session_data: Dict) -> Dict:
+    """Shallow view of a session with its turns left out, marked so it is never saved back."""
+    partial = {key: value for key, value in session_data.items() if key not in ('history', '_turn_digests')}
+    partial['history'] = []
+    partial['_partial'] = True
+    return partial
+
+def _compact_turn(turn: Dict) -> Dict:
+    """Keep what the summary needs from a finished turn: question text, a short answer and the scores."""
+    question = turn.get('question')
+    question_text = question.get('question', '') if isinstance(question, dict) else str(question or '')
+    evaluation = turn.get('evaluation')
+    if isinstance(evaluation, dict):
+        evaluation = {key: evaluation[key] for key in EVALUATION_SCORE_KEYS if key in evaluation}
+    answer = turn.get('answer')
+    return {
+        "question": {"question": question_text},
+        "answer": answer[:200] if isinstance(answer, str) else answer,
+        "evaluation": evaluation
+    }
+
+class SessionBackendUnavailable(Exception):
+    """Raised when the session backend cannot be reached, before anything was written to it."""
+
+class MemorySessions:
+    """Bounded in-process session storage, also the fallback when the primary backend fails.
+
+    Sessions idle for longer than `idle_ttl` seconds expire, the least recently
+    used ones are evicted beyond `max_sessions`, and finished interviews are
+    compacted to question text and scores once their summary is stored.
+    """
+
+    name = 'memory'
+    remote = False
+
+    def __init__(self, max_sessions: int = 10000, idle_ttl: Optional[float] = 6 * 3600):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self._sessions = OrderedDict()  # session_id -> (session dict, last access time)
+        self._lock = threading.Lock()
+        self.expired = 0
+        self.evicted = 0
+        self.compacted = 0
+
+    def load(self, session_id: str, include_history: bool = True) -> Optional[Dict]:
+        # Hand out a copy so concurrent requests cannot mutate each other's view
+        with self._lock:
+            self._expire_locked()
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            self._sessions[session_id] = (entry[0], time.monotonic())
+            self._sessions.move_to_end(session_id)
+            return copy.deepcopy(entry[0] if include_history else _without_history(entry[0]))
+
+    def save(self, session_id: str, session_data: Dict, changed: List[tuple]) -> bool:
+        """Copy the changed turns into storage if `version` still matches; bumps the version."""
+        expected_version = session_data.get('version') or 0
+        with self._lock:
+            self._expire_locked()
+            entry = self._sessions.get(session_id)
+            stored = entry[0] if entry is not None else None
+            if stored is not None and (stored.get('version') or 0) != expected_version:
+                logger.warning(f"Session {session_id} changed since version {expected_version} - save rejected")
+                return False
+            session_data['version'] = expected_version + 1
+            _mark_turns_persisted(session_data)
+            history = stored['history'] if stored is not None else []
+            del history[len(session_data.get('history', [])):]
+            for index, turn in changed:
+                if index < len(history):
+                    history[index] = copy.deepcopy(turn)
+                else:
+                    history.append(copy.deepcopy(turn))
+            stored = _session_row(session_data, session_data['version'])
+            if session_data.get('summary') and not session_data.get('compacted'):
+                history = [_compact_turn(turn) for turn in history]
+                stored['compacted'] = True
+                self.compacted += 1
+            stored['history'] = history
+            _mark_turns_persisted(stored)
+            self._sessions[session_id] = (stored, time.monotonic())
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evicted += 1
+        return True
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._expire_locked()
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "idle_ttl": self.idle_ttl,
+                "expired": self.expired,
+                "evicted": self.evicted,
+                "compacted": self.compacted
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def _expire_locked(self):
+        # Entries are kept in access order, so expired ones are always at the front
+        if not self.idle_ttl:
+            return
+        cutoff = time.monotonic() - self.idle_ttl
+        while self._sessions:
+            session_id, (_, last_access) = next(iter(self._sessions.items()))
+            if last_access > cutoff:
+                break
+            del self._sessions[session_id]
+            self.expired += 1
+
+sessions_memory = MemorySessions(
+    max_sessions=int(env_float('SESSION_MEMORY_MAX', 10000)),
+    idle_ttl=env_float('SESSION_MEMORY_TTL', 6 * 3600)
+)
+
+class SupabaseSessions:
+    """Sessions in Supabase: one `sessions` row plus one `session_turns` row per turn.
+
+    A save is one call to the `save_session` function, so the versioned row
+    and its changed turns are written in one round trip and one transaction.
+    Requires:
+
+        ALTER TABLE sessions ADD COLUMN version integer NOT NULL DEFAULT 0;
+        ALTER TABLE sessions ADD COLUMN scores jsonb, ADD COLUMN summary jsonb;
+        CREATE TABLE session_turns (
+            "sessionId" text REFERENCES sessions("sessionId") ON DELETE CASCADE,
+            turn integer NOT NULL,
+            question jsonb,
+            answer text,
+            evaluation jsonb,
+            PRIMARY KEY ("sessionId", turn)
+        );
+        CREATE OR REPLACE FUNCTION save_session(session_row jsonb, turn_rows jsonb, expected_version integer)
+        RETURNS boolean LANGUAGE plpgsql AS $$
+        DECLARE
+            s sessions := jsonb_populate_record(NULL::sessions, session_row);
+        BEGIN
+            IF expected_version = 0 THEN
+                INSERT INTO sessions VALUES (s.*)
+                ON CONFLICT ("sessionId") DO UPDATE SET
+                    ("userId", role, mode, "numQuestions", "currentQuestionIndex", "startTime", "endTime",
+                     scores, summary, version) =
+                    (EXCLUDED."userId", EXCLUDED.role, EXCLUDED.mode, EXCLUDED."numQuestions",
+                     EXCLUDED."currentQuestionIndex", EXCLUDED."startTime", EXCLUDED."endTime",
+                     EXCLUDED.scores, EXCLUDED.summary, EXCLUDED.version)
+                WHERE sessions.version = 0;
+            ELSE
+                UPDATE sessions SET
+                    ("userId", role, mode, "numQuestions", "currentQuestionIndex", "startTime", "endTime",
+                     scores, summary, version) =
+                    (s."userId", s.role, s.mode, s."numQuestions", s."currentQuestionIndex", s."startTime",
+                     s."endTime", s.scores, s.summary, s.version)
+                WHERE "sessionId" = s."sessionId" AND version = expected_version;
+            END IF;
+            IF NOT FOUND THEN
+                RETURN false;
+            END IF;
+            INSERT INTO session_turns ("sessionId", turn, question, answer, evaluation)
+            SELECT t."sessionId", t.turn, t.question, t.answer, t.evaluation
+            FROM jsonb_to_recordset(turn_rows)
+                AS t("sessionId" text, turn integer, question jsonb, answer text, evaluation jsonb)
+            ON CONFLICT ("sessionId", turn) DO UPDATE
+            SET question = EXCLUDED.question, answer = EXCLUDED.answer, evaluation = EXCLUDED.evaluation;
+            RETURN true;
+        END $$;
+    """
+
+    name = 'supabase'
+    remote = True
+
+    def _client(self):
+        client = supabase_client.get()  # connects on the first session read or write
+        if client is None:
+            raise SessionBackendUnavailable(f"Supabase unavailable: {supabase_client.error or 'not configured'}")
+        return client
+
+    def _table(self, name: str):
+        return self._client().table(name)
+
+    def _execute(self, query, operation: str, table: str):
+        with tracer.span(f"supabase {operation} {table}", 'client', {
+            "db.system": "postgresql", "db.operation.name": operation, "db.collection.name": table
+        }):
+            return query.execute()
+
+    def load(self, session_id: str, include_history: bool = True) -> Optional[Dict]:
+        columns = '*, session_turns(turn, question, answer, evaluation)' if include_history else '*'
+        query = self._table('sessions').select(columns).eq('sessionId', session_id)
+        response = self._execute(query, 'select', 'sessions')
+        if not response.data:
+            return None
+        session_data = response.data[0]
+        if not include_history:
+            return _without_history(session_data)
+        turns = sorted(session_data.pop('session_turns', None) or [], key=lambda row: row['turn'])
+        legacy_history = session_data.pop('history', None)
+        if turns:
+            session_data['history'] = [
+                {"question": row.get('question'), "answer": row.get('answer'), "evaluation": row.get('evaluation')}
+                for row in turns
+            ]
+            _mark_turns_persisted(session_data)
+        else:
+            # Sessions written before per-turn storage keep history as one JSON blob;
+            # leaving the digests empty migrates every turn on the next save
+            try:
+                session_data['history'] = json.loads(legacy_history or '[]')
+            except (json.JSONDecodeError, TypeError):
+                session_data['history'] = []
+        return session_data
+
+    def save(self, session_id: str, session_data: Dict, changed: List[tuple]) -> bool:
+        expected_version = session_data.get('version') or 0
+        # Compare-and-set on the row and the turn upsert commit together, or not at all
+        query = self._client().rpc('save_session', {
+            "session_row": _session_row(session_data, expected_version + 1),
+            "turn_rows": _turn_rows(session_id, changed),
+            "expected_version": expected_version
+        })
+        response = self._execute(query, 'call', 'save_session')
+        if not response.data:
+            logger.warning(f"Session {session_id} changed since version {expected_version} - save rejected")
+            return False
+        session_data['version'] = expected_version + 1
+        _mark_turns_persisted(session_data)
+        return True
+
+    def version(self, session_id: str) -> Optional[int]:
+        """Stored version of a session (None if it does not exist), reading only that column."""
+        query = self._table('sessions').select('version').eq('sessionId', session_id)
+        response = self._execute(query, 'select', 'sessions')
+        return (response.data[0].get('version') or 0) if response.data else None
+
+    def save_batch(self, sessions: List[Dict]):
+        """Upsert already-versioned sessions and their changed turns, one request per table."""
+        rows = [_session_row(session_data, session_data.get('version') or 0) for session_data in sessions]
+        turn_rows = []
+        for session_data in sessions:
+            turn_rows.extend(_turn_rows(session_data['sessionId'], _changed_turns(session_data)))
+        self._execute(self._table('sessions').upsert(rows, on_conflict='sessionId'), 'upsert', 'sessions')
+        if turn_rows:
+            query = self._table('session_turns').upsert(turn_rows, on_conflict='sessionId,turn')
+            self._execute(query, 'upsert', 'session_turns')
+        for session_data in sessions:
+            _mark_turns_persisted(session_data)
+
+    def stats(self) -> Dict:
+        return {"backend": self.name, **supabase_client.stats()}
+
+class SQLiteSessions:
+    """Sessions in a local SQLite file (WAL mode) shared by every worker on the host.
+
+    Same layout as Supabase - a versioned session row plus one row per turn -
+    but reads and compare-and-set writes are local transactions with no
+    network hop. sqlite3 reuses its compiled statements across calls.
+    """
+
+    name = 'sqlite'
+    remote = False
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stats_conn = None
+        self._stats_lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            data TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        )""")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS session_turns (
+            session_id TEXT NOT NULL,
+            turn INTEGER NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (session_id, turn)
+        )""")
+
+    def _span(self, operation: str):
+        # Covers the wait for this connection's lock as well as the transaction
+        return tracer.span(f"sqlite {operation} sessions", 'client', {
+            "db.system": "sqlite", "db.operation.name": operation, "db.namespace": self.path
+        })
+
+    def load(self, session_id: str, include_history: bool = True) -> Optional[Dict]:
+        with self._span('select'), self._lock:
+            # One read transaction so the row and its turns come from the same snapshot
+            self._conn.execute("BEGIN")
+            try:
+                row = self._conn.execute(
+                    "SELECT version, data FROM sessions WHERE session_id = ?", (session_id,)
+                ).fetchone()
+                turns = self._conn.execute(
+                    "SELECT data FROM session_turns WHERE session_id = ? ORDER BY turn", (session_id,)
+                ).fetchall() if row is not None and include_history else []
+            finally:
+                self._conn.execute("COMMIT")
+        if row is None:
+            return None
+        session_data = json.loads(row[1])
+        session_data['version'] = row[0]
+        if not include_history:
+            return _without_history(session_data)
+        session_data['history'] = [json.loads(turn[0]) for turn in turns]
+        _mark_turns_persisted(session_data)
+        return session_data
+
+    def save(self, session_id: str, session_data: Dict, changed: List[tuple]) -> bool:
+        expected_version = session_data.get('version') or 0
+        payload = json.dumps(_session_row(session_data, expected_version + 1), default=str)
+        turn_rows = [(session_id, index, json.dumps(turn, default=str)) for index, turn in changed]
+        with self._span('save'), self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if expected_version:
+                    updated = self._conn.execute(
+                        "UPDATE sessions SET version = ?, data = ?, updated_at = ? "
+                        "WHERE session_id = ? AND version = ?",
+                        (expected_version + 1, payload, time.time(), session_id, expected_version)
+                    ).rowcount
+                else:
+                    # A new session: if another request created it first, this save lost the race
+                    updated = self._conn.execute(
+                        "INSERT INTO sessions (session_id, version, data, updated_at) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT(session_id) DO NOTHING",
+                        (session_id, expected_version + 1, payload, time.time())
+                    ).rowcount
+                if not updated:
+                    self._conn.execute("ROLLBACK")
+                    logger.warning(f"Session {session_id} changed since version {expected_version} - save rejected")
+                    return False
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO session_turns (session_id, turn, data) VALUES (?, ?, ?)", turn_rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        session_data['version'] = expected_version + 1
+        _mark_turns_persisted(session_data)
+        return True
+
+    def stats(self) -> Dict:
+        # /health reads through its own connection: a WAL reader never waits on, or holds up, a session save
+        with self._stats_lock:
+            if self._stats_conn is None:
+                self._stats_conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            count = self._stats_conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        return {"backend": self.name, "path": self.path, "sessions": count}
+
+def _make_session_backend():
+    """Pick the primary session backend: SESSION_BACKEND, else Supabase when configured, else memory."""
+    backend = os.getenv('SESSION_BACKEND', '').lower()
+    if not backend:
+        backend = 'supabase' if SUPABASE_CONFIGURED else 'memory'
+    if backend == 'supabase':
+        if SUPABASE_CONFIGURED:
+            return SupabaseSessions()
+        logger.warning("⚠️ SESSION_BACKEND=supabase but Supabase is not configured - using memory")
+    elif backend == 'sqlite':
+        path = os.getenv(
+            'SESSION_DB_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'querybox_sessions.sqlite3')
+        )
+        try:
+            return SQLiteSessions(path)
+        except Exception as e:
+            logger.error(f"❌ Failed to open session database at {path}: {e} - using memory")
+    elif backend != 'memory':
+        logger.warning(f"Unknown SESSION_BACKEND '{backend}' - using memory")
+    return sessions_memory
+
+session_backend = _make_session_backend()
+logger.info(f"💾 Session backend: {session_backend.name}")
+
+def _load_session(session_id: str, include_history: bool = True) -> Optional[Dict]:
+    """Get session data from the session backend, falling back to memory"""
+    if session_backend is not sessions_memory:
+        try:
+            session_data = session_backend.load(session_id, include_history)
+            if session_data is not None:
+                return session_data
+        except Exception as e:
+            logger.error(f"{session_backend.name} session fetch error: {e}")
+    
+    return sessions_memory.load(session_id, include_history)
+
+def _save_session(session_id: str, session_data: Dict) -> bool:
+    """Save session data to the session backend or memory, writing only the turns that changed.
+
+    Writes are optimistic: `version` must still match the stored row, otherwise
+    another request saved first and False is returned without writing. History
+    is stored one row per turn, so a submit writes the answered turn and the
+    next question instead of the whole interview.
+
+    Memory only takes over when the backend could not be reached at all. Any
+    other error is raised: the write may have landed, and a memory copy would
+    fork the session from what the backend serves on the next read.
+    """
+    changed = _changed_turns(session_data)
+    
+    if session_backend is not sessions_memory:
+        try:
+            return session_backend.save(session_id, session_data, changed)
+        except SessionBackendUnavailable as e:
+            logger.error(f"{session_backend.name} session save error: {e}")
+    
+    # Fallback to memory
+    return sessions_memory.save(session_id, session_data, changed)
+
+class SessionStore:
+    """Session persistence with an in-process hot cache in front of a remote session backend.
+
+    In "sync" mode every save is written through before the request returns,
+    and a cached copy is only served after a version-only read confirms no
+    other worker has saved since; that read skips the turn rows. In
+    "write-behind" mode saves are acknowledged once cached and a background
+    thread flushes dirty sessions in batched upserts every `flush_interval`
+    seconds (and at shutdown). Write-behind trusts the cache outright, so it
+    requires a session's requests to stay on one worker (sticky routing).
+    Dirty sessions cannot be evicted, so while flushes fail at most
+    `max_dirty` of them are held; past that, saves of other sessions are
+    written through as in sync mode.
+    """
+
+    def __init__(self, write_mode: str = 'sync', max_cached: int = 1000,
+                 flush_interval: float = 1.0, flush_batch_size: int = 50, max_dirty: Optional[int] = None):
+        self.write_mode = write_mode
+        self.max_cached = max_cached
+        self.max_dirty = min(max_dirty or max_cached, max_cached)
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+        self._cache = OrderedDict()  # session_id -> session dict
+        self._dirty = set()
+        self._flushing = set()  # taken off _dirty by the flush in progress
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flusher = None
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.conflicts = 0
+        self.write_throughs = 0
+        self.flushes = 0
+        self.flushed_sessions = 0
+        self.flush_errors = 0
+
+    @property
+    def caching(self) -> bool:
+        # Memory-only storage is already in-process; only remote storage needs a hot cache
+        return bool(session_backend.remote and self.max_cached > 0)
+
+    def get(self, session_id: str, include_history: bool = True) -> Optional[Dict]:
+        if not self.caching:
+            return _load_session(session_id, include_history)
+        with self._lock:
+            cached = self._cache.get(session_id)
+            if cached is not None:
+                self._cache.move_to_end(session_id)
+                cached = copy.deepcopy(cached)
+        if cached is not None and self.write_mode == 'sync' and not self._is_current(session_id, cached):
+            # Another worker saved since this copy was cached
+            with self._lock:
+                self.stale += 1
+                if (self._cache.get(session_id) or {}).get('version') == cached.get('version'):
+                    del self._cache[session_id]
+            cached = None
+        if cached is not None:
+            with self._lock:
+                self.hits += 1
+            return cached if include_history else _without_history(cached)
+        with self._lock:
+            self.misses += 1
+        session_data = _load_session(session_id, include_history)
+        if not include_history:
+            # Partial sessions are never cached; the cache must be able to serve full reads
+            return session_data
+        if session_data is not None:
+            with self._lock:
+                # Keep a newer cached copy if another request saved meanwhile
+                current = self._cache.get(session_id)
+                if current is None or (current.get('version') or 0) < (session_data.get('version') or 0):
+                    self._put_locked(session_id, copy.deepcopy(session_data))
+        return session_data
+
+    def save(self, session_id: str, session_data: Dict) -> bool:
+        if not self.caching:
+            return _save_session(session_id, session_data)
+
+        expected_version = session_data.get('version') or 0
+        if self.write_mode == 'write-behind':
+            with self._lock:
+                cached = self._cache.get(session_id)
+                if cached is not None and (cached.get('version') or 0) != expected_version:
+                    self.conflicts += 1
+                    logger.warning(f"Session {session_id} changed since version {expected_version} - save rejected")
+                    return False
+                behind = (session_id in self._dirty or session_id in self._flushing
+                          or len(self._dirty) < self.max_dirty)
+                if behind:
+                    session_data['version'] = expected_version + 1
+                    # Marked dirty first so making room in the cache cannot evict it
+                    self._dirty.add(session_id)
+                    self._put_locked(session_id, copy.deepcopy(session_data))
+                else:
+                    # Flushes are not keeping up; a clean session's stored version matches its cached one
+                    self.write_throughs += 1
+            if behind:
+                self._ensure_flusher()
+                return True
+
+        if not _save_session(session_id, session_data):
+            with self._lock:
+                self.conflicts += 1
+                # Drop the stale copy so the client's retry reads the current row
+                self._cache.pop(session_id, None)
+            return False
+        with self._lock:
+            self._put_locked(session_id, copy.deepcopy(session_data))
+        return True
+
+    def flush(self) -> int:
+        """Write every dirty session to the session backend; returns how many were written."""
+        with self._flush_lock:
+            with self._lock:
+                pending = [(sid, copy.deepcopy(self._cache[sid])) for sid in self._dirty if sid in self._cache]
+                self._flushing = set(self._dirty)
+                self._dirty.clear()
+            written = 0
+            for start in range(0, len(pending), self.flush_batch_size):
+                batch = pending[start:start + self.flush_batch_size]
+                try:
+                    session_backend.save_batch([session for _, session in batch])
+                    written += len(batch)
+                    self._mark_flushed(batch)
+                except Exception as e:
+                    self.flush_errors += 1
+                    logger.error(f"Session flush failed for {len(batch)} sessions: {e}")
+                    with self._lock:
+                        self._dirty.update(sid for sid, _ in batch)
+            with self._lock:
+                self._flushing = set()
+            if pending:
+                self.flushes += 1
+                self.flushed_sessions += written
+            return written
+
+    def close(self):
+        """Stop the flusher and write out anything still dirty."""
+        self._stop.set()
+        if self._dirty:
+            flushed = self.flush()
+            logger.info(f"💾 Flushed {flushed} sessions on shutdown")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "write_mode": self.write_mode if self.caching else "memory",
+                "cached": len(self._cache),
+                "max_cached": self.max_cached,
+                "dirty": len(self._dirty),
+                "max_dirty": self.max_dirty,
+                "write_throughs": self.write_throughs,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "conflicts": self.conflicts,
+                "flushes": self.flushes,
+                "flushed_sessions": self.flushed_sessions,
+                "flush_errors": self.flush_errors
+            }
+
+    def _is_current(self, session_id: str, cached: Dict) -> bool:
+        try:
+            return session_backend.version(session_id) == (cached.get('version') or 0)
+        except Exception as e:
+            logger.error(f"{session_backend.name} session version check error: {e}")
+            return False
+
+    def _put_locked(self, session_id: str, session_data: Dict):
+        self._cache[session_id] = session_data
+        self._cache.move_to_end(session_id)
+        if len(self._cache) <= self.max_cached:
+            return
+        # Evict least recently used clean sessions; dirty ones (and those being flushed) wait for the flush
+        for candidate in list(self._cache):
+            if len(self._cache) <= self.max_cached:
+                break
+            if candidate not in self._dirty and candidate not in self._flushing:
+                del self._cache[candidate]
+
+    def _mark_flushed(self, batch: List[tuple]):
+        # Record which turns are now stored so the next flush only writes newer ones
+        with self._lock:
+            for sid, flushed in batch:
+                cached = self._cache.get(sid)
+                if cached is not None and cached.get('version') == flushed.get('version'):
+                    cached['_turn_digests'] = flushed['_turn_digests']
+
+    def _ensure_flusher(self):
+        with self._lock:
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(target=self._flush_loop, name="session-flusher", daemon=True)
+                self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            if self._dirty:
+                self.flush()
+
+SESSION_WRITE_MODE = os.getenv('SESSION_WRITE_MODE', 'sync').lower()
+if SESSION_WRITE_MODE not in ('sync', 'write-behind'):
+    logger.warning(f"Unknown SESSION_WRITE_MODE '{SESSION_WRITE_MODE}' - using sync")
+    SESSION_WRITE_MODE = 'sync'
+# Write-behind upserts without a version check, so with several workers it
+# loses updates unless the load balancer pins each session to one worker
+SESSION_STICKY_ROUTING = os.getenv('SESSION_STICKY_ROUTING', '').lower() in ('1', 'true', 'yes')
+if SESSION_WRITE_MODE == 'write-behind' and WEB_CONCURRENCY > 1 and not SESSION_STICKY_ROUTING:
+    logger.error(f"❌ SESSION_WRITE_MODE=write-behind needs sticky routing with {WEB_CONCURRENCY} workers - using sync "
+                 "(set SESSION_STICKY_ROUTING=1 once each session is pinned to one worker)")
+    SESSION_WRITE_MODE = 'sync'
+
+session_store = SessionStore(
+    write_mode=SESSION_WRITE_MODE,
+    max_cached=int(env_float('SESSION_CACHE_MAX', 1000)),
+    flush_interval=env_float('SESSION_FLUSH_INTERVAL', 1.0),
+    flush_batch_size=int(env_float('SESSION_FLUSH_BATCH_SIZE', 50)),
+    max_dirty=int(env_float('SESSION_MAX_DIRTY', 0)) or None
+)
+atexit.register(session_store.close)
+
+def get_session_data(session_id: str, include_history: bool = True) -> Optional[Dict]:
+    """Get session data from the session store; without history the read skips every turn row"""
+    if not session_id:
+        return None
+    with stage_timer('session_load'):
+        return session_store.get(session_id, include_history)
+
+def save_session_data(session_id: str, session_data: Dict) -> bool:
+    """Save session data through the session store"""
+    if not session_id or not session_data:
+        return False
+    if session_data.get('_partial'):
+        # Saving a history-less read would look like every turn was deleted
+        logger.error(f"Refusing to save session {session_id} loaded without history")
+        return False
+    with stage_timer('session_save'):
+        return session_store.save(session_id, session_data)
+startup_timer.mark("sessions")
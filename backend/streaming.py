@@ -0,0 +1,92 @@
+"""Incremental JSON field extraction for streamed Gemini responses."""
+import json
+import re
+from typing import List
+
+def _read_partial_json_string(text: str) -> tuple:
+    """Decode the longest complete prefix of a JSON string body.
+
+    `text` starts just after the opening quote. Returns (decoded, closed, consumed)
+    where `consumed` counts raw characters including the closing quote if present.
+    """
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if ch == '"':
+            return json.loads('"' + text[:i] + '"'), True, i + 1
+        if ch == '\\':
+            width = 6 if text[i + 1:i + 2] == 'u' else 2
+            if i + width > len(text):
+                break
+            i += width
+            continue
+        i += 1
+    return json.loads('"' + text[:i] + '"'), False, i
+
+class StreamingJSONScanner:
+    """Pulls fields out of a JSON object while it is still streaming in.
+
+    feed() returns (kind, field, value) tuples for anything newly readable:
+    ("number", field, n) once a number is terminated, ("text", field, delta) as a
+    string grows, and ("item", field, text) for each completed string in a list.
+    """
+
+    def __init__(self, number_fields=(), text_fields=(), list_fields=()):
+        self.text = ""
+        self.number_fields = number_fields
+        self.text_fields = text_fields
+        self.list_fields = list_fields
+        self._numbers_seen = set()
+        self._text_emitted = {field: 0 for field in text_fields}
+        self._items_emitted = {field: 0 for field in list_fields}
+
+    def feed(self, chunk: str) -> List[tuple]:
+        self.text += chunk
+        events = []
+
+        for field in self.number_fields:
+            if field in self._numbers_seen:
+                continue
+            # Require a terminator so "1" is not reported while "10" is still arriving
+            match = re.search(rf'"{field}"\s*:\s*(-?\d+(?:\.\d+)?)\s*[,}}\n]', self.text)
+            if match:
+                self._numbers_seen.add(field)
+                events.append(("number", field, float(match.group(1))))
+
+        for field in self.text_fields:
+            match = re.search(rf'"{field}"\s*:\s*"', self.text)
+            if not match:
+                continue
+            decoded, _, _ = _read_partial_json_string(self.text[match.end():])
+            emitted = self._text_emitted[field]
+            if len(decoded) > emitted:
+                events.append(("text", field, decoded[emitted:]))
+                self._text_emitted[field] = len(decoded)
+
+        for field in self.list_fields:
+            match = re.search(rf'"{field}"\s*:\s*\[', self.text)
+            if not match:
+                continue
+            items = self._complete_list_items(self.text[match.end():])
+            for item in items[self._items_emitted[field]:]:
+                events.append(("item", field, item))
+            self._items_emitted[field] = len(items)
+
+        return events
+
+    @staticmethod
+    def _complete_list_items(text: str) -> List[str]:
+        items, pos = [], 0
+        while pos < len(text):
+            ch = text[pos]
+            if ch in ' \t\r\n,':
+                pos += 1
+            elif ch == '"':
+                decoded, closed, consumed = _read_partial_json_string(text[pos + 1:])
+                if not closed:
+                    break
+                items.append(decoded)
+                pos += 1 + consumed
+            else:
+                break
+        return items
@@ -0,0 +1,22 @@
+import os
+import sys
+import time
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Importing the app builds the shared quota; keep it off the on-disk quota file
+os.environ.setdefault('API_QUOTA_BACKEND', 'memory')
+
+
+@pytest.fixture
+def wait_for():
+    """Poll `condition` until it holds, failing the test after `timeout` seconds."""
+    def wait(condition, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            assert time.monotonic() < deadline, "condition not met in time"
+            time.sleep(0.01)
+    return wait
@@ -0,0 +1,99 @@
+import time
+
+from breaker import CircuitBreaker
+
+
+def _breaker(**overrides):
+    settings = dict(window=4, min_calls=4, failure_rate=0.5, slow_call=1.0, cooldown=0.05)
+    settings.update(overrides)
+    return CircuitBreaker(**settings)
+
+
+def test_stays_closed_until_enough_calls_are_recorded():
+    breaker = _breaker()
+
+    for _ in range(3):
+        breaker.record(False)
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_opens_when_the_bad_call_rate_reaches_the_threshold():
+    breaker = _breaker()
+
+    breaker.record(True)
+    breaker.record(True, latency=0.1)
+    breaker.record(False)
+    breaker.record(True, latency=2.0)  # slow calls count as bad
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.rejecting()
+    assert not breaker.allow()
+    assert breaker.stats()['rejected'] == 1
+
+
+def test_half_open_lets_one_probe_through_after_the_cooldown():
+    breaker = _breaker()
+    for _ in range(4):
+        breaker.record(False)
+
+    time.sleep(0.06)
+
+    assert not breaker.rejecting()
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()  # the probe slot is taken
+
+
+def test_successful_probe_closes_the_circuit():
+    breaker = _breaker()
+    for _ in range(4):
+        breaker.record(False)
+    time.sleep(0.06)
+    assert breaker.allow()
+
+    breaker.record(True, latency=0.1)
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.stats()['recent_calls'] == 0
+    assert [t['to'] for t in breaker.transitions] == ['open', 'half_open', 'closed']
+
+
+def test_failed_or_slow_probe_reopens_the_circuit():
+    for outcome in ({'success': False}, {'success': True, 'latency': 2.0}):
+        breaker = _breaker()
+        for _ in range(4):
+            breaker.record(False)
+        time.sleep(0.06)
+        assert breaker.allow()
+
+        breaker.record(**outcome)
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.rejecting()
+
+
+def test_abandoned_probe_frees_its_slot_after_a_cooldown():
+    breaker = _breaker()
+    for _ in range(4):
+        breaker.record(False)
+    time.sleep(0.06)
+    assert breaker.allow()
+
+    time.sleep(0.06)
+
+    assert breaker.allow()
+
+
+def test_released_probe_goes_to_the_next_caller():
+    breaker = _breaker()
+    for _ in range(4):
+        breaker.record(False)
+    time.sleep(0.06)
+    assert breaker.allow()
+
+    breaker.release()
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
@@ -0,0 +1,133 @@
+import pytest
+
+import cache
+from cache import ResponseCache, SQLiteCacheStore, make_cache_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(cache.time, 'time', lambda: now[0])
+    return now
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    response_cache = ResponseCache("test", max_entries=2)
+    response_cache.set('a', 1)
+    response_cache.set('b', 2)
+    assert response_cache.get('a') == 1  # 'b' is now the oldest
+
+    response_cache.set('c', 3)
+
+    assert response_cache.get('b') is None
+    assert response_cache.get('a') == 1
+    assert response_cache.get('c') == 3
+    assert response_cache.stats()['evictions'] == 1
+
+
+def test_entries_expire_after_their_ttl(clock):
+    response_cache = ResponseCache("test", default_ttl=60)
+    response_cache.set('default', 'x')
+    response_cache.set('short', 'y', ttl=5)
+
+    clock[0] += 10
+    assert response_cache.get('short', 'missing') == 'missing'
+    assert response_cache.get('default') == 'x'
+
+    clock[0] += 60
+    assert response_cache.get('default') is None
+    stats = response_cache.stats()
+    assert stats['expirations'] == 2
+    assert stats['entries'] == 0
+
+
+def test_byte_budget_evicts_and_rejects_oversized_values():
+    response_cache = ResponseCache("test", max_bytes=100)
+    response_cache.set('a', 'x' * 40)
+    response_cache.set('b', 'y' * 40)
+    response_cache.set('c', 'z' * 40)  # three 42-byte values do not fit
+
+    assert response_cache.get('a') is None
+    assert response_cache.stats()['bytes'] <= 100
+
+    assert not response_cache.set('huge', 'w' * 200)
+    assert response_cache.get('huge') is None
+
+
+def test_replacing_a_key_keeps_byte_accounting_exact():
+    response_cache = ResponseCache("test")
+    response_cache.set('a', 'x' * 10)
+    response_cache.set('a', 'x' * 20)
+
+    assert len(response_cache) == 1
+    assert response_cache.stats()['bytes'] == 22
+
+
+def test_stats_count_hits_and_misses_and_clear_empties_the_cache():
+    response_cache = ResponseCache("test")
+    response_cache.set('a', {"question": "q"})
+    response_cache.get('a')
+    response_cache.get('nope')
+
+    stats = response_cache.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate']) == (1, 1, 0.5)
+    assert response_cache.clear() == 1
+    assert response_cache.stats()['bytes'] == 0
+
+
+def test_cache_keys_ignore_whitespace_and_unicode_form():
+    composed = make_cache_key("eval", "model", "What is  a\theap?", "caf\u00e9")
+    decomposed = make_cache_key("eval", "model", " What is a heap? ", "cafe\u0301")
+
+    assert composed == decomposed
+    assert composed.startswith("eval_")
+    assert composed != make_cache_key("eval", "model", "What is a heap?", "cafe")
+
+
+def test_cache_key_parts_are_length_prefixed():
+    assert make_cache_key("eval", "ab", "c") != make_cache_key("eval", "a", "bc")
+    assert make_cache_key("eval", "a") != make_cache_key("question", "a")
+
+
+def test_sqlite_tier_warm_starts_a_new_cache_per_namespace(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    questions = ResponseCache("questions", store=SQLiteCacheStore(path, "questions"))
+    questions.set('q', {"question": "What is a heap?"})
+    ResponseCache("evaluations", store=SQLiteCacheStore(path, "evaluations")).set('q', {"score": 7})
+
+    restarted = ResponseCache("questions", store=SQLiteCacheStore(path, "questions"))
+
+    assert len(restarted) == 1
+    assert restarted.get('q') == {"question": "What is a heap?"}
+
+
+def test_memory_miss_falls_back_to_the_store(tmp_path):
+    response_cache = ResponseCache("test", max_entries=1, store=SQLiteCacheStore(str(tmp_path / 'c.sqlite3'), "test"))
+    response_cache.set('a', 1)
+    response_cache.set('b', 2)  # evicts 'a' from memory only
+
+    assert response_cache.get('a') == 1
+    assert response_cache.stats()['store']['hits'] == 1
+
+
+def test_expired_rows_are_not_served_or_loaded(clock, tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    response_cache = ResponseCache("test", default_ttl=60, store=SQLiteCacheStore(path, "test"))
+    response_cache.set('a', 1)
+    clock[0] += 61
+
+    assert response_cache.store.get('a') is None
+    assert len(ResponseCache("test", store=SQLiteCacheStore(path, "test"))) == 0
+
+
+def test_compact_keeps_the_most_recently_used_rows(clock, tmp_path):
+    store = SQLiteCacheStore(str(tmp_path / 'cache.sqlite3'), "test")
+    for key in ('a', 'b', 'c'):
+        clock[0] += 1
+        store.put(key, key, None)
+    clock[0] += 1
+    store.get('a')
+
+    assert store.compact(keep=2) == 1
+    assert store.get('b') is None
+    assert store.count() == 2
@@ -0,0 +1,107 @@
+import contextvars
+
+import pytest
+
+from app import EvaluationBatcher
+from metrics import current_route
+
+
+class FakeBot:
+    def __init__(self, batch_error=None):
+        self.batch_error = batch_error
+        self.batches = []
+        self.singles = []
+
+    def _evaluate_batch_uncached(self, items):
+        self.batches.append(items)
+        if self.batch_error:
+            raise self.batch_error
+        return [{"score": len(answer), "feedback": question} for question, answer, _ in items]
+
+    def _evaluate_uncached(self, question_text, user_answer, role):
+        self.singles.append((question_text, user_answer, role))
+        return {"score": len(user_answer), "feedback": question_text}
+
+
+def _batcher(bot, **kwargs):
+    batcher = EvaluationBatcher(**kwargs)
+    batcher.bot = bot
+    return batcher
+
+
+def test_answers_within_one_window_share_a_call_and_keep_their_order():
+    bot = FakeBot()
+    batcher = _batcher(bot, window=0.2)
+
+    futures = [batcher.submit(f"q{i}", "a" * i, "SE") for i in range(1, 4)]
+
+    assert [future.result(2) for future in futures] == [
+        {"score": 1, "feedback": "q1"}, {"score": 2, "feedback": "q2"}, {"score": 3, "feedback": "q3"}
+    ]
+    assert len(bot.batches) == 1
+    stats = batcher.stats()
+    assert (stats['batches'], stats['batched_items'], stats['avg_batch_size']) == (1, 3, 3.0)
+
+
+def test_a_lone_answer_is_evaluated_on_its_own():
+    bot = FakeBot()
+    batcher = _batcher(bot, window=0.01)
+
+    assert batcher.submit("q", "answer", "SE").result(2) == {"score": 6, "feedback": "q"}
+    assert bot.batches == []
+    assert batcher.stats()['single_calls'] == 1
+
+
+def test_batches_are_capped_at_max_batch_size():
+    bot = FakeBot()
+    batcher = _batcher(bot, window=0.2, max_batch_size=2)
+
+    futures = [batcher.submit(f"q{i}", "a", "SE") for i in range(4)]
+
+    for future in futures:
+        future.result(2)
+    assert [len(items) for items in bot.batches] == [2, 2]
+
+
+def test_failed_batch_falls_back_to_individual_evaluations():
+    bot = FakeBot(batch_error=ValueError("unparseable"))
+    batcher = _batcher(bot, window=0.2)
+
+    futures = [batcher.submit(f"q{i}", "a" * i, "SE") for i in range(1, 3)]
+
+    assert [future.result(2)['score'] for future in futures] == [1, 2]
+    assert len(bot.singles) == 2
+    assert batcher.stats()['fallbacks'] == 1
+
+
+def test_single_evaluation_errors_reach_the_caller():
+    class FailingBot(FakeBot):
+        def _evaluate_uncached(self, question_text, user_answer, role):
+            raise RuntimeError("quota")
+
+    bot = FailingBot()
+    batcher = _batcher(bot, window=0.01)
+
+    with pytest.raises(RuntimeError):
+        batcher.submit("q", "a", "SE").result(2)
+
+
+def test_calls_keep_the_route_of_the_request_that_queued_them():
+    bot = FakeBot()
+    routes = []
+    evaluate = bot._evaluate_uncached
+
+    def recording(question_text, user_answer, role):
+        routes.append(current_route.get())
+        return evaluate(question_text, user_answer, role)
+
+    bot._evaluate_uncached = recording
+    batcher = _batcher(bot, window=0.01)
+
+    def submit():
+        current_route.set('/submit_answer')
+        return batcher.submit("q", "answer", "SE")
+
+    contextvars.copy_context().run(submit).result(2)
+
+    assert routes == ['/submit_answer']
@@ -0,0 +1,28 @@
+import contextvars
+import threading
+
+from concurrency import ContextThreadPoolExecutor
+
+route = contextvars.ContextVar('route', default=None)
+
+
+def test_tasks_run_in_the_submitters_context():
+    executor = ContextThreadPoolExecutor(max_workers=1)
+    route.set('/submit_answer')
+
+    assert executor.submit(route.get).result(timeout=2) == '/submit_answer'
+    executor.shutdown()
+
+
+def test_wait_idle_waits_for_running_tasks_and_counts_cancelled_ones():
+    executor = ContextThreadPoolExecutor(max_workers=1)
+    release = threading.Event()
+    running = executor.submit(release.wait, 2)
+    queued = executor.submit(lambda: None)
+
+    assert not executor.wait_idle(0.05)
+    executor.shutdown(wait=False, cancel_futures=True)
+    assert queued.cancelled()
+    release.set()
+    assert executor.wait_idle(2)
+    assert running.result() is True
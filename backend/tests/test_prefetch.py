@@ -0,0 +1,83 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import app
+from app import QuestionPrefetcher
+
+
+@pytest.fixture
+def executor():
+    pool = ThreadPoolExecutor(max_workers=2)
+    yield pool
+    pool.shutdown(wait=True)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(app.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def _generate(role, mode, history):
+    return {"question": f"{role} {mode} question {len(history) + 1}"}
+
+
+def test_prefetched_question_is_served_for_the_turn_it_was_built_for(executor):
+    prefetcher = QuestionPrefetcher(_generate, executor)
+    prefetcher.schedule('s1', 'SE', 'technical', [{"question": "q1"}])
+
+    future = prefetcher.take('s1', 1)
+
+    assert future.result(2) == {"question": "SE technical question 2"}
+    assert prefetcher.take('s1', 1) is None  # taken once
+    stats = prefetcher.stats()
+    assert (stats['hits'], stats['misses'], stats['pending']) == (1, 1, 0)
+
+
+def test_prefetch_for_another_turn_is_a_miss_and_is_cancelled(executor):
+    release = threading.Event()
+    prefetcher = QuestionPrefetcher(lambda *args: release.wait(2), executor)
+    prefetcher.schedule('s1', 'SE', 'technical', [])  # occupies a worker
+    prefetcher.schedule('s2', 'SE', 'technical', [])
+    prefetcher.schedule('s3', 'SE', 'technical', [])  # still queued
+    pending = prefetcher._pending['s3'][1]
+
+    assert prefetcher.take('s3', 2) is None
+    assert pending.cancelled()
+    release.set()
+
+
+def test_rescheduling_a_session_replaces_its_prefetch(executor):
+    prefetcher = QuestionPrefetcher(_generate, executor)
+    prefetcher.schedule('s1', 'SE', 'technical', [])
+    prefetcher.schedule('s1', 'SE', 'technical', [{"question": "q1"}])
+
+    assert prefetcher.stats()['pending'] == 1
+    assert prefetcher.take('s1', 1).result(2) == {"question": "SE technical question 2"}
+
+
+def test_old_and_excess_prefetches_are_dropped(clock, executor):
+    prefetcher = QuestionPrefetcher(_generate, executor, ttl=60, max_sessions=2)
+    for session_id in ('s1', 's2', 's3'):
+        prefetcher.schedule(session_id, 'SE', 'technical', [])
+    assert prefetcher.take('s1', 0) is None
+
+    clock[0] += 61
+    stats = prefetcher.stats()
+    assert stats['pending'] == 0
+    assert stats['expired'] == 3
+
+
+def test_submit_answer_uses_the_question_prefetched_at_start():
+    client = app.app.test_client()
+    hits = app.question_prefetcher.stats()['hits']
+    started = client.post('/start_interview', json={'role': 'SE', 'num_questions': 3}).get_json()
+
+    response = client.post('/submit_answer', json={'sessionId': started['sessionId'], 'answer': 'A hash map.'})
+
+    assert response.status_code == 200
+    assert response.get_json()['nextQuestion']
+    assert app.question_prefetcher.stats()['hits'] == hits + 1
@@ -0,0 +1,133 @@
+import itertools
+from collections import deque
+
+import app
+from app import QuestionPool
+from cache import ResponseCache
+
+
+def _pool(target_size=2, **kwargs):
+    pool = QuestionPool(target_size=target_size, **kwargs)
+    counter = itertools.count(1)
+    pool.generate = lambda role, mode, avoid: {"question": f"{role} {mode} question {next(counter)}"}
+    return pool
+
+
+def test_refill_tops_the_pool_up_to_its_target(wait_for):
+    pool = _pool(target_size=3)
+    pool.request_refill('SE', 'technical')
+
+    wait_for(lambda: pool.stats()['pooled_questions'] == 3 and pool.stats()['pending_refills'] == 0)
+    assert pool.stats()['generated'] == 3
+
+
+def test_draw_skips_questions_the_session_was_already_asked(wait_for):
+    pool = _pool()
+    pool.request_refill('SE', 'technical')
+    wait_for(lambda: pool.stats()['pooled_questions'] == 2)
+
+    history = [{"question": {"question": "SE technical question 1"}}]
+    drawn = pool.draw('se ', 'technical', history)  # role keys are normalized
+
+    assert drawn['question'] == "SE technical question 2"
+    assert drawn['id']
+    assert pool.stats()['hits'] == 1
+
+
+def test_draw_from_an_empty_pool_is_a_miss():
+    pool = QuestionPool()
+
+    assert pool.draw('SE', 'technical', []) is None
+    assert pool.stats()['misses'] == 1
+
+
+def test_refills_stop_at_the_daily_call_budget(monkeypatch):
+    monkeypatch.setattr(app.api_quota, 'calls_today', lambda: 90)
+    pool = _pool(max_daily_calls=90)
+
+    pool._refill('SE', 'technical', pool._key('SE', 'technical'))
+
+    assert pool.stats()['generated'] == 0
+
+
+def test_least_recently_used_pool_is_dropped_past_max_pools(wait_for):
+    pool = _pool(target_size=1, max_pools=2)
+    for role in ('A', 'B', 'C'):
+        pool.request_refill(role, 'technical')
+        wait_for(lambda: pool.stats()['pending_refills'] == 0)
+
+    assert pool.stats()['pools'] == 2
+    assert pool.draw('A', 'technical', []) is None
+
+
+def test_refill_stops_when_the_model_repeats_a_pooled_question():
+    pool = _pool(target_size=3)
+    pool.generate = lambda role, mode, avoid: {"question": "What is a hash map?"}
+
+    pool._refill('SE', 'technical', pool._key('SE', 'technical'))
+
+    stats = pool.stats()
+    assert stats['pooled_questions'] == 1
+    assert stats['generated'] == 2
+    assert stats['duplicates'] == 1
+
+
+def test_zero_target_size_disables_the_pool():
+    pool = _pool(target_size=0)
+    pool.request_refill('SE', 'technical')
+
+    assert pool.stats()['pending_refills'] == 0
+    assert pool.draw('SE', 'technical', []) is None
+
+
+def test_drawn_questions_stay_pooled_for_other_sessions(wait_for):
+    pool = _pool()
+    pool.request_refill('SE', 'technical')
+    wait_for(lambda: pool.stats()['pooled_questions'] == 2 and pool.stats()['pending_refills'] == 0)
+
+    first = pool.draw('SE', 'technical', [])
+    second = pool.draw('SE', 'technical', [])  # another session starts on the other question
+    third = pool.draw('SE', 'technical', [])
+
+    assert [q['question'] for q in (first, second, third)] == [
+        "SE technical question 1", "SE technical question 2", "SE technical question 1"
+    ]
+    stats = pool.stats()
+    assert (stats['pooled_questions'], stats['generated'], stats['pending_refills']) == (2, 2, 0)
+
+
+def test_a_session_that_has_seen_the_whole_pool_queues_a_top_up(wait_for):
+    pool = _pool()
+    pool._pools[pool._key('SE', 'technical')] = ('SE', deque([{"question": "Seen question"}]))
+
+    assert pool.draw('SE', 'technical', [{"question": {"question": "Seen question"}}]) is None
+    wait_for(lambda: pool.stats()['pooled_questions'] == 2 and pool.stats()['pending_refills'] == 0)
+    assert pool.stats()['misses'] == 1
+
+
+def test_refill_errors_are_counted(wait_for):
+    pool = _pool()
+
+    def failing(role, mode, avoid):
+        raise RuntimeError("gemini down")
+
+    pool.generate = failing
+    pool.request_refill('SE', 'technical')
+
+    wait_for(lambda: pool.stats()['pending_refills'] == 0)
+    assert pool.stats()['refill_errors'] == 1
+
+
+
+def test_a_cached_question_is_served_without_touching_the_pool(monkeypatch, wait_for):
+    pool = _pool(target_size=1)
+    pool.request_refill('SE', 'technical')
+    wait_for(lambda: pool.stats()['pooled_questions'] == 1)
+    cache = ResponseCache("questions")
+    cache.set("question_SE_technical_0", {"question": "Cached question", "category": "technical"})
+    monkeypatch.setattr(app, 'question_cache', cache)
+    bot = app.GeminiInterviewBot(question_pool=pool)
+    bot.development_mode = False
+
+    assert bot.generate_question('SE', 'technical', [])['question'] == "Cached question"
+    assert (pool.stats()['hits'], pool.stats()['misses']) == (0, 0)
@@ -0,0 +1,86 @@
+import time
+
+import pytest
+
+import app
+import quota
+from breaker import CircuitBreaker
+from quota import ApiQuota
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(quota.time, 'time', lambda: now[0])
+    return now
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_quota(request, tmp_path):
+    def make(rpm, rpd):
+        return ApiQuota(rpm, rpd, str(tmp_path / 'quota.sqlite3') if request.param == 'sqlite' else None)
+    return make
+
+
+def test_minute_window_limits_calls_until_the_oldest_ages_out(clock, make_quota):
+    api_quota = make_quota(rpm=2, rpd=100)
+
+    assert api_quota.try_acquire()
+    clock[0] += 30
+    assert api_quota.try_acquire()
+    assert not api_quota.try_acquire()
+
+    clock[0] += 31  # the first call is now more than a minute old
+    assert api_quota.try_acquire()
+    assert not api_quota.try_acquire()
+
+    usage = api_quota.usage()
+    assert usage['calls_last_minute'] == 2
+    assert usage['calls_today'] == 3
+    assert usage['rejected'] == 2
+
+
+def test_day_window_slides_instead_of_resetting_at_midnight(clock, make_quota):
+    api_quota = make_quota(rpm=100, rpd=2)
+    first_call = clock[0]
+    assert api_quota.try_acquire()
+    clock[0] += 3600
+    assert api_quota.try_acquire()
+
+    clock[0] += 3600
+    assert not api_quota.try_acquire()
+    assert api_quota.usage()['seconds_until_reset'] == pytest.approx(first_call + ApiQuota.DAY - clock[0])
+
+    clock[0] = first_call + ApiQuota.DAY + 1
+    assert api_quota.try_acquire()
+    assert api_quota.calls_today() == 2
+
+
+def test_sqlite_quota_is_shared_by_every_instance_on_the_path(clock, tmp_path):
+    path = str(tmp_path / 'quota.sqlite3')
+    worker_a, worker_b = ApiQuota(10, 3, path), ApiQuota(10, 3, path)
+
+    assert worker_a.try_acquire()
+    assert worker_b.try_acquire()
+    assert worker_a.try_acquire()
+
+    assert not worker_b.try_acquire()
+    assert worker_a.usage()['calls_today'] == 3
+    assert worker_b.usage()['backend'] == 'sqlite'
+
+
+def test_local_quota_rejection_falls_back_without_retrying_and_frees_the_probe(monkeypatch):
+    breaker = CircuitBreaker(window=4, min_calls=4, cooldown=0.05)
+    for _ in range(4):
+        breaker.record(False)
+    time.sleep(0.06)
+    attempts = []
+    monkeypatch.setattr(app, 'llm_breaker', breaker)
+    monkeypatch.setattr(app.api_quota, 'try_acquire', lambda: attempts.append(1) and False)
+    monkeypatch.setattr(app.llm, '_model', object())
+    monkeypatch.setattr(app.llm, 'development_mode', False)
+
+    assert app.llm._evaluate_uncached("What is a hash map?", "A key-value table.", "SE") is None
+    assert attempts == [1]
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()  # the probe was handed back
@@ -0,0 +1,77 @@
+import threading
+import time
+
+from scheduler import LLMScheduler
+
+
+def test_burst_is_granted_without_waiting():
+    scheduler = LLMScheduler(rpm=60, burst=3)
+
+    started = time.monotonic()
+    assert all(scheduler.acquire('evaluation') for _ in range(3))
+
+    assert time.monotonic() - started < 0.5
+    assert scheduler.stats()['granted'] == {'evaluation': 3}
+
+
+def test_call_that_cannot_start_before_its_deadline_is_shed_at_once():
+    scheduler = LLMScheduler(rpm=3, burst=1)  # one token every 20s
+    assert scheduler.acquire('first_question')
+
+    started = time.monotonic()
+    assert not scheduler.acquire('first_question')  # 10s deadline
+
+    assert time.monotonic() - started < 0.5
+    assert scheduler.stats()['shed'] == {'first_question': 1}
+
+
+def test_queued_call_is_shed_once_it_can_no_longer_start_in_time(wait_for):
+    scheduler = LLMScheduler(rpm=60, burst=1)  # one token a second
+    scheduler.DEADLINES = dict(LLMScheduler.DEADLINES, background=1.5)
+    assert scheduler.acquire('evaluation')
+    results = []
+
+    # The next token is about a second away, inside the deadline, so the call queues
+    waiter = threading.Thread(target=lambda: results.append(scheduler.acquire('background')))
+    waiter.start()
+    wait_for(lambda: scheduler.stats()['queued'] == 1)
+    time.sleep(0.6)
+    # A 429 empties the bucket; a full second more no longer fits
+    scheduler.penalize()
+    waiter.join(2)
+
+    assert results == [False]
+    stats = scheduler.stats()
+    assert stats['shed'] == {'background': 1}
+    assert stats['queued'] == 0
+
+
+def test_higher_priority_call_overtakes_queued_background_work(wait_for):
+    scheduler = LLMScheduler(rpm=120, burst=1)  # one token every 0.5s
+    assert scheduler.acquire('background')
+    order = []
+
+    def call(kind):
+        assert scheduler.acquire(kind)
+        order.append(kind)
+
+    background = threading.Thread(target=call, args=('background',))
+    background.start()
+    wait_for(lambda: scheduler.stats()['queued'] == 1)
+    first_question = threading.Thread(target=call, args=('first_question',))
+    first_question.start()
+    background.join(5)
+    first_question.join(5)
+
+    assert order == ['first_question', 'background']
+
+
+def test_penalize_empties_the_bucket():
+    scheduler = LLMScheduler(rpm=60, burst=3)
+
+    scheduler.penalize()
+
+    stats = scheduler.stats()
+    assert stats['tokens'] < 1
+    assert stats['penalties'] == 1
+
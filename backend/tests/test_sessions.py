@@ -0,0 +1,380 @@
+import copy
+import uuid
+
+import pytest
+
+import sessions
+from sessions import MemorySessions, SQLiteSessions, SessionStore, get_session_data, save_session_data
+
+
+def _session(**fields):
+    return dict({"sessionId": str(uuid.uuid4()), "history": [], "currentQuestionIndex": 0}, **fields)
+
+
+def test_saves_bump_the_version_and_reads_are_private_copies():
+    session = _session()
+    assert save_session_data(session['sessionId'], session)
+    assert session['version'] == 1
+
+    loaded = get_session_data(session['sessionId'])
+    loaded['history'].append({"question": "q1"})
+
+    assert get_session_data(session['sessionId'])['history'] == []
+    assert save_session_data(session['sessionId'], loaded)
+    assert get_session_data(session['sessionId'])['version'] == 2
+
+
+def test_save_from_a_stale_read_is_rejected():
+    session = _session()
+    save_session_data(session['sessionId'], session)
+    first = get_session_data(session['sessionId'])
+    second = get_session_data(session['sessionId'])
+
+    first['currentQuestionIndex'] = 1
+    assert save_session_data(session['sessionId'], first)
+    second['currentQuestionIndex'] = 5
+    assert not save_session_data(session['sessionId'], second)
+
+    assert get_session_data(session['sessionId'])['currentQuestionIndex'] == 1
+
+
+def test_unknown_or_missing_sessions():
+    assert get_session_data(str(uuid.uuid4())) is None
+    assert get_session_data('') is None
+    assert not save_session_data('', {"history": []})
+
+
+
+def test_only_new_or_edited_turns_are_written_again():
+    session = _session(history=[{"question": {"question": "q1"}}])
+    save_session_data(session['sessionId'], session)
+    assert sessions._changed_turns(session) == []
+
+    session['history'][0]['answer'] = "a1"
+    session['history'].append({"question": {"question": "q2"}})
+
+    assert [index for index, _ in sessions._changed_turns(session)] == [0, 1]
+    assert save_session_data(session['sessionId'], session)
+    assert get_session_data(session['sessionId'])['history'] == session['history']
+
+
+def test_session_row_leaves_history_and_private_fields_to_the_turn_rows():
+    session = _session(version=3, _turn_digests=[], history=[{"question": "q1", "answer": "a1"}])
+
+    row = sessions._session_row(session, 4)
+    turns = sessions._turn_rows(session['sessionId'], [(0, session['history'][0])])
+
+    assert 'history' not in row and '_turn_digests' not in row
+    assert row['version'] == 4
+    assert turns == [{"sessionId": session['sessionId'], "turn": 0, "question": "q1", "answer": "a1", "evaluation": None}]
+
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(sessions.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def _save_new(memory, **fields):
+    session = _session(**fields)
+    assert memory.save(session['sessionId'], session, list(enumerate(session['history'])))
+    return session
+
+
+def test_memory_sessions_evict_the_least_recently_used_past_the_cap():
+    memory = MemorySessions(max_sessions=2)
+    first, second = _save_new(memory), _save_new(memory)
+    memory.load(first['sessionId'])
+    _save_new(memory)
+
+    assert memory.load(second['sessionId']) is None
+    assert memory.load(first['sessionId']) is not None
+    assert memory.stats()['evicted'] == 1
+
+
+def test_idle_memory_sessions_expire(clock):
+    memory = MemorySessions(idle_ttl=60)
+    idle, active = _save_new(memory), _save_new(memory)
+    clock[0] += 45
+    memory.load(active['sessionId'])
+    clock[0] += 30
+
+    assert memory.load(idle['sessionId']) is None
+    assert memory.load(active['sessionId']) is not None
+    assert memory.stats()['expired'] == 1
+
+
+def test_summarized_memory_sessions_are_compacted_to_what_the_summary_needs():
+    memory = MemorySessions()
+    turn = {
+        "question": {"question": "q1", "id": "x", "category": "technical"},
+        "answer": "a" * 500,
+        "evaluation": {"score": 7, "clarity": 6, "correctness": 8, "completeness": 5, "feedback": "long feedback"}
+    }
+    session = _save_new(memory, history=[turn], endTime="2026-01-01T00:00:00", summary={"final_score": "7/10"})
+
+    stored = memory.load(session['sessionId'])
+
+    assert stored['compacted']
+    assert stored['history'] == [{
+        "question": {"question": "q1"},
+        "answer": "a" * 200,
+        "evaluation": {"score": 7, "clarity": 6, "correctness": 8, "completeness": 5}
+    }]
+    assert memory.stats()['compacted'] == 1
+
+
+def test_memory_sessions_reject_stale_versions():
+    memory = MemorySessions()
+    session = _save_new(memory)
+
+    assert not memory.save(session['sessionId'], dict(session, version=0), [])
+    assert memory.load(session['sessionId'])['version'] == 1
+
+
+class FakeRemote:
+    """Stands in for a remote session backend such as Supabase."""
+
+    name = 'fake'
+    remote = True
+
+    def __init__(self):
+        self.rows = {}
+        self.loads = 0
+        self.batches = []
+        self.fail_batches = False
+
+    def load(self, session_id, include_history=True):
+        self.loads += 1
+        row = self.rows.get(session_id)
+        if row is None:
+            return None
+        return copy.deepcopy(row if include_history else sessions._without_history(row))
+
+    def save(self, session_id, session_data, changed):
+        expected_version = session_data.get('version') or 0
+        stored = self.rows.get(session_id)
+        if stored is not None and stored['version'] != expected_version:
+            return False
+        session_data['version'] = expected_version + 1
+        self.rows[session_id] = copy.deepcopy(session_data)
+        return True
+
+    def version(self, session_id):
+        row = self.rows.get(session_id)
+        return None if row is None else row['version']
+
+    def save_batch(self, batch):
+        if self.fail_batches:
+            raise ConnectionError("supabase down")
+        self.batches.append(len(batch))
+        for session_data in batch:
+            sessions._mark_turns_persisted(session_data)
+            self.rows[session_data['sessionId']] = copy.deepcopy(session_data)
+
+    def stats(self):
+        return {"backend": self.name}
+
+
+@pytest.fixture
+def remote(monkeypatch):
+    fake = FakeRemote()
+    monkeypatch.setattr(sessions, 'session_backend', fake)
+    return fake
+
+
+def test_sync_store_writes_through_and_serves_reads_from_its_cache(remote):
+    store = SessionStore(write_mode='sync')
+    session = _session()
+
+    assert store.save(session['sessionId'], session)
+    assert remote.rows[session['sessionId']]['version'] == 1
+    assert store.get(session['sessionId'])['version'] == 1
+    assert remote.loads == 0
+    assert store.stats()['hits'] == 1
+
+
+def test_sync_store_drops_its_copy_when_a_save_is_rejected(remote):
+    store = SessionStore(write_mode='sync')
+    session = _session()
+    store.save(session['sessionId'], session)
+    stale = store.get(session['sessionId'])
+    remote.rows[session['sessionId']]['version'] = 5  # another worker saved
+
+    assert not store.save(session['sessionId'], stale)
+    assert store.get(session['sessionId'])['version'] == 5
+    assert store.stats()['conflicts'] == 1
+
+
+def test_sync_store_reloads_a_session_another_worker_saved(remote):
+    store = SessionStore(write_mode='sync')
+    session = _session()
+    store.save(session['sessionId'], session)
+    remote.rows[session['sessionId']]['version'] = 2  # another worker saved
+
+    assert store.get(session['sessionId'])['version'] == 2
+    assert remote.loads == 1
+    assert store.stats()['stale'] == 1
+    assert store.get(session['sessionId'])['version'] == 2
+    assert remote.loads == 1
+
+
+def test_write_behind_acknowledges_saves_and_flushes_them_in_batches(remote):
+    store = SessionStore(write_mode='write-behind', flush_interval=60, flush_batch_size=2)
+    saved = [_session() for _ in range(3)]
+    for session in saved:
+        assert store.save(session['sessionId'], session)
+
+    assert remote.rows == {}
+    assert store.stats()['dirty'] == 3
+    assert store.flush() == 3
+    assert sorted(remote.batches) == [1, 2]
+    assert store.stats()['dirty'] == 0
+    store.close()
+
+
+def test_write_behind_rejects_a_stale_save(remote):
+    store = SessionStore(write_mode='write-behind', flush_interval=60)
+    session = _session()
+    store.save(session['sessionId'], session)
+    stale = dict(session, version=0)
+
+    assert not store.save(session['sessionId'], stale)
+    assert store.stats()['conflicts'] == 1
+    store.close()
+
+
+def test_failed_flush_keeps_sessions_dirty_and_cached(remote):
+    store = SessionStore(write_mode='write-behind', max_cached=1, flush_interval=60)
+    clean = _session(version=1)
+    remote.rows[clean['sessionId']] = clean
+    dirty = _session()
+    store.save(dirty['sessionId'], dirty)
+    remote.fail_batches = True
+
+    assert store.flush() == 0
+    store.get(clean['sessionId'])  # over max_cached: the clean session goes, the dirty one stays
+    loads = remote.loads
+
+    assert store.get(dirty['sessionId'])['version'] == 1
+    assert remote.loads == loads
+    assert store.stats()['dirty'] == 1
+    remote.fail_batches = False
+    store.close()  # flushes what is still dirty
+    assert remote.rows[dirty['sessionId']]['version'] == 1
+
+
+def test_no_session_is_lost_when_the_cache_is_full_of_dirty_sessions(remote):
+    store = SessionStore(write_mode='write-behind', max_cached=2, flush_interval=60)
+    saved = [_session() for _ in range(3)]
+    for session in saved:
+        assert store.save(session['sessionId'], session)
+
+    store.close()
+
+    assert all(remote.rows[session['sessionId']]['version'] == 1 for session in saved)
+
+
+def test_a_session_is_not_evicted_while_its_flush_is_in_progress(remote):
+    store = SessionStore(write_mode='write-behind', max_cached=1, flush_interval=60)
+    dirty = _session()
+    store.save(dirty['sessionId'], dirty)
+    clean = _session(version=1)
+    remote.rows[clean['sessionId']] = clean
+
+    def failing_batch(batch):
+        store.get(clean['sessionId'])  # another request fills the cache mid-flush
+        raise ConnectionError("supabase down")
+
+    remote.save_batch = failing_batch
+    assert store.flush() == 0
+    del remote.save_batch
+
+    store.close()
+    assert remote.rows[dirty['sessionId']]['version'] == 1
+
+
+def test_write_behind_writes_through_once_the_dirty_set_is_full(remote):
+    store = SessionStore(write_mode='write-behind', max_dirty=2, flush_interval=60)
+    remote.fail_batches = True
+    held = [_session() for _ in range(2)]
+    for session in held:
+        store.save(session['sessionId'], session)
+    store.flush()
+    overflow = _session()
+
+    assert store.save(overflow['sessionId'], overflow)
+    assert remote.rows[overflow['sessionId']]['version'] == 1
+    assert store.save(held[0]['sessionId'], store.get(held[0]['sessionId']))  # already dirty: stays behind
+    stats = store.stats()
+    assert (stats['dirty'], stats['max_dirty'], stats['write_throughs']) == (2, 2, 1)
+    remote.fail_batches = False
+    store.close()
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    return str(tmp_path / 'sessions.sqlite3')
+
+
+def test_sqlite_sessions_round_trip_rows_and_turns(sqlite_path):
+    backend = SQLiteSessions(sqlite_path)
+    session = _session(role="SE", history=[{"question": {"question": "q1"}, "answer": "a1"}])
+
+    assert backend.save(session['sessionId'], session, sessions._changed_turns(session))
+    loaded = SQLiteSessions(sqlite_path).load(session['sessionId'])  # another worker on the host
+
+    assert loaded['version'] == 1
+    assert loaded['role'] == "SE"
+    assert loaded['history'] == session['history']
+    assert sessions._changed_turns(loaded) == []
+    assert backend.stats()['sessions'] == 1
+
+
+def test_sqlite_sessions_compare_and_set_on_the_version(sqlite_path):
+    backend = SQLiteSessions(sqlite_path)
+    session = _session()
+    backend.save(session['sessionId'], session, [])
+    first = backend.load(session['sessionId'])
+    second = backend.load(session['sessionId'])
+
+    first['history'].append({"question": "q1"})
+    assert backend.save(session['sessionId'], first, sessions._changed_turns(first))
+    assert not backend.save(session['sessionId'], second, [])
+
+    assert backend.load(session['sessionId'])['history'] == [{"question": "q1"}]
+
+
+def test_sqlite_sessions_rewrite_only_changed_turns(sqlite_path):
+    backend = SQLiteSessions(sqlite_path)
+    session = _session(history=[{"question": "q1"}, {"question": "q2"}])
+    backend.save(session['sessionId'], session, sessions._changed_turns(session))
+    loaded = backend.load(session['sessionId'])
+    loaded['history'][1]['answer'] = "a2"
+
+    assert sessions._changed_turns(loaded) == [(1, {"question": "q2", "answer": "a2"})]
+    backend.save(session['sessionId'], loaded, sessions._changed_turns(loaded))
+    assert backend.load(session['sessionId'])['history'][1]['answer'] == "a2"
+
+
+def test_sqlite_sessions_refuse_to_create_a_session_twice(sqlite_path):
+    backend = SQLiteSessions(sqlite_path)
+    session = _session(role="SE")
+    duplicate = _session(sessionId=session['sessionId'], role="PM")
+
+    assert backend.save(session['sessionId'], session, [])
+    assert not backend.save(duplicate['sessionId'], duplicate, [])
+
+    stored = backend.load(session['sessionId'])
+    assert (stored['role'], stored['version']) == ("SE", 1)
+
+
+def test_sqlite_stats_do_not_wait_for_a_save_in_progress(sqlite_path):
+    backend = SQLiteSessions(sqlite_path)
+    session = _session()
+    backend.save(session['sessionId'], session, [])
+
+    with backend._lock:  # a save holding the connection
+        assert backend.stats()['sessions'] == 1
@@ -0,0 +1,129 @@
+import asyncio
+import threading
+
+import pytest
+
+import app
+from concurrency import SharedCallInterrupted, SingleFlight
+
+
+def test_concurrent_callers_share_one_execution(wait_for):
+    single_flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def work():
+        calls.append(1)
+        release.wait(2)
+        return {"question": "q"}
+
+    leader = threading.Thread(target=lambda: results.append(single_flight.do('key', work)))
+    leader.start()
+    wait_for(lambda: single_flight.stats()['in_flight'] == 1)
+    followers = [threading.Thread(target=lambda: results.append(single_flight.do('key', work))) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    wait_for(lambda: single_flight.stats()['coalesced'] == 3)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(2)
+
+    assert len(calls) == 1
+    assert results == [{"question": "q"}] * 4
+    # Followers get private copies, so one caller's edits never reach another
+    assert len({id(result) for result in results}) == 4
+    assert single_flight.stats() == {"in_flight": 0, "executed": 1, "coalesced": 3}
+
+
+def test_followers_see_the_leaders_error_and_the_key_is_released(wait_for):
+    single_flight = SingleFlight()
+    release = threading.Event()
+    errors = []
+
+    def failing():
+        release.wait(2)
+        raise ValueError("boom")
+
+    def call():
+        try:
+            single_flight.do('key', failing)
+        except ValueError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    wait_for(lambda: single_flight.stats()['in_flight'] == 1)
+    follower = threading.Thread(target=call)
+    follower.start()
+    wait_for(lambda: single_flight.stats()['coalesced'] == 1)
+    release.set()
+    leader.join(2)
+    follower.join(2)
+
+    assert errors == ["boom", "boom"]
+    assert single_flight.do('key', lambda: "fresh") == "fresh"
+
+
+def test_async_callers_share_one_execution_with_sync_callers():
+    single_flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return ["q"]
+
+    async def main():
+        leader = asyncio.ensure_future(single_flight.do_async('key', work))
+        await asyncio.sleep(0)
+        # A thread asking for the same key while the coroutine runs joins it
+        sync_result = await asyncio.to_thread(single_flight.do, 'key', lambda: calls.append(2))
+        return await leader, sync_result
+
+    leader_result, sync_result = asyncio.run(main())
+
+    assert calls == [1]
+    assert leader_result == sync_result == ["q"]
+
+
+def test_cancelled_async_leader_does_not_cancel_followers():
+    single_flight = SingleFlight()
+
+    async def main():
+        leader = asyncio.ensure_future(single_flight.do_async('key', lambda: asyncio.sleep(10)))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(single_flight.do_async('key', lambda: asyncio.sleep(0)))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(SharedCallInterrupted):
+            await follower
+
+    asyncio.run(main())
+
+
+
+def test_async_callers_of_an_interrupted_shared_call_use_their_fallback():
+    bot = app.AsyncGeminiInterviewBot(enable_caching=False)
+    bot.development_mode = False
+
+    async def slow_evaluation(question_text, user_answer, role):
+        await asyncio.sleep(10)
+
+    bot._evaluate_uncached_async = slow_evaluation
+
+    async def until(condition):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+    async def main():
+        in_flight = app.llm_single_flight.stats
+        coalesced = in_flight()['coalesced']
+        leader = asyncio.ensure_future(bot.evaluate_answer("What is a hash map?", "A key-value table.", "SE"))
+        await asyncio.wait_for(until(lambda: in_flight()['in_flight']), 2)
+        follower = asyncio.ensure_future(bot.evaluate_answer("What is a hash map?", "A key-value table.", "SE"))
+        await asyncio.wait_for(until(lambda: in_flight()['coalesced'] > coalesced), 2)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(main()) == bot._get_smart_fallback_evaluation("A key-value table.")
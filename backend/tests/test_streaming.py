@@ -0,0 +1,54 @@
+from streaming import StreamingJSONScanner
+
+
+def _feed_in_chunks(scanner, text, size):
+    events = []
+    for start in range(0, len(text), size):
+        events += scanner.feed(text[start:start + size])
+    return events
+
+
+def test_number_is_reported_once_it_is_terminated():
+    scanner = StreamingJSONScanner(number_fields=('score',))
+
+    assert scanner.feed('{"score": 1') == []
+    assert scanner.feed('0') == []
+    assert scanner.feed(', "clarity": 7}') == [("number", "score", 10.0)]
+    assert scanner.feed('') == []
+
+
+def test_text_field_is_streamed_as_deltas():
+    scanner = StreamingJSONScanner(text_fields=('feedback',))
+
+    assert scanner.feed('{"feedback": "Good ') == [("text", "feedback", "Good ")]
+    assert scanner.feed('answer') == [("text", "feedback", "answer")]
+    assert scanner.feed('"}') == []
+
+
+def test_escapes_split_across_chunks_are_decoded_whole():
+    text = '{"feedback": "say \\"hi\\" \\u00e9\\n"}'
+
+    for size in range(1, len(text)):
+        events = _feed_in_chunks(StreamingJSONScanner(text_fields=('feedback',)), text, size)
+        assert "".join(value for _, _, value in events) == 'say "hi" é\n'
+
+
+def test_list_items_are_reported_as_each_one_completes():
+    scanner = StreamingJSONScanner(list_fields=('strengths',))
+
+    assert scanner.feed('{"strengths": ["clear", "conc') == [("item", "strengths", "clear")]
+    assert scanner.feed('ise"') == [("item", "strengths", "concise")]
+    assert scanner.feed('], "weaknesses": ["none"]}') == []
+
+
+def test_scans_a_whole_evaluation_fed_character_by_character():
+    text = '{"score": 8, "clarity": 7.5, "feedback": "Solid.", "tips": ["a", "b"]}'
+    scanner = StreamingJSONScanner(
+        number_fields=('score', 'clarity'), text_fields=('feedback',), list_fields=('tips',)
+    )
+
+    events = _feed_in_chunks(scanner, text, 1)
+
+    assert [e for e in events if e[0] == "number"] == [("number", "score", 8.0), ("number", "clarity", 7.5)]
+    assert "".join(e[2] for e in events if e[0] == "text") == "Solid."
+    assert [e[2] for e in events if e[0] == "item"] == ["a", "b"]
@@ -0,0 +1,111 @@
+import pytest
+
+import app
+from app import load_for_summary, score_totals, store_summary
+from sessions import get_session_data
+
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+
+@pytest.fixture
+def summary_calls(monkeypatch):
+    calls = []
+    generate_summary = app.llm.generate_summary
+
+    def counting(history, scores=None):
+        calls.append(len(history))
+        return generate_summary(history, scores)
+
+    monkeypatch.setattr(app.llm, 'generate_summary', counting)
+    return calls
+
+
+def _finish_interview(client, answers=("A hash map.", "Binary search.")):
+    started = client.post('/start_interview', json={'role': 'SE', 'num_questions': len(answers)}).get_json()
+    for answer in answers:
+        response = client.post('/submit_answer', json={'sessionId': started['sessionId'], 'answer': answer})
+        assert response.status_code == 200
+    return started['sessionId']
+
+
+def test_running_scores_match_the_history(client):
+    session_id = _finish_interview(client)
+
+    session_data = get_session_data(session_id)
+
+    assert session_data['scores'] == score_totals(session_data['history'])
+    assert session_data['scores']['answered'] == 2
+
+
+def test_summary_is_computed_once_at_completion_and_then_served_from_the_session(client, summary_calls, wait_for):
+    session_id = _finish_interview(client)
+    wait_for(lambda: get_session_data(session_id).get('summary'))
+
+    first = client.get(f'/get_summary/{session_id}').get_json()
+    second = client.get(f'/get_summary/{session_id}').get_json()
+
+    assert summary_calls == [2]
+    assert first == second
+    assert first['sessionId'] == session_id
+
+
+def test_stored_summary_is_read_without_the_turns(client, wait_for):
+    session_id = _finish_interview(client)
+    wait_for(lambda: get_session_data(session_id).get('summary'))
+
+    session_data, summary = load_for_summary(session_id)
+
+    assert summary is not None
+    assert session_data['history'] == []
+    assert session_data['_partial']
+
+
+def test_summary_is_only_stored_on_finished_full_sessions(client, wait_for):
+    session_id = _finish_interview(client)
+    wait_for(lambda: get_session_data(session_id).get('summary'))
+    finished = get_session_data(session_id)
+
+    assert not store_summary(session_id, finished, {"final_score": "1/10"})  # already stored
+    partial, _ = load_for_summary(session_id)
+    assert not store_summary(session_id, dict(partial, summary=None), {"final_score": "1/10"})
+
+    started = client.post('/start_interview', json={'role': 'SE', 'num_questions': 2}).get_json()
+    unfinished = get_session_data(started['sessionId'])
+    assert not store_summary(started['sessionId'], unfinished, {"final_score": "1/10"})
+
+
+def test_a_failed_summary_store_is_not_fatal(client, monkeypatch, wait_for):
+    session_id = _finish_interview(client)
+    wait_for(lambda: get_session_data(session_id).get('summary'))
+    finished = dict(get_session_data(session_id), summary=None)
+
+    def unavailable(session_id, session_data):
+        raise ConnectionError("supabase down")
+
+    monkeypatch.setattr(app, 'save_session_data', unavailable)
+
+    assert not store_summary(session_id, finished, {"final_score": "1/10"})
+    assert finished['summary'] is None
+
+
+def _answered(score):
+    return {"question": {"question": "Q"}, "answer": "A", "evaluation": {"score": score, "feedback": "ok"}}
+
+
+def test_final_score_comes_from_the_running_totals():
+    # Compacted turns may no longer carry every score; the session totals do
+    history = [_answered(4), _answered(6)]
+    scores = {"answered": 3, "score": 24, "clarity": 0, "correctness": 0, "completeness": 0}
+
+    assert app.llm.generate_summary(history, scores)['final_score'] == "8.0/10"
+    assert app.fallback_summary(history, scores)['final_score'] == "8.0/10"
+
+
+def test_legacy_sessions_without_totals_sum_the_history():
+    history = [_answered(4), _answered(6)]
+
+    assert app.llm.generate_summary(history)['final_score'] == "5.0/10"
+    assert app.fallback_summary(history)['final_score'] == "5.0/10"
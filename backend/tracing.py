@@ -0,0 +1,302 @@
+"""Request and Gemini call tracing, exported as OTLP/JSON without the OpenTelemetry SDK."""
+import os
+import json
+import time
+import logging
+import random
+import asyncio
+import contextlib
+import contextvars
+import threading
+import atexit
+from typing import Dict, List, Optional
+from collections import deque
+
+from config import env_float
+
+logger = logging.getLogger(__name__)
+
+# Spans follow the OpenTelemetry data model and are exported as OTLP/JSON, so
+# an OTLP collector (or a plain file) receives them without the SDK installed
+SPAN_KINDS = {'internal': 1, 'server': 2, 'client': 3}
+
+def _otlp_value(value) -> Dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def _otlp_attributes(attributes: Dict) -> List[Dict]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+def _parse_traceparent(header: Optional[str]) -> Optional[tuple]:
+    """(trace_id, parent_span_id, sampled) from a W3C traceparent header, or None if it is malformed."""
+    parts = (header or '').strip().lower().split('-')
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or len(parts[3]) != 2:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+        flags = int(parts[3], 16)
+    except ValueError:
+        return None
+    if parts[1] == '0' * 32 or parts[2] == '0' * 16:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+class Span:
+    """One timed operation of a sampled trace."""
+
+    __slots__ = ('trace_id', 'span_id', 'parent_id', 'name', 'kind', 'start_ns', 'end_ns',
+                 'attributes', 'events', 'error')
+    sampled = True
+
+    def __init__(self, name: str, kind: str, trace_id: str, parent_id: Optional[str], attributes: Dict):
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes
+        self.events = []
+        self.error = None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes):
+        self.events.append((time.time_ns(), name, attributes))
+
+    def to_otlp(self) -> Dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KINDS.get(self.kind, 1),
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": 2, "message": self.error} if self.error else {}
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.events:
+            span["events"] = [
+                {"timeUnixNano": str(at), "name": name, "attributes": _otlp_attributes(attributes)}
+                for at, name, attributes in self.events
+            ]
+        return span
+
+class _UnsampledSpan:
+    """Stands in for every span of an unsampled trace."""
+
+    sampled = False
+
+    def set_attribute(self, key: str, value):
+        pass
+
+    def add_event(self, name: str, **attributes):
+        pass
+
+UNSAMPLED_SPAN = _UnsampledSpan()
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+class FileSpanExporter:
+    """Appends each batch to a file as one OTLP/JSON ExportTraceServiceRequest per line."""
+
+    def __init__(self, path: str):
+        self.target = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def export(self, payload: Dict):
+        with open(self.target, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(payload, separators=(',', ':')) + "\n")
+
+class OTLPHttpSpanExporter:
+    """POSTs each batch as OTLP/JSON to a collector's /v1/traces endpoint."""
+
+    def __init__(self, endpoint: str, timeout: float = 5.0):
+        self.target = endpoint
+        self.timeout = timeout
+
+    def export(self, payload: Dict):
+        import urllib.request  # only needed once a batch is exported; keeps cold starts lean
+        request = urllib.request.Request(
+            self.target, data=json.dumps(payload).encode('utf-8'),
+            headers={'Content-Type': 'application/json'}, method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+class Tracer:
+    """Starts spans and exports finished ones in batches from a background thread.
+
+    Sampling is decided once per trace: a request carrying a `traceparent`
+    header keeps its caller's decision, anything else is kept with
+    probability `sample_ratio`. Unsampled traces share one no-op span, so
+    each instrumented operation then costs a context variable lookup.
+    """
+
+    def __init__(self, exporter=None, sample_ratio: float = 0.1, service_name: str = 'querybox-backend',
+                 batch_size: int = 256, flush_interval: float = 2.0, max_queue: int = 4096):
+        self.exporter = exporter
+        self.sample_ratio = sample_ratio
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._worker = None
+        self.traces = 0
+        self.spans = 0
+        self.exported = 0
+        self.dropped = 0
+        self.export_errors = 0
+
+    def start_span(self, name: str, kind: str = 'internal', attributes: Optional[Dict] = None,
+                   traceparent: Optional[str] = None) -> tuple:
+        """Start a span under the current one (or the caller's `traceparent`) and make it current.
+
+        Returns (span, token) to hand to end_span.
+        """
+        parent = _current_span.get()
+        if parent is UNSAMPLED_SPAN or (parent is None and self.exporter is None):
+            return UNSAMPLED_SPAN, None
+        if parent is None:
+            incoming = _parse_traceparent(traceparent)
+            if incoming:
+                trace_id, parent_id, sampled = incoming
+            else:
+                trace_id, parent_id, sampled = f"{random.getrandbits(128):032x}", None, random.random() < self.sample_ratio
+            if not sampled:
+                return UNSAMPLED_SPAN, _current_span.set(UNSAMPLED_SPAN)
+            self.traces += 1
+        else:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        span = Span(name, kind, trace_id, parent_id, dict(attributes or {}))
+        return span, _current_span.set(span)
+
+    def end_span(self, span, token, error: Optional[BaseException] = None):
+        if token is not None:
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # Ended from another context (e.g. a stream closed by the garbage collector)
+                pass
+        if not span.sampled:
+            return
+        span.end_ns = time.time_ns()
+        if error is not None:
+            span.error = f"{type(error).__name__}: {error}"
+        self._enqueue(span)
+
+    @contextlib.contextmanager
+    def span(self, name: str, kind: str = 'internal', attributes: Optional[Dict] = None,
+             traceparent: Optional[str] = None):
+        span, token = self.start_span(name, kind, attributes, traceparent)
+        try:
+            yield span
+        except (GeneratorExit, asyncio.CancelledError):
+            span.set_attribute('querybox.cancelled', True)
+            self.end_span(span, token)
+            raise
+        except BaseException as e:
+            self.end_span(span, token, e)
+            raise
+        else:
+            self.end_span(span, token)
+
+    def _enqueue(self, span: Span):
+        with self._lock:
+            if len(self._queue) >= self.max_queue:
+                self.dropped += 1
+                return
+            self._queue.append(span)
+            self.spans += 1
+            full = len(self._queue) >= self.batch_size
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._export_loop, name="trace-exporter", daemon=True)
+                self._worker.start()
+        if full:
+            self._wake.set()
+
+    def _export_loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """Export every queued span now; returns how many were exported."""
+        if self.exporter is None:
+            return 0
+        with self._flush_lock:
+            with self._lock:
+                pending = list(self._queue)
+                self._queue.clear()
+            exported = 0
+            for start in range(0, len(pending), self.batch_size):
+                batch = pending[start:start + self.batch_size]
+                try:
+                    self.exporter.export(self._payload(batch))
+                    exported += len(batch)
+                except Exception as e:
+                    self.export_errors += 1
+                    logger.warning(f"Trace export to {self.exporter.target} failed: {e}")
+            self.exported += exported
+            return exported
+
+    def _payload(self, spans: List[Span]) -> Dict:
+        return {"resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": self.service_name, "process.pid": os.getpid()})},
+            "scopeSpans": [{"scope": {"name": "querybox"}, "spans": [span.to_otlp() for span in spans]}]
+        }]}
+
+    def shutdown(self):
+        self._stop.set()
+        self._wake.set()
+        self.flush()
+
+    def stats(self) -> Dict:
+        return {
+            "exporter": self.exporter.target if self.exporter else None,
+            "sample_ratio": self.sample_ratio,
+            "traces": self.traces,
+            "spans": self.spans,
+            "queued": len(self._queue),
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "export_errors": self.export_errors
+        }
+
+def _make_tracer() -> Tracer:
+    """TRACE_EXPORTER=file|otlp turns tracing on; TRACE_SAMPLE_RATIO sets the share of traces kept."""
+    kind = os.getenv('TRACE_EXPORTER', 'none').lower()
+    exporter = None
+    if kind == 'file':
+        exporter = FileSpanExporter(
+            os.getenv('TRACE_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'querybox_traces.jsonl'))
+        )
+    elif kind == 'otlp':
+        exporter = OTLPHttpSpanExporter(
+            os.getenv('TRACE_OTLP_ENDPOINT', 'http://localhost:4318/v1/traces'), env_float('TRACE_OTLP_TIMEOUT', 5.0)
+        )
+    elif kind != 'none':
+        logger.warning(f"Unknown TRACE_EXPORTER '{kind}' - tracing disabled")
+    return Tracer(
+        exporter,
+        sample_ratio=min(max(env_float('TRACE_SAMPLE_RATIO', 0.1), 0.0), 1.0),
+        service_name=os.getenv('TRACE_SERVICE_NAME', 'querybox-backend'),
+        flush_interval=env_float('TRACE_FLUSH_INTERVAL', 2.0)
+    )
+
+tracer = _make_tracer()
+atexit.register(tracer.shutdown)
@@ -9,12 +9,10 @@ lsof -ti:5001 | xargs kill -9 2>/dev/null || true
 lsof -ti:5173 | xargs kill -9 2>/dev/null || true
 sleep 2
 
-# Start backend on port 5001
+# Start backend on port 5001 (gunicorn, or the built-in server without debug if gunicorn is missing)
 echo "🔧 Starting backend server on port 5001..."
-cd backend
-PORT=5001 nohup python app.py > ../backend.log 2>&1 &
+PORT=5001 nohup python start_server.py > backend.log 2>&1 &
 BACKEND_PID=$!
-cd ..
 
 echo "Backend started with PID: $BACKEND_PID"
 
@@ -50,7 +48,7 @@ echo "📝 Logs:"
 echo "   Backend: tail -f backend.log"
 echo "   Frontend: Check terminal output above"
 echo ""
-echo "🛑 To stop: Press Ctrl+C or run 'pkill -f \"python app.py|npm\""
+echo "🛑 To stop: Press Ctrl+C or run 'pkill -f \"start_server.py|gunicorn|npm\""
 echo "============================================"
 
 # Keep script running and show logs
@@ -3,23 +3,38 @@
 import os
 import sys
 
-# Add the backend directory to the Python path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
 
-# Import the Flask app
-from app import app
+# Add the backend directory to the Python path
+sys.path.insert(0, BACKEND_DIR)
 
 if __name__ == '__main__':
+    # python start_server.py         -> Flask app on gunicorn gthread workers
+    # python start_server.py --asgi  -> async interview routes on uvicorn workers
+    use_asgi = '--asgi' in sys.argv[1:]
+    port = os.getenv('PORT', '8000')
+
     print("🚀 Starting QueryBox AI Backend Server...")
-    print("🌐 Server will be available at: http://127.0.0.1:8000")
-    print("🏥 Health check: http://127.0.0.1:8000/health")
+    print(f"🌐 Server will be available at: http://127.0.0.1:{port}")
+    print(f"🏥 Health check: http://127.0.0.1:{port}/health")
     print("⏹️  Press Ctrl+C to stop")
     print("-" * 50)
-    
-    # Start the Flask app
-    app.run(
-        host='127.0.0.1',
-        port=8000,
-        debug=True,
-        use_reloader=False  # Disable reloader to avoid issues
-    )
+
+    os.environ['PORT'] = port
+    if use_asgi:
+        os.environ['SERVER_WORKER_CLASS'] = 'uvicorn.workers.UvicornWorker'
+
+    try:
+        from gunicorn.app.wsgiapp import run
+    except ImportError:
+        # gunicorn is POSIX-only; fall back to the threaded Flask server without debug or reloader
+        print("⚠️ gunicorn not installed - using the built-in server (not for production)")
+        from app import app
+        app.run(host='127.0.0.1', port=int(port), debug=False, threaded=True, use_reloader=False)
+    else:
+        sys.argv = [
+            'gunicorn', '-c', os.path.join(BACKEND_DIR, 'gunicorn.conf.py'),
+            '--chdir', BACKEND_DIR,
+            'asgi:application' if use_asgi else 'app:app'
+        ]
+        run()